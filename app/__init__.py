@@ -0,0 +1,4 @@
+from app.telemetry.startup import install_import_profiler, profiling_enabled
+
+if profiling_enabled():
+    install_import_profiler()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator
+
+from fastapi import HTTPException, Request
+
+from app.config import Settings
+from app.exceptions import AdmissionRejected
+from app.telemetry.metrics import (
+    ADMISSION_INFLIGHT,
+    ADMISSION_LIMIT,
+    ADMISSION_QUEUE_DURATION,
+    ADMISSION_REJECTED_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests for a route and sheds load that waits too long.
+
+    Requests over the limit queue in FIFO order for at most ``queue_timeout``
+    seconds and are then rejected. With ``adaptive`` the limit follows AIMD:
+    it grows by ``1 / limit`` per request finishing within ``latency_target``
+    and shrinks by ``backoff`` on slow requests and rejections.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        queue_timeout: float,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        latency_target: float = 0.05,
+        backoff: float = 0.9,
+        retry_after: int = 1,
+    ) -> None:
+        self.name = name
+        self.retry_after = retry_after
+        self._limit = float(limit)
+        self._queue_timeout = queue_timeout
+        self._adaptive = adaptive
+        self._min_limit = min_limit
+        self._max_limit = max_limit or limit
+        self._latency_target = latency_target
+        self._backoff = backoff
+        self._inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        ADMISSION_LIMIT.labels(route=name).set(limit)
+
+    @property
+    def limit(self) -> int:
+        return max(self._min_limit, int(self._limit))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    async def acquire(self) -> None:
+        """Raises ``AdmissionRejected`` when no slot frees up within the queue timeout."""
+        started = time.monotonic()
+        if self._inflight < self.limit and not self._waiters:
+            self._take()
+            ADMISSION_QUEUE_DURATION.labels(route=self.name).observe(0.0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self._queue_timeout)
+        except asyncio.TimeoutError:
+            self._remove_waiter(waiter)
+            self._reject()
+        except asyncio.CancelledError:
+            self._remove_waiter(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self._give_back()
+            raise
+        finally:
+            ADMISSION_QUEUE_DURATION.labels(route=self.name).observe(time.monotonic() - started)
+
+    def _take(self) -> None:
+        self._inflight += 1
+        ADMISSION_INFLIGHT.labels(route=self.name).set(self._inflight)
+
+    def _give_back(self) -> None:
+        self._inflight -= 1
+        ADMISSION_INFLIGHT.labels(route=self.name).set(self._inflight)
+        self._wake_waiters()
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+    def _reject(self) -> None:
+        ADMISSION_REJECTED_TOTAL.labels(route=self.name).inc()
+        if self._adaptive:
+            self._decrease()
+        raise AdmissionRejected(self.name)
+
+    def release(self, latency: float) -> None:
+        if self._adaptive:
+            if latency <= self._latency_target:
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            else:
+                self._decrease()
+            ADMISSION_LIMIT.labels(route=self.name).set(self.limit)
+        self._give_back()
+
+    def _decrease(self) -> None:
+        self._limit = max(self._min_limit, self._limit * self._backoff)
+        ADMISSION_LIMIT.labels(route=self.name).set(self.limit)
+
+
+def build_limiters(settings: Settings) -> dict[str, ConcurrencyLimiter]:
+    if not settings.admission_enabled:
+        return {}
+    limits = {
+        "predict": settings.admission_predict_limit,
+        "simple_predict": settings.admission_simple_predict_limit,
+        "async_predict": settings.admission_async_predict_limit,
+    }
+    return {
+        route: ConcurrencyLimiter(
+            route,
+            limit,
+            queue_timeout=settings.admission_queue_timeout_ms / 1000,
+            adaptive=settings.admission_adaptive,
+            min_limit=settings.admission_min_limit,
+            max_limit=max(limit, settings.admission_max_limit),
+            latency_target=settings.admission_latency_target_ms / 1000,
+            retry_after=settings.admission_retry_after_seconds,
+        )
+        for route, limit in limits.items()
+    }
+
+
+def admission(route: str):
+    """Route dependency holding a concurrency slot for the duration of the request."""
+
+    async def dependency(request: Request) -> AsyncIterator[None]:
+        limiter = getattr(request.app.state, "limiters", {}).get(route)
+        if limiter is None:
+            yield
+            return
+        try:
+            await limiter.acquire()
+        except AdmissionRejected:
+            raise HTTPException(
+                status_code=503,
+                detail="Service is overloaded, retry later",
+                headers={"Retry-After": str(limiter.retry_after)},
+            )
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            limiter.release(time.monotonic() - started)
+
+    return dependency
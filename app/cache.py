@@ -0,0 +1,55 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.serialization import dumps
+
+TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    body: bytes
+    etag: str
+
+
+class ResultCache:
+    """Bounded LRU of rendered terminal moderation results keyed by task id.
+
+    Completed and failed rows never change, so entries need no invalidation.
+    """
+
+    def __init__(self, max_size: int = 10_000, max_age_seconds: int = 86_400) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[int, CachedResult] = OrderedDict()
+        self.cache_control = f"public, max-age={max_age_seconds}, immutable"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, task_id: int) -> CachedResult | None:
+        entry = self._entries.get(task_id)
+        if entry is not None:
+            self._entries.move_to_end(task_id)
+        return entry
+
+    def put(self, task_id: int, payload: dict) -> CachedResult:
+        if payload["status"] not in TERMINAL_STATUSES:
+            raise ValueError(f"Refusing to cache non-terminal result: task_id={task_id}")
+        body = dumps(payload)
+        entry = CachedResult(body=body, etag=f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+        if self._max_size > 0:
+            self._entries[task_id] = entry
+            self._entries.move_to_end(task_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
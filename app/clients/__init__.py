@@ -1,3 +1,4 @@
+from app.clients.codec import ModerationMessage
 from app.clients.kafka import KafkaProducerClient
 
-__all__ = ["KafkaProducerClient"]
+__all__ = ["KafkaProducerClient", "ModerationMessage"]
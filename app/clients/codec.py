@@ -0,0 +1,115 @@
+import json
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Literal, Sequence
+
+from app.exceptions import InvalidMessageError
+from app.serialization import dumps, loads
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_BINARY = "binary"
+
+# Highest first; each priority may have its own topic, ``normal`` is the moderation topic.
+Priority = Literal["high", "normal", "low"]
+PRIORITIES: tuple[Priority, ...] = ("high", "normal", "low")
+DEFAULT_PRIORITY: Priority = "normal"
+
+CONTENT_TYPE_HEADER = "content-type"
+SCHEMA_VERSION_HEADER = "schema-version"
+BINARY_CONTENT_TYPE = b"application/x-moderation-batch"
+BINARY_SCHEMA_VERSION = 1
+
+# version (u8), item count (u32), timestamp in epoch seconds (i64), then count x item_id (i64)
+_BINARY_HEADER = struct.Struct(">BIq")
+_ITEM_ID = struct.Struct(">q")
+
+
+def utc_timestamp() -> str:
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+@dataclass(frozen=True)
+class ModerationMessage:
+    item_id: int
+    timestamp: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"item_id": self.item_id, "timestamp": self.timestamp}
+
+    def to_json(self) -> str:
+        return self.encode().decode()
+
+    def encode(self) -> bytes:
+        return dumps(self.to_dict())
+
+
+def decode_moderation_message(data: bytes) -> dict[str, Any]:
+    """Raises ``json.JSONDecodeError`` for malformed payloads."""
+    return loads(data)
+
+
+def binary_headers() -> list[tuple[str, bytes]]:
+    return [
+        (CONTENT_TYPE_HEADER, BINARY_CONTENT_TYPE),
+        (SCHEMA_VERSION_HEADER, str(BINARY_SCHEMA_VERSION).encode()),
+    ]
+
+
+def encode_moderation_batch(item_ids: Sequence[int], timestamp: datetime | None = None) -> bytes:
+    timestamp = timestamp or datetime.now(timezone.utc)
+    return _BINARY_HEADER.pack(
+        BINARY_SCHEMA_VERSION, len(item_ids), int(timestamp.timestamp())
+    ) + struct.pack(f">{len(item_ids)}q", *item_ids)
+
+
+def decode_moderation_batch(data: bytes) -> list[dict[str, Any]]:
+    if len(data) < _BINARY_HEADER.size:
+        raise InvalidMessageError(f"Binary moderation record too short: {len(data)} bytes")
+    version, count, epoch_seconds = _BINARY_HEADER.unpack_from(data)
+    if version != BINARY_SCHEMA_VERSION:
+        raise InvalidMessageError(f"Unsupported binary schema version: {version}")
+    expected = _BINARY_HEADER.size + count * _ITEM_ID.size
+    if len(data) != expected:
+        raise InvalidMessageError(f"Binary moderation record is {len(data)} bytes, expected {expected}")
+    timestamp = datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime(TIMESTAMP_FORMAT)
+    item_ids = struct.unpack_from(f">{count}q", data, _BINARY_HEADER.size)
+    return [{"item_id": item_id, "timestamp": timestamp} for item_id in item_ids]
+
+
+def wire_format_of(headers: Sequence[tuple[str, bytes]] | None) -> str:
+    for key, value in headers or ():
+        if key == CONTENT_TYPE_HEADER and value == BINARY_CONTENT_TYPE:
+            return WIRE_FORMAT_BINARY
+    return WIRE_FORMAT_JSON
+
+
+def decode_record(value: bytes | None, headers: Sequence[tuple[str, bytes]] | None) -> list[dict[str, Any]]:
+    """Decode a moderation topic record in either wire format into item payloads.
+
+    Records without a content-type header are legacy single-item JSON.
+    """
+    if value is None:
+        raise InvalidMessageError("Empty moderation record")
+    if wire_format_of(headers) == WIRE_FORMAT_BINARY:
+        return decode_moderation_batch(value)
+    try:
+        payload = decode_moderation_message(value)
+    except json.JSONDecodeError as e:
+        raise InvalidMessageError(f"Invalid JSON: {e}") from e
+    if not isinstance(payload, dict):
+        raise InvalidMessageError(f"Expected a JSON object, got {type(payload).__name__}")
+    return [payload]
+
+
+def encode_dlq_payload(original_message: dict, error: str, retry_count: int) -> bytes:
+    return dumps(
+        {
+            "original_message": original_message,
+            "error": error,
+            "timestamp": utc_timestamp(),
+            "retry_count": retry_count,
+        }
+    )
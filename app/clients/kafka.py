@@ -1,22 +1,34 @@
-import json
+import asyncio
 import logging
-from dataclasses import dataclass
-from datetime import datetime, timezone
-
-from aiokafka import AIOKafkaProducer
+from typing import TYPE_CHECKING, Sequence
 
+from app.clients.codec import (
+    DEFAULT_PRIORITY,
+    PRIORITIES,
+    WIRE_FORMAT_BINARY,
+    WIRE_FORMAT_JSON,
+    ModerationMessage,
+    binary_headers,
+    encode_dlq_payload,
+    encode_moderation_batch,
+    utc_timestamp,
+)
 from app.config import Settings
+from app.deadline import run_with_deadline
 
-logger = logging.getLogger(__name__)
+if TYPE_CHECKING:
+    from aiokafka import AIOKafkaProducer
 
+logger = logging.getLogger(__name__)
 
-@dataclass(frozen=True)
-class ModerationMessage:
-    item_id: int
-    timestamp: str
 
-    def to_json(self) -> str:
-        return json.dumps({"item_id": self.item_id, "timestamp": self.timestamp})
+def priority_topics(settings: Settings) -> dict[str, str]:
+    """Topic per priority; priorities without their own topic share the moderation topic."""
+    unknown = settings.kafka_priority_topics.keys() - set(PRIORITIES)
+    if unknown:
+        raise ValueError(f"Unknown priorities in KAFKA_PRIORITY_TOPICS: {sorted(unknown)}")
+    topics = {**settings.kafka_priority_topics, DEFAULT_PRIORITY: settings.kafka_moderation_topic}
+    return {priority: topics.get(priority, settings.kafka_moderation_topic) for priority in PRIORITIES}
 
 
 class KafkaProducerClient:
@@ -25,13 +37,24 @@ class KafkaProducerClient:
         bootstrap_servers: str,
         topic: str,
         dlq_topic: str | None = None,
+        wire_format: str = WIRE_FORMAT_JSON,
+        max_items_per_record: int = 1000,
+        priority_topics: dict[str, str] | None = None,
     ) -> None:
+        if wire_format not in (WIRE_FORMAT_JSON, WIRE_FORMAT_BINARY):
+            raise ValueError(f"Unknown Kafka wire format: {wire_format}")
         self._bootstrap_servers = bootstrap_servers.split(",")
         self._topic = topic
+        self._priority_topics = priority_topics or {}
         self._dlq_topic = dlq_topic
-        self._producer: AIOKafkaProducer | None = None
+        self._wire_format = wire_format
+        self._max_items_per_record = max_items_per_record
+        self._producer: "AIOKafkaProducer | None" = None
 
     async def start(self) -> None:
+        # Deferred so that deployments with Kafka disabled never import aiokafka.
+        from aiokafka import AIOKafkaProducer
+
         self._producer = AIOKafkaProducer(bootstrap_servers=self._bootstrap_servers)
         await self._producer.start()
         logger.info("Kafka producer started")
@@ -41,15 +64,64 @@ class KafkaProducerClient:
             await self._producer.stop()
         logger.info("Kafka producer stopped")
 
-    async def send_moderation_request(self, item_id: int) -> None:
+    async def fetch_metadata(self) -> None:
+        """Fetch the moderation topic's partitions, connecting to the cluster if needed."""
         if self._producer is None:
             raise RuntimeError("Producer not started")
-        message = ModerationMessage(
-            item_id=item_id,
-            timestamp=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        )
-        await self._producer.send_and_wait(self._topic, message.to_json().encode())
-        logger.info("Sent moderation request item_id=%s", item_id)
+        await self._producer.partitions_for(self._topic)
+
+    def topic_for(self, priority: str = DEFAULT_PRIORITY) -> str:
+        return self._priority_topics.get(priority, self._topic)
+
+    async def send_moderation_request(self, item_id: int, priority: str = DEFAULT_PRIORITY) -> None:
+        if self._producer is None:
+            raise RuntimeError("Producer not started")
+        topic = self.topic_for(priority)
+        if self._wire_format == WIRE_FORMAT_BINARY:
+            send = self._producer.send_and_wait(
+                topic, encode_moderation_batch([item_id]), headers=binary_headers()
+            )
+        else:
+            message = ModerationMessage(item_id=item_id, timestamp=utc_timestamp())
+            send = self._producer.send_and_wait(topic, message.encode())
+        await run_with_deadline("kafka_send", send)
+        logger.info("Sent moderation request item_id=%s priority=%s", item_id, priority)
+
+    async def send_moderation_requests(self, item_ids: Sequence[int], priority: str = DEFAULT_PRIORITY) -> None:
+        """Publish many items as one pipelined batch and wait for all acks.
+
+        With the binary wire format up to ``max_items_per_record`` items share
+        a single Kafka record.
+        """
+        if self._producer is None:
+            raise RuntimeError("Producer not started")
+        topic = self.topic_for(priority)
+
+        # send() waits for buffer space when the producer is backed up, so it is bounded too.
+        async def send_all() -> int:
+            if self._wire_format == WIRE_FORMAT_BINARY:
+                step = self._max_items_per_record
+                futures = [
+                    await self._producer.send(
+                        topic,
+                        encode_moderation_batch(item_ids[i:i + step]),
+                        headers=binary_headers(),
+                    )
+                    for i in range(0, len(item_ids), step)
+                ]
+            else:
+                timestamp = utc_timestamp()
+                futures = [
+                    await self._producer.send(
+                        topic, ModerationMessage(item_id=item_id, timestamp=timestamp).encode()
+                    )
+                    for item_id in item_ids
+                ]
+            await asyncio.gather(*futures)
+            return len(futures)
+
+        records = await run_with_deadline("kafka_send", send_all())
+        logger.info("Sent %s moderation requests in %s records", len(item_ids), records)
 
     async def send_to_dlq(
         self,
@@ -59,14 +131,8 @@ class KafkaProducerClient:
     ) -> None:
         if self._producer is None or self._dlq_topic is None:
             raise RuntimeError("Producer or DLQ not configured")
-        payload = {
-            "original_message": original_message,
-            "error": error,
-            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "retry_count": retry_count,
-        }
         await self._producer.send_and_wait(
-            self._dlq_topic, json.dumps(payload).encode()
+            self._dlq_topic, encode_dlq_payload(original_message, error, retry_count)
         )
         logger.warning("Sent to DLQ: %s", error)
 
@@ -80,4 +146,7 @@ def create_kafka_producer(
         bootstrap_servers=settings.kafka_bootstrap_servers,
         topic=settings.kafka_moderation_topic,
         dlq_topic=settings.kafka_dlq_topic if include_dlq else None,
+        wire_format=settings.kafka_wire_format,
+        max_items_per_record=settings.kafka_max_items_per_record,
+        priority_topics=priority_topics(settings),
     )
@@ -0,0 +1,187 @@
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import asyncpg
+
+from app.config import Settings
+from app.telemetry.metrics import (
+    DB_POOL_ACQUIRES_TOTAL,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_HEALTHY,
+    DB_READ_FALLBACK_TOTAL,
+    DB_REPLICA_LAG,
+)
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+
+# Zero when the replica has replayed everything it received; otherwise the age of the last replayed transaction.
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Pool exhaustion (a timeout) says nothing about replica health. On Python 3.11+
+# asyncio.TimeoutError is TimeoutError, an OSError, so acquire() re-raises it first.
+_CONNECTION_ERRORS = (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError)
+
+
+class _Replica:
+    def __init__(self, name: str, pool: asyncpg.Pool) -> None:
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag = 0.0
+
+
+class RoutingPool:
+    """Primary pool plus read replicas behind the ``asyncpg.Pool`` acquire API.
+
+    ``acquire(readonly=True)`` picks a healthy replica round-robin and falls
+    back to the primary when none is healthy or the replica cannot hand out a
+    connection. A background task marks replicas unhealthy while they are
+    unreachable or lag more than ``max_lag`` seconds behind the primary.
+    With ``read_your_writes`` repositories re-read rows missing on a replica
+    from the primary, so a task is visible right after it was submitted.
+    """
+
+    def __init__(
+        self,
+        primary: asyncpg.Pool,
+        replicas: list[asyncpg.Pool],
+        max_lag: float = 5.0,
+        health_check_interval: float = 2.0,
+        read_your_writes: bool = True,
+    ) -> None:
+        self.primary = primary
+        self.replicas = [_Replica(f"replica-{i}", pool) for i, pool in enumerate(replicas)]
+        self.max_lag = max_lag
+        self.health_check_interval = health_check_interval
+        self.read_your_writes = read_your_writes
+        self._round_robin = itertools.cycle(self.replicas) if self.replicas else None
+        self._health_task: asyncio.Task | None = None
+        DB_POOL_HEALTHY.labels(pool=PRIMARY).set(1)
+        for replica in self.replicas:
+            DB_POOL_HEALTHY.labels(pool=replica.name).set(1)
+
+    @property
+    def pools(self) -> list[asyncpg.Pool]:
+        return [self.primary] + [replica.pool for replica in self.replicas]
+
+    def get_min_size(self) -> int:
+        return self.primary.get_min_size()
+
+    def _pick_replica(self) -> _Replica | None:
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if replica.healthy:
+                return replica
+        return None
+
+    def _mark(self, replica: _Replica, healthy: bool) -> None:
+        if replica.healthy != healthy:
+            logger.warning("Replica %s is now %s", replica.name, "healthy" if healthy else "unhealthy")
+        replica.healthy = healthy
+        DB_POOL_HEALTHY.labels(pool=replica.name).set(int(healthy))
+
+    @asynccontextmanager
+    async def acquire(
+        self, *, timeout: float | None = None, readonly: bool = False
+    ) -> AsyncIterator[asyncpg.Connection]:
+        replica = self._pick_replica() if readonly and self.replicas else None
+        if readonly and self.replicas and replica is None:
+            DB_READ_FALLBACK_TOTAL.labels(reason="no_healthy_replica").inc()
+
+        if replica is not None:
+            try:
+                connection = await replica.pool.acquire(timeout=timeout)
+            except asyncio.TimeoutError:
+                raise
+            except _CONNECTION_ERRORS as e:
+                logger.warning("Replica %s unavailable, reading from primary: %s", replica.name, e)
+                self._mark(replica, False)
+                DB_READ_FALLBACK_TOTAL.labels(reason="acquire_error").inc()
+            else:
+                DB_POOL_ACQUIRES_TOTAL.labels(pool=replica.name).inc()
+                try:
+                    yield connection
+                finally:
+                    await replica.pool.release(connection)
+                return
+
+        DB_POOL_ACQUIRES_TOTAL.labels(pool=PRIMARY).inc()
+        async with self.primary.acquire(timeout=timeout) as connection:
+            yield connection
+
+    async def check_replicas(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.pool.acquire(timeout=self.health_check_interval) as conn:
+                    replica.lag = float(
+                        await conn.fetchval(REPLICA_LAG_QUERY, timeout=self.health_check_interval)
+                    )
+            except Exception as e:
+                logger.warning("Replica %s health check failed: %s", replica.name, e)
+                self._mark(replica, False)
+                continue
+            DB_REPLICA_LAG.labels(pool=replica.name).set(replica.lag)
+            self._mark(replica, replica.lag <= self.max_lag)
+
+    def _export_pool_sizes(self) -> None:
+        for name, pool in [(PRIMARY, self.primary)] + [(r.name, r.pool) for r in self.replicas]:
+            idle = pool.get_idle_size()
+            DB_POOL_CONNECTIONS.labels(pool=name, state="idle").set(idle)
+            DB_POOL_CONNECTIONS.labels(pool=name, state="busy").set(pool.get_size() - idle)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_replicas()
+            self._export_pool_sizes()
+            await asyncio.sleep(self.health_check_interval)
+
+    def start(self) -> None:
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.gather(*(pool.close() for pool in self.pools))
+
+
+async def create_database_pool(settings: Settings) -> asyncpg.Pool | RoutingPool:
+    """A plain pool when no replicas are configured, otherwise a ``RoutingPool``."""
+    primary = await asyncpg.create_pool(
+        settings.database_dsn,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+    )
+    if not settings.database_replica_urls:
+        return primary
+    replicas = [
+        await asyncpg.create_pool(
+            url.split("?")[0],
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+        )
+        for url in settings.database_replica_urls
+    ]
+    pool = RoutingPool(
+        primary,
+        replicas,
+        max_lag=settings.database_replica_max_lag_seconds,
+        health_check_interval=settings.database_replica_check_interval_seconds,
+        read_your_writes=settings.database_read_your_writes,
+    )
+    pool.start()
+    return pool
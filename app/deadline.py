@@ -0,0 +1,115 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Iterator, TypeVar
+
+from fastapi import HTTPException, Request
+
+from app.config import Settings
+from app.exceptions import DeadlineExceeded
+from app.telemetry.metrics import DEADLINE_EXCEEDED_TOTAL
+
+T = TypeVar("T")
+
+# Monotonic time by which the current request must finish; None outside requests (e.g. the worker).
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> float | None:
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[None]:
+    """Run the enclosed code with a deadline ``timeout`` seconds from now."""
+    token = _deadline.set(time.monotonic() + timeout)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def exceeded(stage: str) -> DeadlineExceeded:
+    DEADLINE_EXCEEDED_TOTAL.labels(stage=stage).inc()
+    return DeadlineExceeded(stage)
+
+
+def stage_timeout(stage: str) -> float | None:
+    """Seconds left for ``stage``; raises ``DeadlineExceeded`` if none are left."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise exceeded(stage)
+    return left
+
+
+async def run_with_deadline(stage: str, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable`` but give up on it once the request deadline passes.
+
+    Work that cannot be cancelled, such as an executor thread, keeps running
+    in the background; only the request stops waiting for it.
+    """
+    try:
+        timeout = stage_timeout(stage)
+    except DeadlineExceeded:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise exceeded(stage) from None
+
+
+class DeadlinePolicy:
+    def __init__(
+        self,
+        default_ms: int,
+        route_ms: dict[str, int] | None = None,
+        max_ms: int | None = None,
+        header: str = "X-Request-Timeout-Ms",
+    ) -> None:
+        self.default_ms = default_ms
+        self.route_ms = route_ms or {}
+        self.max_ms = max_ms
+        self.header = header
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "DeadlinePolicy":
+        return cls(
+            default_ms=settings.request_timeout_ms,
+            route_ms=settings.request_timeout_route_ms,
+            max_ms=settings.request_timeout_max_ms,
+            header=settings.request_timeout_header,
+        )
+
+    def timeout_ms(self, route: str, header_value: str | None) -> int:
+        timeout = self.route_ms.get(route, self.default_ms)
+        if header_value is not None:
+            timeout = int(header_value)
+        if self.max_ms is not None:
+            timeout = min(timeout, self.max_ms)
+        return timeout
+
+
+def request_deadline(route: str):
+    """Route dependency setting the request deadline from the header or the route default."""
+
+    async def dependency(request: Request) -> AsyncIterator[None]:
+        policy = getattr(request.app.state, "deadline_policy", None) or DeadlinePolicy(default_ms=0)
+        header_value = request.headers.get(policy.header)
+        if header_value is not None and not (header_value.isdigit() and int(header_value) > 0):
+            raise HTTPException(status_code=400, detail=f"Invalid {policy.header} header")
+        timeout_ms = policy.timeout_ms(route, header_value)
+        if timeout_ms <= 0:
+            yield
+            return
+        with deadline_scope(timeout_ms / 1000):
+            yield
+
+    return dependency
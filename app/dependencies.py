@@ -2,9 +2,11 @@ import logging
 
 from fastapi import HTTPException, Request
 
+from app.cache import ResultCache
 from app.clients.kafka import KafkaProducerClient
 from app.model import ModelManager
-from app.repositories import AdRepository, ModerationRepository, UserRepository
+from app.registry import ModelRegistry, requested_model
+from app.repositories import AdFeatureRepository, AdRepository, ModerationRepository, UserRepository
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,12 @@ async def get_model_manager(request: Request) -> ModelManager:
         logger.error("Model manager not initialized")
         raise HTTPException(status_code=503, detail="Model service is not available")
 
+    if isinstance(model_manager, ModelRegistry):
+        name = request.headers.get(model_manager.version_header)
+        if name is not None and name not in model_manager.model_paths:
+            raise HTTPException(status_code=400, detail=f"Unknown model version: {name}")
+        requested_model.set(name)
+
     return model_manager
 
 
@@ -27,9 +35,20 @@ async def get_ad_repository(request: Request) -> AdRepository:
     return request.app.state.ad_repository
 
 
+async def get_ad_feature_repository(request: Request) -> AdFeatureRepository | None:
+    """``None`` unless precomputed features are enabled."""
+    return getattr(request.app.state, "ad_feature_repository", None)
+
+
 async def get_moderation_repository(request: Request) -> ModerationRepository:
     return request.app.state.moderation_repository
 
 
 async def get_kafka_producer(request: Request) -> KafkaProducerClient:
+    if not getattr(request.app.state, "kafka_enabled", True):
+        raise HTTPException(status_code=503, detail="Asynchronous moderation is disabled")
     return request.app.state.kafka_producer
+
+
+async def get_result_cache(request: Request) -> ResultCache:
+    return request.app.state.result_cache
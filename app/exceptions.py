@@ -10,3 +10,19 @@ class AdvertisementNotFoundError(Exception):
     def __init__(self, item_id: int) -> None:
         super().__init__(f"Advertisement not found: item_id={item_id}")
         self.item_id = item_id
+
+
+class InvalidMessageError(ValueError):
+    pass
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, route: str) -> None:
+        super().__init__(f"Admission rejected: route={route}")
+        self.route = route
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Request deadline exceeded: stage={stage}")
+        self.stage = stage
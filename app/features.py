@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+from app.config import Settings
+from app.model import FEATURE_DTYPE, ModelManager
+from app.repositories.ad_feature_repository import FEATURE_COLUMNS, AdFeatureRepository
+from app.telemetry.metrics import FEATURE_SCORE_REQUESTS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+async def feature_repository_for(pool, settings: Settings) -> AdFeatureRepository | None:
+    """The repository when precomputed features are enabled and ``ad_features`` is kept in sync."""
+    if not settings.precomputed_features_enabled:
+        return None
+    repository = AdFeatureRepository(pool)
+    if not await repository.sync_enabled():
+        # Unmaintained rows would serve scores of outdated features.
+        logger.error(
+            "PRECOMPUTED_FEATURES_ENABLED is set but ad_features is not kept in sync; "
+            "run scripts/ad_features.py enable. Falling back to joins."
+        )
+        return None
+    return repository
+
+
+async def predict_with_features(
+    item_id: int,
+    model_manager: ModelManager,
+    feature_repository: AdFeatureRepository,
+) -> Dict[str, Any] | None:
+    """Score an ad from its ``ad_features`` row; ``None`` if the row does not exist
+    or the model depends on the ad's raw category.
+
+    A score stored by the currently loaded model version is returned as is,
+    otherwise the stored features are scored and the result is written back.
+    """
+    # Stored features are normalized, so a model chosen by category cannot be resolved from them.
+    manager = await model_manager.resolve()
+    if manager is None:
+        return None
+
+    row = await feature_repository.get(item_id)
+    if row is None:
+        FEATURE_SCORE_REQUESTS_TOTAL.labels(outcome="not_found").inc()
+        return None
+
+    version = manager.version
+    if version is not None and row["model_version"] == version and row["probability"] is not None:
+        FEATURE_SCORE_REQUESTS_TOTAL.labels(outcome="hit").inc()
+        return {"is_violation": row["is_violation"], "probability": row["probability"]}
+
+    FEATURE_SCORE_REQUESTS_TOTAL.labels(outcome="miss").inc()
+    features = np.array([[row[column] for column in FEATURE_COLUMNS]], dtype=FEATURE_DTYPE)
+    result = await manager.predict_features(features)
+    if version is not None:
+        try:
+            await feature_repository.save_score(row, version, result["is_violation"], result["probability"])
+        except Exception as e:
+            # The score is still valid for this request; the next one recomputes it.
+            logger.warning("Failed to store score for item_id=%s: %s", item_id, e)
+    return result
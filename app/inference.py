@@ -0,0 +1,191 @@
+import abc
+import asyncio
+import logging
+import pickle
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import numpy as np
+
+from app.config import Settings
+from app.telemetry.metrics import (
+    INFERENCE_QUEUE_DEPTH,
+    INFERENCE_UTILIZATION,
+    INFERENCE_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BACKENDS = ("inline", "thread", "process")
+
+
+def positive_proba(model: Any, features: np.ndarray) -> np.ndarray:
+    return model.predict_proba(features)[:, 1]
+
+
+class InlineBackend:
+    """Runs the model on the event loop thread; only for models that predict in microseconds."""
+
+    name = "inline"
+
+    def load(self, model_path: str) -> None:
+        pass
+
+    async def predict_proba(self, model: Any, features: np.ndarray) -> np.ndarray:
+        return positive_proba(model, features)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class _ExecutorBackend(abc.ABC):
+    """Tracks in-flight calls of an executor to export queue depth and utilization."""
+
+    name = "executor"
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._executor: Executor | None = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+        INFERENCE_WORKERS.labels(backend=self.name).set(max_workers)
+
+    @abc.abstractmethod
+    def _create_executor(self, model_path: str) -> Executor:
+        ...
+
+    def load(self, model_path: str) -> None:
+        previous, self._executor = self._executor, self._create_executor(model_path)
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    def _update(self, delta: int) -> None:
+        with self._lock:
+            self._inflight += delta
+            inflight = self._inflight
+        INFERENCE_QUEUE_DEPTH.labels(backend=self.name).set(max(inflight - self.max_workers, 0))
+        INFERENCE_UTILIZATION.labels(backend=self.name).set(min(inflight, self.max_workers) / self.max_workers)
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        if self._executor is None:
+            raise RuntimeError(f"{self.name} inference backend is not loaded")
+        self._update(1)
+        future = self._executor.submit(func, *args)
+        # Counted until the work itself finishes, even if the caller stopped waiting.
+        future.add_done_callback(lambda _: self._update(-1))
+        return future
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class ThreadPoolBackend(_ExecutorBackend):
+    """Dedicated, sized thread pool instead of the loop's shared default executor."""
+
+    name = "thread"
+
+    def __init__(self, max_workers: int) -> None:
+        super().__init__(max_workers)
+        self._executor = self._create_executor()
+
+    def _create_executor(self, model_path: str | None = None) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+
+    def load(self, model_path: str) -> None:
+        # Threads share the manager's model object, so a reload needs no new pool.
+        if self._executor is None:
+            self._executor = self._create_executor()
+
+    async def predict_proba(self, model: Any, features: np.ndarray) -> np.ndarray:
+        return await asyncio.wrap_future(self._submit(positive_proba, model, features))
+
+
+_worker_model: Any = None
+
+
+def _init_worker(model_path: str) -> None:
+    global _worker_model
+    with open(model_path, "rb") as f:
+        _worker_model = pickle.load(f)
+
+
+def _predict_in_worker(features: np.ndarray) -> np.ndarray:
+    return positive_proba(_worker_model, features)
+
+
+def _predict_shared_in_worker(name: str, shape: tuple[int, ...], dtype: str) -> np.ndarray:
+    from multiprocessing.shared_memory import SharedMemory
+
+    shm = SharedMemory(name=name)
+    try:
+        return positive_proba(_worker_model, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    finally:
+        shm.close()
+
+
+class ProcessPoolBackend(_ExecutorBackend):
+    """Worker processes each holding their own copy of the model, free of the GIL.
+
+    Feature matrices of at least ``shared_memory_min_bytes`` go through shared
+    memory instead of being pickled into the task; smaller ones are cheaper
+    to pickle than to map.
+    """
+
+    name = "process"
+
+    def __init__(
+        self, max_workers: int, shared_memory_min_bytes: int = 64 * 1024, start_method: str = "spawn"
+    ) -> None:
+        # multiprocessing is imported here so the other backends never load it.
+        import multiprocessing
+
+        super().__init__(max_workers)
+        self.shared_memory_min_bytes = shared_memory_min_bytes
+        self._context = multiprocessing.get_context(start_method)
+
+    def _create_executor(self, model_path: str) -> Executor:
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(model_path,),
+        )
+
+    async def predict_proba(self, model: Any, features: np.ndarray) -> np.ndarray:
+        if features.nbytes < self.shared_memory_min_bytes:
+            return await asyncio.wrap_future(self._submit(_predict_in_worker, features))
+
+        from multiprocessing.shared_memory import SharedMemory
+
+        shm = SharedMemory(create=True, size=features.nbytes)
+        try:
+            np.ndarray(features.shape, dtype=features.dtype, buffer=shm.buf)[:] = features
+            future = self._submit(_predict_shared_in_worker, shm.name, features.shape, features.dtype.str)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        # The segment must outlive the task even if the caller stops waiting.
+        future.add_done_callback(lambda _: (shm.close(), shm.unlink()))
+        return await asyncio.wrap_future(future)
+
+
+def build_inference_backend(settings: Settings):
+    if settings.inference_backend == "inline":
+        return InlineBackend()
+    if settings.inference_backend == "thread":
+        return ThreadPoolBackend(settings.inference_workers)
+    if settings.inference_backend == "process":
+        return ProcessPoolBackend(settings.inference_workers, settings.inference_shared_memory_min_bytes)
+    raise ValueError(
+        f"Unknown inference backend: {settings.inference_backend}, expected one of {INFERENCE_BACKENDS}"
+    )
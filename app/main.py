@@ -1,16 +1,27 @@
 from contextlib import asynccontextmanager
 import logging
 
-import asyncpg
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 
+from app.admission import build_limiters
+from app.cache import ResultCache
 from app.config import Settings
+from app.database import create_database_pool
+from app.deadline import DeadlinePolicy
+from app.exceptions import DeadlineExceeded
+from app.features import feature_repository_for
+from app.inference import build_inference_backend
 from app.model import ModelManager
+from app.registry import ModelRegistry
 from app.routes import prediction, health, moderation
 from app.repositories import UserRepository, AdRepository, ModerationRepository
 from app.clients.kafka import create_kafka_producer
+from app.serialization import FastJSONResponse
+from app.shadow import start_shadow
 from app.telemetry.middleware import PrometheusMiddleware, metrics_endpoint
 from app.telemetry.sentry import init_sentry
+from app.telemetry.startup import StartupProfile
+from app.warmup import Readiness, warm_model, warm_pool
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -18,28 +29,75 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    settings = Settings()
+    profile = StartupProfile()
+    app.state.startup_profile = profile
     pool = None
     kafka_producer = None
+    model_manager = None
+    shadow = None
 
-    init_sentry(settings.sentry_dsn, settings.environment)
+    with profile.phase("settings"):
+        settings = Settings()
+    readiness = Readiness(check_timeout=settings.readiness_check_timeout_ms / 1000)
+    app.state.readiness = readiness
 
-    try:
-        model_manager = ModelManager()
-        await model_manager.initialize()
-        app.state.model_manager = model_manager
+    with profile.phase("sentry"):
+        init_sentry(settings.sentry_dsn, settings.environment)
 
-        pool = await asyncpg.create_pool(
-            settings.database_dsn, min_size=2, max_size=10
-        )
+    try:
+        with profile.phase("model"):
+            model_manager = ModelManager(
+                model_path=settings.model_path, backend=build_inference_backend(settings)
+            )
+            await model_manager.initialize()
+            if settings.model_registry:
+                model_manager = ModelRegistry.from_settings(model_manager, settings)
+                await model_manager.initialize()
+            app.state.model_manager = model_manager
+
+        with profile.phase("db_pool"):
+            pool = await create_database_pool(settings)
+        app.state.db_pool = pool
         app.state.user_repository = UserRepository(pool)
         app.state.ad_repository = AdRepository(pool)
         app.state.moderation_repository = ModerationRepository(pool)
+        app.state.ad_feature_repository = await feature_repository_for(pool, settings)
+        app.state.result_cache = ResultCache(
+            settings.result_cache_size, settings.result_cache_max_age_seconds
+        )
 
-        kafka_producer = create_kafka_producer(settings)
-        await kafka_producer.start()
-        app.state.kafka_producer = kafka_producer
-
+        app.state.limiters = build_limiters(settings)
+        app.state.deadline_policy = DeadlinePolicy.from_settings(settings)
+
+        app.state.kafka_enabled = settings.kafka_enabled
+        if settings.kafka_enabled:
+            with profile.phase("kafka"):
+                kafka_producer = create_kafka_producer(settings)
+                await kafka_producer.start()
+            app.state.kafka_producer = kafka_producer
+
+        if settings.warmup_enabled:
+            with profile.phase("warmup"):
+                async with readiness.phase("model"):
+                    await warm_model(model_manager, settings.warmup_predictions)
+                async with readiness.phase("database"):
+                    repositories = [
+                        app.state.user_repository,
+                        app.state.ad_repository,
+                        app.state.moderation_repository,
+                        app.state.ad_feature_repository,
+                    ]
+                    await warm_pool(pool, [r for r in repositories if r is not None])
+                if kafka_producer:
+                    async with readiness.phase("kafka"):
+                        await kafka_producer.fetch_metadata()
+        readiness.warmed_up = True
+
+        # After warmup, so synthetic warmup predictions are not compared.
+        with profile.phase("shadow"):
+            shadow = await start_shadow(model_manager, settings)
+
+        profile.finish()
         logger.info("Application started")
     except Exception as e:
         logger.critical("Critical failure: %s", str(e))
@@ -47,10 +105,14 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    if shadow:
+        await shadow.stop()
     if kafka_producer:
         await kafka_producer.stop()
     if pool:
         await pool.close()
+    if model_manager:
+        model_manager.close()
     logger.info("Application stopped")
 
 
@@ -59,6 +121,7 @@ app = FastAPI(
     description="ML-powered service for detecting violations in advertisements",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(PrometheusMiddleware)
@@ -66,6 +129,14 @@ app.add_middleware(PrometheusMiddleware)
 app.get("/metrics", include_in_schema=False)(metrics_endpoint)
 
 
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded) -> FastJSONResponse:
+    logger.warning("Deadline exceeded path=%s stage=%s", request.url.path, exc.stage)
+    return FastJSONResponse(
+        status_code=504, content={"detail": "Request deadline exceeded", "stage": exc.stage}
+    )
+
+
 @app.get("/", tags=["root"])
 async def root():
     return {"message": "Welcome to Ad Moderation Service API"}
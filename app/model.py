@@ -1,12 +1,15 @@
+import hashlib
 import pickle
 import os
 import logging
-import asyncio
-from typing import Dict, Any
+import struct
+from typing import Any, Dict, Sequence, Tuple
 
 import numpy as np
 
-from app.exceptions import ModelIsNotAvailable, ErrorInPrediction
+from app.deadline import run_with_deadline
+from app.inference import ThreadPoolBackend
+from app.exceptions import DeadlineExceeded, ModelIsNotAvailable, ErrorInPrediction
 from app.telemetry.metrics import (
     PREDICTIONS_TOTAL,
     PREDICTION_DURATION,
@@ -18,20 +21,130 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_MODEL_PATH = "models/model.pkl"
 
+FEATURE_DTYPE = np.float32
+
+# Upper clip bound of each model input column, which is also its scale.
+FEATURE_LIMITS = np.array([1.0, 10.0, 1000.0, 100.0])
+_FEATURE_LIMIT_VALUES = tuple(FEATURE_LIMITS.tolist())
+
+FEATURE_RECORD_COLUMNS = ("is_verified", "images_qty", "description_length", "category")
+
+# COPY (SELECT u.is_verified, a.images_qty, length(a.description), a.category ...) TO STDOUT (FORMAT binary)
+# rows: field count, then a length-prefixed bool and three int4 values, all big-endian.
+_COPY_ROW = np.dtype([
+    ("fields", ">i2"),
+    ("verified_len", ">i4"), ("is_verified", "u1"),
+    ("images_len", ">i4"), ("images_qty", ">i4"),
+    ("description_len", ">i4"), ("description_length", ">i4"),
+    ("category_len", ">i4"), ("category", ">i4"),
+])
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_FIELD_LENGTHS = {"verified_len": 1, "images_len": 4, "description_len": 4, "category_len": 4}
+
+
+def _normalize(columns: np.ndarray) -> np.ndarray:
+    """Clip and scale a float64 ``(n, 4)`` matrix in place, then narrow it to ``FEATURE_DTYPE``."""
+    np.minimum(columns, FEATURE_LIMITS, out=columns)
+    columns /= FEATURE_LIMITS
+    return columns.astype(FEATURE_DTYPE)
+
+
+def prepare_features_batch(
+    is_verified_seller: Sequence | np.ndarray,
+    images_qty: Sequence | np.ndarray,
+    description_length: Sequence | np.ndarray,
+    category: Sequence | np.ndarray,
+) -> np.ndarray:
+    """Model input matrix for many ads at once, one row per element of the equally long columns."""
+    columns = np.empty((len(images_qty), len(FEATURE_LIMITS)), dtype=np.float64)
+    for i, values in enumerate((is_verified_seller, images_qty, description_length, category)):
+        columns[:, i] = values
+    return _normalize(columns)
+
+
+def features_from_records(records: Sequence, columns: Sequence[str] = FEATURE_RECORD_COLUMNS) -> np.ndarray:
+    """Model input matrix from asyncpg records (or mappings) holding the four ``columns``."""
+    count = len(records)
+    return prepare_features_batch(
+        *(np.fromiter((record[column] for record in records), dtype=np.float64, count=count) for column in columns)
+    )
+
+
+def features_from_copy_binary(data: bytes) -> np.ndarray:
+    """Model input matrix from a binary ``COPY`` of non-null is_verified, images_qty, length, category."""
+    if not data.startswith(_COPY_SIGNATURE):
+        raise ValueError("Not a binary COPY result")
+    header_extension = struct.unpack_from(">i", data, len(_COPY_SIGNATURE) + 4)[0]
+    start = len(_COPY_SIGNATURE) + 8 + header_extension
+    body = memoryview(data)[start:len(data) - 2]  # without the -1 trailer
+    if len(body) % _COPY_ROW.itemsize:
+        raise ValueError("Binary COPY rows do not match the feature layout")
+    rows = np.frombuffer(body, dtype=_COPY_ROW)
+    if np.any(rows["fields"] != 4) or any(
+        np.any(rows[field] != length) for field, length in _COPY_FIELD_LENGTHS.items()
+    ):
+        raise ValueError("Binary COPY rows do not match the feature layout")
+    return prepare_features_batch(
+        rows["is_verified"], rows["images_qty"], rows["description_length"], rows["category"]
+    )
+
+
+# (model, version) unpickled before the server forks, shared copy-on-write by its workers.
+PRELOADED_MODELS: Dict[str, Tuple[Any, str]] = {}
+
+
+def _version_of(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _read_model(path: str) -> Tuple[Any, str]:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file not found: {path}. Run scripts/train_model.py first.")
+    with open(path, "rb") as f:
+        data = f.read()
+    return pickle.loads(data), _version_of(data)
+
+
+def model_version(path: str = DEFAULT_MODEL_PATH) -> str:
+    """Content hash of the model file, stable across copies and renames."""
+    with open(path, "rb") as f:
+        return _version_of(f.read())
+
+
+def preload_model(path: str = DEFAULT_MODEL_PATH) -> Any:
+    PRELOADED_MODELS[path] = _read_model(path)
+    logger.info("Model preloaded from %s", path)
+    return PRELOADED_MODELS[path][0]
+
 
 class ModelManager:
-    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, threshold: float = 0.5):
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH, threshold: float = 0.5, backend=None):
         self.model = None
+        self.version: str | None = None
         self.model_path = model_path
         self.threshold = threshold
+        self._backend = backend
+        # ShadowScorer receiving every prediction, if a candidate model is being evaluated.
+        self.shadow = None
+
+    @property
+    def backend(self):
+        # Created on first use, so managers handed a backend never start a pool of their own.
+        if self._backend is None:
+            self._backend = ThreadPoolBackend(max_workers=4)
+        return self._backend
 
     def load(self, path: str | None = None) -> None:
         path = path or self.model_path
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Model file not found: {path}. Run scripts/train_model.py first.")
-        with open(path, "rb") as f:
-            self.model = pickle.load(f)
-        logger.info("Model loaded from %s", path)
+        preloaded = PRELOADED_MODELS.get(path)
+        self.model, self.version = preloaded if preloaded is not None else _read_model(path)
+        self.backend.load(path)
+        logger.info(
+            "Model %s from %s using %s inference backend",
+            "reused" if preloaded is not None else "loaded",
+            path,
+            self.backend.name,
+        )
 
     @staticmethod
     def prepare_features(
@@ -40,11 +153,21 @@ class ModelManager:
         description_length: int,
         category: int,
     ) -> np.ndarray:
-        is_verified = float(is_verified_seller)
-        images = min(images_qty, 10) / 10.0
-        desc_len = min(description_length, 1000) / 1000.0
-        cat = min(category, 100) / 100.0
-        return np.array([[is_verified, images, desc_len, cat]])
+        """One-row variant of ``prepare_features_batch``.
+
+        Same float64 clip and divide followed by the float32 cast, done on
+        Python floats because ufunc dispatch dominates for a single row.
+        """
+        verified_limit, images_limit, description_limit, category_limit = _FEATURE_LIMIT_VALUES
+        return np.array(
+            [[
+                min(float(is_verified_seller), verified_limit) / verified_limit,
+                min(images_qty, images_limit) / images_limit,
+                min(description_length, description_limit) / description_limit,
+                min(category, category_limit) / category_limit,
+            ]],
+            dtype=FEATURE_DTYPE,
+        )
 
     async def predict(
         self,
@@ -53,36 +176,50 @@ class ModelManager:
         description_length: int,
         category: int,
     ) -> Dict[str, Any]:
-        if self.model is None:
-            PREDICTION_ERRORS_TOTAL.labels(error_type="model_unavailable").inc()
-            raise ModelIsNotAvailable("Model is not loaded")
-
         features = self.prepare_features(
             is_verified_seller, images_qty, description_length, category
         )
-        loop = asyncio.get_running_loop()
+        return await self.predict_features(features)
+
+    async def predict_features(self, features: np.ndarray) -> Dict[str, Any]:
+        """Predict from a single already normalized row, as built by ``prepare_features``."""
+        if self.model is None:
+            PREDICTION_ERRORS_TOTAL.labels(error_type="model_unavailable").inc()
+            raise ModelIsNotAvailable("Model is not loaded")
 
         try:
             with PREDICTION_DURATION.time():
-                violation_proba = await loop.run_in_executor(
-                    None,
-                    lambda: self.model.predict_proba(features)[0, 1],
+                probabilities = await run_with_deadline(
+                    "inference", self.backend.predict_proba(self.model, features)
                 )
+            violation_proba = probabilities[0]
+        except DeadlineExceeded:
+            raise
         except Exception as exc:
             PREDICTION_ERRORS_TOTAL.labels(error_type="prediction_error").inc()
             raise ErrorInPrediction(str(exc)) from exc
 
-        is_violation = violation_proba > self.threshold
+        is_violation = bool(violation_proba > self.threshold)
         result_label = "violation" if is_violation else "no_violation"
 
         PREDICTIONS_TOTAL.labels(result=result_label).inc()
         MODEL_PREDICTION_PROBABILITY.observe(float(violation_proba))
+        if self.shadow is not None:
+            self.shadow.offer(features, float(violation_proba))
 
         return {
             "is_violation": is_violation,
             "probability": float(violation_proba),
         }
 
+    async def resolve(self, category: int | None = None) -> "ModelManager":
+        """The manager serving a request; always this one, see ``ModelRegistry.resolve``."""
+        return self
+
+    def close(self) -> None:
+        if self._backend is not None:
+            self._backend.shutdown()
+
     async def initialize(self) -> None:
         try:
             self.load()
@@ -0,0 +1,231 @@
+"""Several models behind the ``ModelManager`` interface.
+
+The default model is loaded at startup and never evicted. Named models are
+loaded on first use and kept in LRU order under a memory budget. A request
+picks its model by the version header, else by the ad's category, else the
+default model serves it.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict
+
+import numpy as np
+
+from app.config import Settings
+from app.exceptions import ModelIsNotAvailable
+from app.inference import ProcessPoolBackend, ThreadPoolBackend
+from app.model import ModelManager
+from app.telemetry.metrics import (
+    MODEL_EVICTIONS_TOTAL,
+    MODEL_LOAD_DURATION,
+    MODEL_REQUESTS_TOTAL,
+    MODEL_RESIDENT_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "default"
+
+# Model name from the request's version header, set by the model manager dependency.
+requested_model: ContextVar[str | None] = ContextVar("requested_model", default=None)
+
+
+def parse_category_routes(routes: Dict[str, str]) -> list[tuple[int, int, str]]:
+    """``{"1-10": "goods", "42": "cars"}`` -> inclusive ``(low, high, model)`` ranges."""
+    parsed = []
+    for key, model in routes.items():
+        low, _, high = key.partition("-")
+        parsed.append((int(low), int(high or low), model))
+    return sorted(parsed)
+
+
+class _Entry:
+    def __init__(self, manager: ModelManager, size_bytes: int, load_seconds: float) -> None:
+        self.manager = manager
+        self.size_bytes = size_bytes
+        self.load_seconds = load_seconds
+        self.requests = 0
+
+
+def _size_of(manager: ModelManager) -> int:
+    """Approximate resident size of a model: its artifact's size, else its numpy arrays."""
+    try:
+        return os.path.getsize(manager.model_path)
+    except OSError:
+        attributes = getattr(manager.model, "__dict__", {}).values()
+        return sum(value.nbytes for value in attributes if isinstance(value, np.ndarray))
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        default: ModelManager,
+        model_paths: Dict[str, str],
+        category_routes: Dict[str, str] | None = None,
+        memory_budget_bytes: int = 512 * 1024 * 1024,
+        version_header: str = "X-Model-Version",
+        backend=None,
+    ) -> None:
+        self.default = default
+        self.version_header = version_header
+        self.model_paths = {DEFAULT_MODEL: default.model_path, **model_paths}
+        self.category_routes = parse_category_routes(category_routes or {})
+        unknown = {model for _, _, model in self.category_routes} - self.model_paths.keys()
+        if unknown:
+            raise ValueError(f"Category routes refer to unknown models: {sorted(unknown)}")
+        self.memory_budget_bytes = memory_budget_bytes
+        # Lazily loaded models pass the model object to the backend, which the
+        # process backend cannot do; they share a thread pool instead.
+        self._backend = backend or default.backend
+        self._owns_backend = False
+        if isinstance(self._backend, ProcessPoolBackend):
+            self._backend = ThreadPoolBackend(self._backend.max_workers)
+            self._owns_backend = True
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @classmethod
+    def from_settings(cls, default: ModelManager, settings: Settings) -> "ModelRegistry":
+        return cls(
+            default,
+            settings.model_registry,
+            settings.model_category_routes,
+            memory_budget_bytes=int(settings.model_memory_budget_mb * 1024 * 1024),
+            version_header=settings.model_version_header,
+        )
+
+    # ModelManager interface, answered by the default model where there is no request context.
+
+    @property
+    def model(self) -> Any:
+        return self.default.model
+
+    @property
+    def version(self) -> str | None:
+        return self.default.version
+
+    @property
+    def backend(self):
+        return self.default.backend
+
+    @property
+    def threshold(self) -> float:
+        return self.default.threshold
+
+    prepare_features = staticmethod(ModelManager.prepare_features)
+
+    async def initialize(self) -> None:
+        if self.default.model is None:
+            await self.default.initialize()
+        self._register(DEFAULT_MODEL, self.default, 0.0)
+
+    async def predict(
+        self,
+        is_verified_seller: bool,
+        images_qty: int,
+        description_length: int,
+        category: int,
+    ) -> Dict[str, Any]:
+        manager = await self.resolve(category)
+        return await manager.predict(is_verified_seller, images_qty, description_length, category)
+
+    async def predict_features(self, features: np.ndarray) -> Dict[str, Any]:
+        # Without a category, category routes cannot apply; the default model serves.
+        manager = await self.resolve() or self.default
+        return await manager.predict_features(features)
+
+    async def resolve(self, category: int | None = None) -> ModelManager | None:
+        """The model for the current request; ``None`` if it depends on an unknown category."""
+        name = self.route(category)
+        if name is None:
+            return None
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = await self._load(name)
+        else:
+            self._entries.move_to_end(name)
+        entry.requests += 1
+        MODEL_REQUESTS_TOTAL.labels(model=name).inc()
+        return entry.manager
+
+    def route(self, category: int | None = None) -> str | None:
+        name = requested_model.get()
+        if name is not None:
+            return name
+        if self.category_routes:
+            if category is None:
+                return None
+            for low, high, model in self.category_routes:
+                if low <= category <= high:
+                    return model
+        return DEFAULT_MODEL
+
+    def _register(self, name: str, manager: ModelManager, load_seconds: float) -> _Entry:
+        entry = _Entry(manager, _size_of(manager), load_seconds)
+        self._entries[name] = entry
+        MODEL_LOAD_DURATION.labels(model=name).set(load_seconds)
+        MODEL_RESIDENT_BYTES.labels(model=name).set(entry.size_bytes)
+        return entry
+
+    async def _load(self, name: str) -> _Entry:
+        if name not in self.model_paths:
+            raise ModelIsNotAvailable(f"Unknown model: {name}")
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                return entry
+            manager = ModelManager(self.model_paths[name], self.default.threshold, backend=self._backend)
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(manager.load)
+            except Exception as e:
+                raise ModelIsNotAvailable(f"Failed to load model {name}: {e}") from e
+            entry = self._register(name, manager, time.perf_counter() - start)
+            logger.info("Loaded model %s in %.1f ms, %d bytes", name, entry.load_seconds * 1000, entry.size_bytes)
+            self._evict(keep=name)
+            return entry
+
+    def _evict(self, keep: str) -> None:
+        while self.resident_bytes > self.memory_budget_bytes:
+            victim = next((name for name in self._entries if name not in (DEFAULT_MODEL, keep)), None)
+            if victim is None:
+                logger.warning("Model memory budget exceeded by pinned models: %d bytes", self.resident_bytes)
+                return
+            # Requests already holding the manager finish with it; it is freed afterwards.
+            del self._entries[victim]
+            MODEL_EVICTIONS_TOTAL.labels(model=victim).inc()
+            MODEL_RESIDENT_BYTES.labels(model=victim).set(0)
+            logger.info("Evicted model %s", victim)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    def report(self) -> dict:
+        models = {}
+        for name, path in self.model_paths.items():
+            entry = self._entries.get(name)
+            models[name] = {"path": path, "loaded": entry is not None}
+            if entry is not None:
+                models[name].update(
+                    version=entry.manager.version,
+                    size_bytes=entry.size_bytes,
+                    load_ms=round(entry.load_seconds * 1000, 3),
+                    requests=entry.requests,
+                )
+        return {
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": self.resident_bytes,
+            "models": models,
+        }
+
+    def close(self) -> None:
+        self.default.close()
+        if self._owns_backend:
+            self._backend.shutdown()
@@ -1,5 +1,6 @@
 from app.repositories.user_repository import UserRepository
 from app.repositories.ad_repository import AdRepository
-from app.repositories.moderation_repository import ModerationRepository
+from app.repositories.ad_feature_repository import AdFeatureRepository
+from app.repositories.moderation_repository import ModerationRepository, ResultFilter
 
-__all__ = ["UserRepository", "AdRepository", "ModerationRepository"]
+__all__ = ["UserRepository", "AdRepository", "AdFeatureRepository", "ModerationRepository", "ResultFilter"]
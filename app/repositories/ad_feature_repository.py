@@ -0,0 +1,115 @@
+import asyncpg
+
+from app.repositories.base import BaseRepository
+from app.telemetry.metrics import DB_QUERY_DURATION
+
+FEATURE_COLUMNS = ("is_verified", "images", "description_length", "category")
+
+SELECT_AD_FEATURES = """
+    SELECT ad_id, is_verified, images, description_length, category,
+           model_version, is_violation, probability
+    FROM ad_features
+    WHERE ad_id = $1
+"""
+
+SYNC_TRIGGERS = (("ads", "ads_refresh_features"), ("users", "users_refresh_features"))
+
+SELECT_SYNC_ENABLED = f"""
+    SELECT count(*) = {len(SYNC_TRIGGERS)} AND bool_and(tgenabled <> 'D')
+    FROM pg_trigger
+    WHERE tgrelid IN ('ads'::regclass, 'users'::regclass)
+      AND tgname IN ({", ".join(f"'{trigger}'" for _, trigger in SYNC_TRIGGERS)})
+"""
+
+# Same rule as the ads trigger: unchanged features keep their stored score.
+BACKFILL_AD_FEATURES = """
+    INSERT INTO ad_features (ad_id, user_id, is_verified, images, description_length, category)
+    SELECT ad_id, user_id, is_verified, images, description_length, category
+    FROM ad_feature_values
+    ON CONFLICT (ad_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        is_verified = EXCLUDED.is_verified,
+        images = EXCLUDED.images,
+        description_length = EXCLUDED.description_length,
+        category = EXCLUDED.category,
+        model_version = NULL,
+        is_violation = NULL,
+        probability = NULL,
+        scored_at = NULL
+    WHERE (ad_features.user_id, ad_features.is_verified, ad_features.images,
+           ad_features.description_length, ad_features.category)
+        IS DISTINCT FROM (EXCLUDED.user_id, EXCLUDED.is_verified, EXCLUDED.images,
+                          EXCLUDED.description_length, EXCLUDED.category)
+"""
+
+
+class AdFeatureRepository(BaseRepository):
+    """Normalized features and the last score per ad; rows are maintained by database triggers
+    that are off until ``enable_sync`` is called."""
+
+    warmup_queries = ((SELECT_AD_FEATURES, (0,)),)
+
+    async def get(self, ad_id: int) -> asyncpg.Record | None:
+        async def fetch(conn: asyncpg.Connection) -> asyncpg.Record | None:
+            with DB_QUERY_DURATION.labels(query_type="select").time():
+                return await conn.fetchrow(
+                    SELECT_AD_FEATURES,
+                    ad_id,
+                    timeout=self._query_timeout(),
+                )
+
+        return await self._read(fetch)
+
+    async def sync_enabled(self) -> bool:
+        async with self._connection() as conn:
+            return bool(await conn.fetchval(SELECT_SYNC_ENABLED))
+
+    async def enable_sync(self) -> int:
+        """Turn the triggers on and bring every row up to date; returns the number of rows written.
+
+        Both run in one transaction, which blocks writes to ``ads`` and ``users``
+        until the backfill is done, so no change falls between the two.
+        """
+        async with self._connection() as conn:
+            async with conn.transaction():
+                for table, trigger in SYNC_TRIGGERS:
+                    await conn.execute(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}")
+                status = await conn.execute(BACKFILL_AD_FEATURES)
+        return int(status.split()[-1])
+
+    async def disable_sync(self) -> None:
+        """Turn the triggers off; stored rows go stale until the next ``enable_sync``."""
+        async with self._connection() as conn:
+            async with conn.transaction():
+                for table, trigger in SYNC_TRIGGERS:
+                    await conn.execute(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}")
+
+    async def save_score(
+        self,
+        features: asyncpg.Record,
+        model_version: str,
+        is_violation: bool,
+        probability: float,
+    ) -> bool:
+        """Store a score computed from ``features``.
+
+        Nothing is written if the ad changed since ``features`` was read, so a
+        score never outlives the features it was computed from.
+        """
+        async with self._connection() as conn:
+            with DB_QUERY_DURATION.labels(query_type="update").time():
+                status = await conn.execute(
+                    """
+                    UPDATE ad_features
+                    SET model_version = $2, is_violation = $3, probability = $4, scored_at = NOW()
+                    WHERE ad_id = $1
+                      AND is_verified = $5 AND images = $6 AND description_length = $7 AND category = $8
+                    """,
+                    features["ad_id"],
+                    model_version,
+                    is_violation,
+                    probability,
+                    *(features[column] for column in FEATURE_COLUMNS),
+                    timeout=self._query_timeout(),
+                )
+        return status == "UPDATE 1"
@@ -1,11 +1,22 @@
+from typing import AsyncIterable, Iterable, Sequence
+
 import asyncpg
 
+from app.repositories.base import BULK_CHUNK_SIZE, BaseRepository
 from app.telemetry.metrics import DB_QUERY_DURATION
 
+SELECT_AD_WITH_USER = """
+    SELECT a.id, a.images_qty, a.description, a.category, u.is_verified
+    FROM ads a
+    JOIN users u ON a.user_id = u.id
+    WHERE a.id = $1
+"""
+
+AD_COLUMNS = ("user_id", "name", "description", "category", "images_qty")
 
-class AdRepository:
-    def __init__(self, pool: asyncpg.Pool):
-        self._pool = pool
+
+class AdRepository(BaseRepository):
+    warmup_queries = ((SELECT_AD_WITH_USER, (0,)),)
 
     async def create(
         self,
@@ -15,7 +26,7 @@ class AdRepository:
         category: int,
         images_qty: int = 0,
     ) -> int:
-        async with self._pool.acquire() as conn:
+        async with self._connection() as conn:
             with DB_QUERY_DURATION.labels(query_type="insert").time():
                 return await conn.fetchval(
                     """
@@ -28,17 +39,51 @@ class AdRepository:
                     description,
                     category,
                     images_qty,
+                    timeout=self._query_timeout(),
                 )
 
+    async def copy_many(
+        self, rows: Iterable[tuple] | AsyncIterable[tuple], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> int:
+        """Bulk load ``AD_COLUMNS`` tuples with ``COPY``; returns the number of rows."""
+        return await self._copy_chunks("ads", AD_COLUMNS, rows, chunk_size)
+
+    async def create_many(
+        self, rows: Iterable[tuple] | AsyncIterable[tuple], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> list[int]:
+        """Like ``copy_many`` but returns the new ids in input order."""
+        return await self._insert_chunks(
+            """
+            INSERT INTO ads (user_id, name, description, category, images_qty)
+            SELECT user_id, name, description, category, images_qty
+            FROM unnest($1::bigint[], $2::text[], $3::text[], $4::integer[], $5::integer[])
+                WITH ORDINALITY AS t(user_id, name, description, category, images_qty, ord)
+            ORDER BY ord
+            RETURNING id
+            """,
+            rows,
+            chunk_size,
+        )
+
     async def get_with_user_by_id(self, item_id: int) -> asyncpg.Record | None:
-        async with self._pool.acquire() as conn:
+        async def fetch(conn: asyncpg.Connection) -> asyncpg.Record | None:
             with DB_QUERY_DURATION.labels(query_type="select").time():
                 return await conn.fetchrow(
-                    """
-                    SELECT a.id, a.images_qty, a.description, a.category, u.is_verified
-                    FROM ads a
-                    JOIN users u ON a.user_id = u.id
-                    WHERE a.id = $1
-                    """,
+                    SELECT_AD_WITH_USER,
                     item_id,
+                    timeout=self._query_timeout(),
+                )
+
+        return await self._read(fetch)
+
+    async def get_existing_ids(self, item_ids: Sequence[int]) -> set[int]:
+        async def fetch(conn: asyncpg.Connection) -> set[int]:
+            with DB_QUERY_DURATION.labels(query_type="select").time():
+                rows = await conn.fetch(
+                    "SELECT id FROM ads WHERE id = ANY($1::bigint[])",
+                    list(item_ids),
+                    timeout=self._query_timeout(),
                 )
+            return {row["id"] for row in rows}
+
+        return await self._read(fetch, lambda existing: len(existing) == len(set(item_ids)))
@@ -0,0 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Sequence, TypeVar
+
+import asyncpg
+
+from app import deadline
+from app.database import RoutingPool
+from app.telemetry.metrics import DB_QUERY_DURATION, DB_READ_FALLBACK_TOTAL
+
+T = TypeVar("T")
+
+BULK_CHUNK_SIZE = 10_000
+
+
+async def iter_chunks(rows: Iterable[T] | AsyncIterable[T], size: int) -> AsyncIterator[list[T]]:
+    """Group a plain or async stream of rows into lists of at most ``size``."""
+    chunk: list[T] = []
+    if isinstance(rows, AsyncIterable):
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class BaseRepository:
+    """Pool access bounded by the current request deadline, if there is one."""
+
+    # Hot read-only statements with harmless arguments, run on every pooled
+    # connection during warmup so they are already in its statement cache.
+    warmup_queries: tuple[tuple[str, tuple], ...] = ()
+
+    def __init__(self, pool: asyncpg.Pool) -> None:
+        self._pool = pool
+
+    @property
+    def _routes_reads(self) -> bool:
+        return isinstance(self._pool, RoutingPool)
+
+    @asynccontextmanager
+    async def _connection(self, readonly: bool = False) -> AsyncIterator[asyncpg.Connection]:
+        """A pooled connection; ``readonly`` ones may come from a replica."""
+        options: dict[str, Any] = {"timeout": deadline.stage_timeout("db_acquire")}
+        if readonly and self._routes_reads:
+            options["readonly"] = True
+        acquired = False
+        try:
+            async with self._pool.acquire(**options) as conn:
+                acquired = True
+                yield conn
+        except asyncio.TimeoutError:
+            raise deadline.exceeded("db_query" if acquired else "db_acquire") from None
+
+    @staticmethod
+    def _query_timeout() -> float | None:
+        return deadline.stage_timeout("db_query")
+
+    async def _read(
+        self,
+        fetch: Callable[[asyncpg.Connection], Awaitable[T]],
+        is_complete: Callable[[T], bool] = lambda result: result is not None,
+        fetch_missing: Callable[[T, asyncpg.Connection], Awaitable[T]] | None = None,
+    ) -> T:
+        """Run ``fetch`` on a replica connection.
+
+        With read-your-writes enabled an incomplete result, such as a task
+        created a moment ago and not replicated yet, is fetched again from
+        the primary, or passed to ``fetch_missing`` to read only what is missing.
+        """
+        async with self._connection(readonly=True) as conn:
+            result = await fetch(conn)
+        if not is_complete(result) and self._routes_reads and self._pool.read_your_writes:
+            DB_READ_FALLBACK_TOTAL.labels(reason="read_your_writes").inc()
+            async with self._connection() as conn:
+                result = await (fetch(conn) if fetch_missing is None else fetch_missing(result, conn))
+        return result
+
+    async def _copy_chunks(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[tuple] | AsyncIterable[tuple],
+        chunk_size: int,
+    ) -> int:
+        """``COPY`` rows in chunks on one connection; each chunk commits on its own."""
+        copied = 0
+        async with self._connection() as conn:
+            async for chunk in iter_chunks(rows, chunk_size):
+                with DB_QUERY_DURATION.labels(query_type="copy").time():
+                    await conn.copy_records_to_table(
+                        table, records=chunk, columns=columns, timeout=self._query_timeout()
+                    )
+                copied += len(chunk)
+        return copied
+
+    async def _insert_chunks(
+        self,
+        sql: str,
+        rows: Iterable[tuple] | AsyncIterable[tuple],
+        chunk_size: int,
+    ) -> list[int]:
+        """Run an ``INSERT ... SELECT FROM unnest(...) RETURNING id`` per chunk.
+
+        ``sql`` takes one array parameter per column. Ids come from a sequence
+        consumed in insertion order, so sorting them per chunk restores the
+        order of ``rows``.
+        """
+        ids: list[int] = []
+        async with self._connection() as conn:
+            async for chunk in iter_chunks(rows, chunk_size):
+                with DB_QUERY_DURATION.labels(query_type="insert").time():
+                    records = await conn.fetch(
+                        sql, *(list(column) for column in zip(*chunk)), timeout=self._query_timeout()
+                    )
+                ids.extend(sorted(record["id"] for record in records))
+        return ids
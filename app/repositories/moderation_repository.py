@@ -1,16 +1,88 @@
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import AsyncIterator, Sequence
 
 import asyncpg
 
+from app.repositories.base import BaseRepository
 from app.telemetry.metrics import DB_QUERY_DURATION
 
+RESULT_COLUMNS = """
+    id, item_id, status, is_violation, probability,
+    error_message, created_at, processed_at
+"""
 
-class ModerationRepository:
-    def __init__(self, pool: asyncpg.Pool) -> None:
-        self._pool = pool
+# Ids are handed out from one sequence as rows are inserted with created_at = NOW(),
+# so the id marks around an id bound its created_at; the slack covers rows whose
+# transaction started a while before their id was taken. Comparing created_at with
+# these uncorrelated subqueries lets the executor prune the other partitions.
+ID_MARK_SLACK = "INTERVAL '1 hour'"
+
+
+def created_at_window(first_id: str, last_id: str) -> str:
+    """SQL condition bounding ``created_at`` of rows with ids from ``first_id`` to ``last_id``."""
+    return f"""created_at >= COALESCE(
+            (SELECT marked_at FROM moderation_results_id_marks
+             WHERE last_id < {first_id} ORDER BY last_id DESC LIMIT 1),
+            '-infinity'
+        ) - {ID_MARK_SLACK}
+        AND created_at <= COALESCE(
+            (SELECT marked_at FROM moderation_results_id_marks
+             WHERE last_id >= {last_id} ORDER BY last_id LIMIT 1),
+            'infinity'
+        ) + {ID_MARK_SLACK}"""
+
+
+SELECT_RESULT_BY_ID = f"""
+    SELECT {RESULT_COLUMNS}
+    FROM moderation_results
+    WHERE id = $1
+      AND {created_at_window("$1", "$1")}
+"""
+
+SELECT_OLDEST_PENDING = """
+    SELECT id FROM moderation_results
+    WHERE item_id = $1 AND status = 'pending'
+    ORDER BY created_at ASC
+    LIMIT 1
+"""
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class ResultFilter:
+    status: str | None = None
+    item_id: int | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+
+    def where(self, after_id: int | None = None) -> tuple[str, list]:
+        """SQL condition and its arguments; ``after_id`` is the keyset position."""
+        conditions: list[str] = []
+        args: list = []
+        for column, operator, value in (
+            ("status", "=", self.status),
+            ("item_id", "=", self.item_id),
+            ("created_at", ">=", _naive_utc(self.created_from) if self.created_from else None),
+            ("created_at", "<", _naive_utc(self.created_to) if self.created_to else None),
+            ("id", ">", after_id),
+        ):
+            if value is not None:
+                args.append(value)
+                conditions.append(f"{column} {operator} ${len(args)}")
+        return " AND ".join(conditions) or "TRUE", args
+
+
+class ModerationRepository(BaseRepository):
+    warmup_queries = ((SELECT_RESULT_BY_ID, (0,)), (SELECT_OLDEST_PENDING, (0,)))
 
     async def create_pending(self, item_id: int) -> int:
-        async with self._pool.acquire() as conn:
+        async with self._connection() as conn:
             with DB_QUERY_DURATION.labels(query_type="insert").time():
                 return await conn.fetchval(
                     """
@@ -19,62 +91,154 @@ class ModerationRepository:
                     RETURNING id
                     """,
                     item_id,
+                    timeout=self._query_timeout(),
                 )
 
+    async def create_pending_many(self, item_ids: Sequence[int]) -> list[int]:
+        """Insert one pending task per item in a single statement.
+
+        Task ids come from a sequence consumed in insertion order, so sorting
+        them restores the order of ``item_ids``.
+        """
+        async with self._connection() as conn:
+            with DB_QUERY_DURATION.labels(query_type="insert").time():
+                rows = await conn.fetch(
+                    """
+                    INSERT INTO moderation_results (item_id, status)
+                    SELECT item_id, 'pending'
+                    FROM unnest($1::bigint[]) WITH ORDINALITY AS t(item_id, ord)
+                    ORDER BY ord
+                    RETURNING id
+                    """,
+                    list(item_ids),
+                    timeout=self._query_timeout(),
+                )
+        return sorted(row["id"] for row in rows)
+
     async def get_oldest_pending_by_item_id(self, item_id: int) -> int | None:
-        async with self._pool.acquire() as conn:
+        async with self._connection() as conn:
             with DB_QUERY_DURATION.labels(query_type="select").time():
                 return await conn.fetchval(
-                    """
-                    SELECT id FROM moderation_results
-                    WHERE item_id = $1 AND status = 'pending'
-                    ORDER BY created_at ASC
-                    LIMIT 1
-                    """,
+                    SELECT_OLDEST_PENDING,
                     item_id,
+                    timeout=self._query_timeout(),
                 )
 
     async def get_by_id(self, task_id: int) -> asyncpg.Record | None:
-        async with self._pool.acquire() as conn:
+        async def fetch(conn: asyncpg.Connection) -> asyncpg.Record | None:
             with DB_QUERY_DURATION.labels(query_type="select").time():
                 return await conn.fetchrow(
-                    """
-                    SELECT id, item_id, status, is_violation, probability,
-                           error_message, created_at, processed_at
+                    SELECT_RESULT_BY_ID,
+                    task_id,
+                    timeout=self._query_timeout(),
+                )
+
+        return await self._read(fetch)
+
+    async def get_many(self, task_ids: Sequence[int]) -> list[asyncpg.Record]:
+        task_ids = list(task_ids)
+
+        async def fetch_ids(conn: asyncpg.Connection, ids: list[int]) -> list[asyncpg.Record]:
+            with DB_QUERY_DURATION.labels(query_type="select").time():
+                return await conn.fetch(
+                    f"""
+                    SELECT {RESULT_COLUMNS}
                     FROM moderation_results
-                    WHERE id = $1
+                    WHERE id = ANY($1::bigint[])
+                      AND {created_at_window("(SELECT min(task_id) FROM unnest($1::bigint[]) task_id)",
+                                             "(SELECT max(task_id) FROM unnest($1::bigint[]) task_id)")}
+                    ORDER BY id
                     """,
-                    task_id,
+                    ids,
+                    timeout=self._query_timeout(),
+                )
+
+        async def fetch_missing(rows: list[asyncpg.Record], conn: asyncpg.Connection) -> list[asyncpg.Record]:
+            found = {row["id"] for row in rows}
+            missing = [task_id for task_id in task_ids if task_id not in found]
+            return sorted([*rows, *await fetch_ids(conn, missing)], key=lambda row: row["id"])
+
+        return await self._read(
+            lambda conn: fetch_ids(conn, task_ids),
+            lambda rows: len(rows) == len(set(task_ids)),
+            fetch_missing,
+        )
+
+    async def list_page(
+        self, result_filter: ResultFilter, after_id: int | None = None, limit: int = 100
+    ) -> list[asyncpg.Record]:
+        where, args = result_filter.where(after_id)
+        async with self._connection(readonly=True) as conn:
+            with DB_QUERY_DURATION.labels(query_type="select").time():
+                return await conn.fetch(
+                    f"""
+                    SELECT {RESULT_COLUMNS}
+                    FROM moderation_results
+                    WHERE {where}
+                    ORDER BY id
+                    LIMIT ${len(args) + 1}
+                    """,
+                    *args,
+                    limit,
+                    timeout=self._query_timeout(),
                 )
 
+    async def iter_results(
+        self, result_filter: ResultFilter, after_id: int | None = None, prefetch: int = 1000
+    ) -> AsyncIterator[asyncpg.Record]:
+        """Stream matching rows in id order through a server-side cursor.
+
+        Memory use is bounded by ``prefetch``; an interrupted export resumes
+        by passing the last seen id as ``after_id``.
+        """
+        where, args = result_filter.where(after_id)
+        async with self._connection(readonly=True) as conn:
+            async with conn.transaction(readonly=True):
+                cursor = conn.cursor(
+                    f"""
+                    SELECT {RESULT_COLUMNS}
+                    FROM moderation_results
+                    WHERE {where}
+                    ORDER BY id
+                    """,
+                    *args,
+                    prefetch=prefetch,
+                )
+                async for record in cursor:
+                    yield record
+
     async def update_completed(
         self, task_id: int, is_violation: bool, probability: float
     ) -> None:
-        async with self._pool.acquire() as conn:
+        async with self._connection() as conn:
             with DB_QUERY_DURATION.labels(query_type="update").time():
                 await conn.execute(
-                    """
+                    f"""
                     UPDATE moderation_results
                     SET status = 'completed', is_violation = $2, probability = $3,
                         processed_at = $4
                     WHERE id = $1
+                      AND {created_at_window("$1", "$1")}
                     """,
                     task_id,
                     is_violation,
                     probability,
                     datetime.now(timezone.utc).replace(tzinfo=None),
+                    timeout=self._query_timeout(),
                 )
 
     async def update_failed(self, task_id: int, error_message: str) -> None:
-        async with self._pool.acquire() as conn:
+        async with self._connection() as conn:
             with DB_QUERY_DURATION.labels(query_type="update").time():
                 await conn.execute(
-                    """
+                    f"""
                     UPDATE moderation_results
                     SET status = 'failed', error_message = $2, processed_at = $3
                     WHERE id = $1
+                      AND {created_at_window("$1", "$1")}
                     """,
                     task_id,
                     error_message,
                     datetime.now(timezone.utc).replace(tzinfo=None),
+                    timeout=self._query_timeout(),
                 )
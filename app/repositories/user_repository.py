@@ -1,24 +1,52 @@
+from typing import AsyncIterable, Iterable
+
 import asyncpg
 
+from app.repositories.base import BULK_CHUNK_SIZE, BaseRepository
 from app.telemetry.metrics import DB_QUERY_DURATION
 
+USER_COLUMNS = ("is_verified",)
 
-class UserRepository:
-    def __init__(self, pool: asyncpg.Pool):
-        self._pool = pool
 
+class UserRepository(BaseRepository):
     async def create(self, is_verified: bool = False) -> int:
-        async with self._pool.acquire() as conn:
+        async with self._connection() as conn:
             with DB_QUERY_DURATION.labels(query_type="insert").time():
                 return await conn.fetchval(
                     "INSERT INTO users (is_verified) VALUES ($1) RETURNING id",
                     is_verified,
+                    timeout=self._query_timeout(),
                 )
 
+    async def copy_many(
+        self, rows: Iterable[tuple] | AsyncIterable[tuple], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> int:
+        """Bulk load ``USER_COLUMNS`` tuples with ``COPY``; returns the number of rows."""
+        return await self._copy_chunks("users", USER_COLUMNS, rows, chunk_size)
+
+    async def create_many(
+        self, rows: Iterable[tuple] | AsyncIterable[tuple], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> list[int]:
+        """Like ``copy_many`` but returns the new ids in input order."""
+        return await self._insert_chunks(
+            """
+            INSERT INTO users (is_verified)
+            SELECT is_verified
+            FROM unnest($1::boolean[]) WITH ORDINALITY AS t(is_verified, ord)
+            ORDER BY ord
+            RETURNING id
+            """,
+            rows,
+            chunk_size,
+        )
+
     async def get_by_id(self, user_id: int) -> asyncpg.Record | None:
-        async with self._pool.acquire() as conn:
+        async def fetch(conn: asyncpg.Connection) -> asyncpg.Record | None:
             with DB_QUERY_DURATION.labels(query_type="select").time():
                 return await conn.fetchrow(
                     "SELECT id, is_verified FROM users WHERE id = $1",
                     user_id,
+                    timeout=self._query_timeout(),
                 )
+
+        return await self._read(fetch)
@@ -0,0 +1,140 @@
+"""Bulk re-scoring of every ad with the current model, see ``scripts/rescore_ads.py``.
+
+Ads are streamed in id order through a server-side cursor, scored one chunk
+per ``predict_proba`` call with several chunks in flight on the inference
+backend, and written back with ``COPY`` in id order. Each chunk is committed
+together with the checkpoint, so an interrupted run resumes after the last
+committed ad without duplicates or gaps.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+import asyncpg
+import numpy as np
+
+from app.model import ModelManager, features_from_records
+
+logger = logging.getLogger(__name__)
+
+SELECT_ADS_AFTER = """
+    SELECT a.id, u.is_verified, a.images_qty, length(a.description) AS description_length, a.category
+    FROM ads a
+    JOIN users u ON a.user_id = u.id
+    WHERE a.id > $1
+    ORDER BY a.id
+"""
+
+SELECT_CHECKPOINT = "SELECT last_ad_id, rows_scored FROM rescore_checkpoints WHERE model_version = $1"
+
+UPSERT_CHECKPOINT = """
+    INSERT INTO rescore_checkpoints (model_version, last_ad_id, rows_scored, updated_at)
+    VALUES ($1, $2, $3, NOW())
+    ON CONFLICT (model_version)
+    DO UPDATE SET last_ad_id = EXCLUDED.last_ad_id, rows_scored = EXCLUDED.rows_scored, updated_at = NOW()
+"""
+
+SCORE_COLUMNS = ("model_version", "ad_id", "is_violation", "probability")
+
+
+@dataclass
+class RescoreProgress:
+    rows: int = 0
+    resumed_rows: int = 0
+    last_ad_id: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+async def _chunks(conn: asyncpg.Connection, after_id: int, chunk_size: int) -> AsyncIterator[list]:
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        cursor = await conn.cursor(SELECT_ADS_AFTER, after_id)
+        while rows := await cursor.fetch(chunk_size):
+            yield rows
+
+
+async def _score(model_manager: ModelManager, rows: list) -> tuple[list, np.ndarray]:
+    probabilities = await model_manager.backend.predict_proba(model_manager.model, features_from_records(rows))
+    return rows, probabilities
+
+
+async def _write(
+    conn: asyncpg.Connection,
+    version: str,
+    threshold: float,
+    rows: list,
+    probabilities: np.ndarray,
+    progress: RescoreProgress,
+) -> None:
+    records = [
+        (version, row["id"], bool(probability > threshold), float(probability))
+        for row, probability in zip(rows, probabilities)
+    ]
+    last_ad_id = rows[-1]["id"]
+    async with conn.transaction():
+        await conn.copy_records_to_table("ad_scores", records=records, columns=SCORE_COLUMNS)
+        await conn.execute(UPSERT_CHECKPOINT, version, last_ad_id, progress.resumed_rows + progress.rows + len(rows))
+    progress.rows += len(rows)
+    progress.last_ad_id = last_ad_id
+
+
+async def rescore(
+    pool: asyncpg.Pool,
+    model_manager: ModelManager,
+    version: str,
+    chunk_size: int = 10_000,
+    max_inflight: int = 4,
+    restart: bool = False,
+    report_interval: float = 10.0,
+) -> RescoreProgress:
+    progress = RescoreProgress()
+    async with pool.acquire() as reader, pool.acquire() as writer:
+        if restart:
+            async with writer.transaction():
+                await writer.execute("DELETE FROM ad_scores WHERE model_version = $1", version)
+                await writer.execute("DELETE FROM rescore_checkpoints WHERE model_version = $1", version)
+        checkpoint = await writer.fetchrow(SELECT_CHECKPOINT, version)
+        if checkpoint is not None:
+            progress.last_ad_id, progress.resumed_rows = checkpoint["last_ad_id"], checkpoint["rows_scored"]
+            logger.info(
+                "Resuming model %s after ad %d (%d rows done)", version, progress.last_ad_id, progress.resumed_rows
+            )
+
+        pending: deque[asyncio.Task] = deque()
+        last_report = time.perf_counter()
+
+        async def drain_one() -> None:
+            nonlocal last_report
+            rows, probabilities = await pending.popleft()
+            await _write(writer, version, model_manager.threshold, rows, probabilities, progress)
+            if time.perf_counter() - last_report >= report_interval:
+                last_report = time.perf_counter()
+                logger.info(
+                    "Scored %d rows up to ad %d, %.0f rows/s",
+                    progress.rows, progress.last_ad_id, progress.rows_per_second,
+                )
+
+        try:
+            async for rows in _chunks(reader, progress.last_ad_id, chunk_size):
+                pending.append(asyncio.create_task(_score(model_manager, rows)))
+                if len(pending) >= max_inflight:
+                    await drain_one()
+            while pending:
+                await drain_one()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    logger.info(
+        "Re-scored %d rows with model %s in %.1f s, %.0f rows/s",
+        progress.rows, version, time.perf_counter() - progress.started_at, progress.rows_per_second,
+    )
+    return progress
@@ -1,14 +1,63 @@
-from fastapi import APIRouter, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Request
 
-from app.dependencies import get_model_manager
-from app.model import ModelManager
+from app.registry import DEFAULT_MODEL, ModelRegistry
+from app.serialization import FastJSONResponse
+from app.warmup import Readiness, check_readiness
 
 router = APIRouter(tags=["health"])
 
-@router.get("/health", response_model=Dict[str, Any])
-async def health_check(model_manager: ModelManager = Depends(get_model_manager)):
-    return {
-        "status": "healthy",
-        "model_loaded": True
-    }
+
+@router.get("/health")
+async def health_check(request: Request) -> FastJSONResponse:
+    model_manager = getattr(request.app.state, "model_manager", None)
+    model_loaded = model_manager is not None and model_manager.model is not None
+    return FastJSONResponse(
+        {"status": "healthy" if model_loaded else "unhealthy", "model_loaded": model_loaded},
+        status_code=200 if model_loaded else 503,
+    )
+
+
+@router.get("/livez")
+async def liveness() -> FastJSONResponse:
+    """The process is up and its event loop answers; restarts are the only remedy otherwise."""
+    return FastJSONResponse({"status": "alive"})
+
+
+@router.get("/readyz")
+async def readiness(request: Request) -> FastJSONResponse:
+    state = getattr(request.app.state, "readiness", None) or Readiness()
+    checks = await check_readiness(request.app.state, state.check_timeout)
+    ready = state.warmed_up and all(check["ok"] for check in checks.values())
+    return FastJSONResponse(
+        {"ready": ready, "warmed_up": state.warmed_up, "warmup_ms": state.warmup_ms, "checks": checks},
+        status_code=200 if ready else 503,
+    )
+
+
+@router.get("/startup")
+async def startup_report(request: Request) -> FastJSONResponse:
+    profile = getattr(request.app.state, "startup_profile", None)
+    if profile is None:
+        return FastJSONResponse({"detail": "Application has not started"}, status_code=503)
+    return FastJSONResponse(profile.report())
+
+
+@router.get("/models")
+async def models_report(request: Request) -> FastJSONResponse:
+    """Load time, approximate resident size and request count of each registry model."""
+    model_manager = getattr(request.app.state, "model_manager", None)
+    if isinstance(model_manager, ModelRegistry):
+        return FastJSONResponse(model_manager.report())
+    if model_manager is None:
+        return FastJSONResponse({"models": {}})
+    return FastJSONResponse(
+        {
+            "models": {
+                DEFAULT_MODEL: {
+                    "path": model_manager.model_path,
+                    "loaded": model_manager.model is not None,
+                    "version": model_manager.version,
+                }
+            }
+        }
+    )
@@ -1,16 +1,35 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, AsyncIterator
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncpg
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 
+from app.admission import admission
+from app.deadline import request_deadline
 from app.schemas import (
+    AsyncPredictBatchRequestSchema,
+    AsyncPredictBatchResponseSchema,
     AsyncPredictRequestSchema,
     AsyncPredictResponseSchema,
+    ModerationResultLookupRequestSchema,
+    ModerationResultLookupResponseSchema,
+    ModerationResultPageSchema,
     ModerationResultResponseSchema,
+    ModerationStatus,
 )
+from app.cache import TERMINAL_STATUSES, CachedResult, ResultCache, etag_matches
 from app.clients.kafka import KafkaProducerClient
-from app.repositories import AdRepository, ModerationRepository
-from app.dependencies import get_ad_repository, get_moderation_repository, get_kafka_producer
+from app.repositories import AdRepository, ModerationRepository, ResultFilter
+from app.dependencies import (
+    get_ad_repository,
+    get_kafka_producer,
+    get_moderation_repository,
+    get_result_cache,
+)
 from app.exceptions import AdvertisementNotFoundError
+from app.serialization import FastJSONResponse, dumps
+from app.telemetry.metrics import RESULT_CACHE_REQUESTS_TOTAL
 from app.telemetry.sentry import capture_exception
 
 router = APIRouter()
@@ -18,15 +37,65 @@ router = APIRouter()
 AdRepositoryDep = Annotated[AdRepository, Depends(get_ad_repository)]
 ModerationRepositoryDep = Annotated[ModerationRepository, Depends(get_moderation_repository)]
 KafkaProducerDep = Annotated[KafkaProducerClient, Depends(get_kafka_producer)]
+ResultCacheDep = Annotated[ResultCache, Depends(get_result_cache)]
+
+
+def _result_payload(row: asyncpg.Record) -> dict:
+    return {
+        "task_id": row["id"],
+        "status": row["status"],
+        "is_violation": row["is_violation"],
+        "probability": float(row["probability"]) if row["probability"] is not None else None,
+        "error_message": row["error_message"],
+    }
+
+
+def _result_record_payload(row: asyncpg.Record) -> dict:
+    payload = _result_payload(row)
+    payload["item_id"] = row["item_id"]
+    payload["created_at"] = row["created_at"]
+    payload["processed_at"] = row["processed_at"]
+    return payload
+
+
+def _cached_result_response(
+    cached: CachedResult, result_cache: ResultCache, if_none_match: str | None, outcome: str
+) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": result_cache.cache_control}
+    if etag_matches(cached.etag, if_none_match):
+        RESULT_CACHE_REQUESTS_TOTAL.labels(outcome="not_modified").inc()
+        return Response(status_code=304, headers=headers)
+    RESULT_CACHE_REQUESTS_TOTAL.labels(outcome=outcome).inc()
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def get_result_filter(
+    status: ModerationStatus | None = None,
+    item_id: Annotated[int | None, Query(gt=0)] = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> ResultFilter:
+    return ResultFilter(
+        status=status, item_id=item_id, created_from=created_from, created_to=created_to
+    )
 
 
-@router.post("/async_predict", response_model=AsyncPredictResponseSchema)
+ResultFilterDep = Annotated[ResultFilter, Depends(get_result_filter)]
+
+EXPORT_LINES_PER_CHUNK = 500
+
+
+@router.post(
+    "/async_predict",
+    response_model=AsyncPredictResponseSchema,
+    dependencies=[Depends(request_deadline("async_predict")), Depends(admission("async_predict"))],
+)
 async def async_predict(
     body: AsyncPredictRequestSchema,
     ad_repository: AdRepositoryDep,
     moderation_repository: ModerationRepositoryDep,
     kafka_producer: KafkaProducerDep,
-) -> AsyncPredictResponseSchema:
+) -> FastJSONResponse:
     row = await ad_repository.get_with_user_by_id(body.item_id)
     if row is None:
         exc = AdvertisementNotFoundError(body.item_id)
@@ -34,28 +103,121 @@ async def async_predict(
         raise HTTPException(status_code=404, detail="Ad not found")
 
     task_id = await moderation_repository.create_pending(item_id=body.item_id)
-    await kafka_producer.send_moderation_request(body.item_id)
+    await kafka_producer.send_moderation_request(body.item_id, priority=body.priority)
+
+    return FastJSONResponse(
+        {"task_id": task_id, "status": "pending", "message": "Moderation request accepted"}
+    )
+
+
+@router.post(
+    "/async_predict_batch",
+    response_model=AsyncPredictBatchResponseSchema,
+    dependencies=[Depends(request_deadline("async_predict_batch"))],
+)
+async def async_predict_batch(
+    body: AsyncPredictBatchRequestSchema,
+    ad_repository: AdRepositoryDep,
+    moderation_repository: ModerationRepositoryDep,
+    kafka_producer: KafkaProducerDep,
+) -> FastJSONResponse:
+    existing = await ad_repository.get_existing_ids(body.item_ids)
+    missing = sorted(set(body.item_ids) - existing)
+    if missing:
+        capture_exception(AdvertisementNotFoundError(missing[0]))
+        raise HTTPException(status_code=404, detail=f"Ads not found: {missing[:100]}")
+
+    task_ids = await moderation_repository.create_pending_many(body.item_ids)
+    await kafka_producer.send_moderation_requests(body.item_ids, priority=body.priority)
 
-    return AsyncPredictResponseSchema(
-        task_id=task_id,
-        status="pending",
-        message="Moderation request accepted",
+    return FastJSONResponse(
+        {"task_ids": task_ids, "status": "pending", "message": "Moderation requests accepted"}
     )
 
 
-@router.get("/moderation_result/{task_id}", response_model=ModerationResultResponseSchema)
+@router.get(
+    "/moderation_result/{task_id}",
+    response_model=ModerationResultResponseSchema,
+    dependencies=[Depends(request_deadline("moderation_result"))],
+)
 async def get_moderation_result(
     task_id: int,
     moderation_repository: ModerationRepositoryDep,
-) -> ModerationResultResponseSchema:
+    result_cache: ResultCacheDep,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    cached = result_cache.get(task_id)
+    if cached is not None:
+        return _cached_result_response(cached, result_cache, if_none_match, "hit")
+
     row = await moderation_repository.get_by_id(task_id)
     if row is None:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return ModerationResultResponseSchema(
-        task_id=row["id"],
-        status=row["status"],
-        is_violation=row["is_violation"],
-        probability=float(row["probability"]) if row["probability"] is not None else None,
-        error_message=row["error_message"],
+    payload = _result_payload(row)
+    if payload["status"] in TERMINAL_STATUSES:
+        cached = result_cache.put(task_id, payload)
+        return _cached_result_response(cached, result_cache, if_none_match, "miss")
+
+    RESULT_CACHE_REQUESTS_TOTAL.labels(outcome="uncacheable").inc()
+    return FastJSONResponse(payload, headers={"Cache-Control": "no-store"})
+
+
+@router.post(
+    "/moderation_results/lookup",
+    response_model=ModerationResultLookupResponseSchema,
+    dependencies=[Depends(request_deadline("moderation_results_lookup"))],
+)
+async def lookup_moderation_results(
+    body: ModerationResultLookupRequestSchema,
+    moderation_repository: ModerationRepositoryDep,
+) -> FastJSONResponse:
+    rows = await moderation_repository.get_many(body.task_ids)
+    found = {row["id"] for row in rows}
+    return FastJSONResponse(
+        {
+            "results": [_result_record_payload(row) for row in rows],
+            "missing": sorted(set(body.task_ids) - found),
+        }
+    )
+
+
+@router.get(
+    "/moderation_results",
+    response_model=ModerationResultPageSchema,
+    dependencies=[Depends(request_deadline("moderation_results"))],
+)
+async def list_moderation_results(
+    result_filter: ResultFilterDep,
+    moderation_repository: ModerationRepositoryDep,
+    after_id: Annotated[int | None, Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+) -> FastJSONResponse:
+    rows = await moderation_repository.list_page(result_filter, after_id=after_id, limit=limit)
+    return FastJSONResponse(
+        {
+            "results": [_result_record_payload(row) for row in rows],
+            "next_after_id": rows[-1]["id"] if len(rows) == limit else None,
+        }
     )
+
+
+@router.get("/moderation_results/export", response_class=StreamingResponse)
+async def export_moderation_results(
+    result_filter: ResultFilterDep,
+    moderation_repository: ModerationRepositoryDep,
+    after_id: Annotated[int | None, Query(ge=0)] = None,
+) -> StreamingResponse:
+    """Stream matching results as NDJSON in task id order."""
+
+    async def lines() -> AsyncIterator[bytes]:
+        chunk: list[bytes] = []
+        async for row in moderation_repository.iter_results(result_filter, after_id=after_id):
+            chunk.append(dumps(_result_record_payload(row)))
+            if len(chunk) >= EXPORT_LINES_PER_CHUNK:
+                yield b"\n".join(chunk) + b"\n"
+                chunk.clear()
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -3,15 +3,19 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
 
+from app.admission import admission
+from app.deadline import request_deadline
 from app.schemas import (
     AdModerationRequestSchema,
     AdModerationResponseSchema,
     SimplePredictRequestSchema,
 )
+from app.features import predict_with_features
 from app.model import ModelManager
-from app.dependencies import get_model_manager, get_ad_repository
-from app.repositories import AdRepository
+from app.dependencies import get_model_manager, get_ad_repository, get_ad_feature_repository
+from app.repositories import AdFeatureRepository, AdRepository
 from app.exceptions import ModelIsNotAvailable, ErrorInPrediction, AdvertisementNotFoundError
+from app.serialization import FastJSONResponse
 from app.telemetry.sentry import capture_exception
 
 router = APIRouter()
@@ -19,9 +23,14 @@ logger = logging.getLogger(__name__)
 
 ModelManagerDep = Annotated[ModelManager, Depends(get_model_manager)]
 AdRepositoryDep = Annotated[AdRepository, Depends(get_ad_repository)]
+AdFeatureRepositoryDep = Annotated[AdFeatureRepository | None, Depends(get_ad_feature_repository)]
 
 
-@router.post("/predict", response_model=AdModerationResponseSchema)
+@router.post(
+    "/predict",
+    response_model=AdModerationResponseSchema,
+    dependencies=[Depends(request_deadline("predict")), Depends(admission("predict"))],
+)
 async def predict(ad: AdModerationRequestSchema, model_manager: ModelManagerDep):
     try:
         logger.info("Processing seller_id=%s item_id=%s", ad.seller_id, ad.item_id)
@@ -37,7 +46,7 @@ async def predict(ad: AdModerationRequestSchema, model_manager: ModelManagerDep)
             result["is_violation"],
             result["probability"],
         )
-        return result
+        return FastJSONResponse(result)
     except ModelIsNotAvailable as e:
         capture_exception(e)
         logger.error("Model unavailable: %s", e)
@@ -48,25 +57,33 @@ async def predict(ad: AdModerationRequestSchema, model_manager: ModelManagerDep)
         raise HTTPException(status_code=500, detail="Error making prediction")
 
 
-@router.post("/simple_predict", response_model=AdModerationResponseSchema)
+@router.post(
+    "/simple_predict",
+    response_model=AdModerationResponseSchema,
+    dependencies=[Depends(request_deadline("simple_predict")), Depends(admission("simple_predict"))],
+)
 async def simple_predict(
     body: SimplePredictRequestSchema,
     model_manager: ModelManagerDep,
     ad_repository: AdRepositoryDep,
+    feature_repository: AdFeatureRepositoryDep,
 ):
-    row = await ad_repository.get_with_user_by_id(body.item_id)
-    if row is None:
-        exc = AdvertisementNotFoundError(body.item_id)
-        capture_exception(exc)
-        raise HTTPException(status_code=404, detail="Ad not found")
-
     try:
-        result = await model_manager.predict(
-            row["is_verified"],
-            row["images_qty"],
-            len(row["description"]),
-            row["category"],
-        )
+        result = None
+        if feature_repository is not None:
+            result = await predict_with_features(body.item_id, model_manager, feature_repository)
+        if result is None:
+            row = await ad_repository.get_with_user_by_id(body.item_id)
+            if row is None:
+                exc = AdvertisementNotFoundError(body.item_id)
+                capture_exception(exc)
+                raise HTTPException(status_code=404, detail="Ad not found")
+            result = await model_manager.predict(
+                row["is_verified"],
+                row["images_qty"],
+                len(row["description"]),
+                row["category"],
+            )
     except ModelIsNotAvailable as e:
         capture_exception(e)
         raise HTTPException(status_code=503, detail="Model service is not available")
@@ -74,4 +91,4 @@ async def simple_predict(
         capture_exception(e)
         raise HTTPException(status_code=500, detail="Error making prediction")
 
-    return result
+    return FastJSONResponse(result)
@@ -1,5 +1,14 @@
+from datetime import datetime
+from typing import Annotated, Literal
+
 from pydantic import BaseModel, Field
 
+from app.clients.codec import DEFAULT_PRIORITY, Priority
+
+MAX_BATCH_SIZE = 10_000
+
+ModerationStatus = Literal["pending", "completed", "failed"]
+
 class AdModerationRequestSchema(BaseModel):
     seller_id: int = Field(..., gt=0)
     is_verified_seller: bool
@@ -20,6 +29,7 @@ class SimplePredictRequestSchema(BaseModel):
 
 class AsyncPredictRequestSchema(BaseModel):
     item_id: int = Field(..., gt=0)
+    priority: Priority = DEFAULT_PRIORITY
 
 
 class AsyncPredictResponseSchema(BaseModel):
@@ -28,9 +38,40 @@ class AsyncPredictResponseSchema(BaseModel):
     message: str = "Moderation request accepted"
 
 
+class AsyncPredictBatchRequestSchema(BaseModel):
+    item_ids: list[Annotated[int, Field(gt=0)]] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    priority: Priority = DEFAULT_PRIORITY
+
+
+class AsyncPredictBatchResponseSchema(BaseModel):
+    task_ids: list[int]
+    status: str = "pending"
+    message: str = "Moderation requests accepted"
+
+
 class ModerationResultResponseSchema(BaseModel):
     task_id: int
     status: str
     is_violation: bool | None = None
     probability: float | None = None
     error_message: str | None = None
+
+
+class ModerationResultLookupRequestSchema(BaseModel):
+    task_ids: list[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class ModerationResultRecordSchema(ModerationResultResponseSchema):
+    item_id: int
+    created_at: datetime
+    processed_at: datetime | None = None
+
+
+class ModerationResultLookupResponseSchema(BaseModel):
+    results: list[ModerationResultRecordSchema]
+    missing: list[int]
+
+
+class ModerationResultPageSchema(BaseModel):
+    results: list[ModerationResultRecordSchema]
+    next_after_id: int | None = None
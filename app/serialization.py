@@ -0,0 +1,48 @@
+import json
+from datetime import date, datetime
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON. Uses orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Raises ``json.JSONDecodeError`` on invalid input with either backend."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps``.
+
+    Routes returning it directly skip FastAPI's ``jsonable_encoder`` and
+    ``response_model`` re-validation, so the content must already be plain
+    JSON-compatible data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,177 @@
+"""Pre-fork production launcher.
+
+    python -m app.server --workers 4 --host 0.0.0.0 --port 8000
+
+The parent imports the app and unpickles the model once, freezes the GC and
+forks the workers, so imported modules and model weights are shared
+copy-on-write. Each worker opens its own DB pool and Kafka producer in the
+app lifespan after the fork and reports its startup time to the parent.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+import uvicorn
+
+from app.config import Settings
+from app.model import preload_model
+
+logger = logging.getLogger(__name__)
+
+
+class _ReportingServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, report_fd: int, forked_at: float) -> None:
+        super().__init__(config)
+        self._report_fd = report_fd
+        self._forked_at = forked_at
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets)
+        if not self.should_exit:
+            elapsed = time.perf_counter() - self._forked_at
+            os.write(self._report_fd, f"{os.getpid()} {elapsed:.6f}\n".encode())
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, report_fd: int, args: argparse.Namespace) -> int:
+    forked_at = time.perf_counter()
+    from app.main import app
+
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=args.access_log,
+        timeout_keep_alive=args.timeout_keep_alive,
+    )
+    server = _ReportingServer(config, report_fd, forked_at)
+    server.run(sockets=[sock])
+    return 0 if server.started else 1
+
+
+class Launcher:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.workers: dict[int, float] = {}
+        self.startup_times: dict[int, float] = {}
+        self._shutting_down = False
+        self._launched_at = time.perf_counter()
+        self._report_read, self._report_write = os.pipe()
+
+    def preload(self) -> None:
+        import app.main  # noqa: F401 - imported for its side effect of loading every module
+
+        preload_model(self.args.model_path)
+        # Workers build their ModelManager from Settings; without this they would
+        # load the default path instead of sharing the preloaded model.
+        os.environ["MODEL_PATH"] = self.args.model_path
+        gc.collect()
+        # Objects that exist now are never scanned again, so collections in
+        # the workers do not touch (and copy) the shared pages.
+        gc.freeze()
+
+    def spawn(self, sock: socket.socket) -> int:
+        pid = os.fork()
+        if pid == 0:
+            os.close(self._report_read)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 1
+            try:
+                code = _run_worker(sock, self._report_write, self.args)
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.perf_counter()
+        return pid
+
+    def _read_reports(self) -> None:
+        with os.fdopen(self._report_read, "r") as reports:
+            for line in reports:
+                pid, elapsed = line.split()
+                self.startup_times[int(pid)] = float(elapsed)
+                logger.info("Worker pid=%s ready in %.3fs", pid, float(elapsed))
+                if len(self.startup_times) == self.args.workers:
+                    logger.info(
+                        "All %s workers ready %.3fs after launch",
+                        self.args.workers,
+                        time.perf_counter() - self._launched_at,
+                    )
+
+    def _stop(self, signum: int, frame) -> None:
+        self._shutting_down = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        self.preload()
+        sock = bind_socket(self.args.host, self.args.port)
+        logger.info(
+            "Model preloaded in %.3fs, forking %s workers on %s:%s",
+            time.perf_counter() - self._launched_at,
+            self.args.workers,
+            self.args.host,
+            self.args.port,
+        )
+        for _ in range(self.args.workers):
+            self.spawn(sock)
+        threading.Thread(target=self._read_reports, name="startup-reports", daemon=True).start()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started_at = self.workers.pop(pid, None)
+            if started_at is None or self._shutting_down:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if pid not in self.startup_times:
+                # A worker that never became ready will not do better on respawn.
+                logger.critical("Worker pid=%s failed during startup (exit %s), stopping", pid, code)
+                self._stop(signal.SIGTERM, None)
+                return 1
+            logger.error("Worker pid=%s exited with %s, respawning", pid, code)
+            self.spawn(sock)
+        sock.close()
+        return 0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--model-path", default=Settings().model_path)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--access-log", action="store_true")
+    parser.add_argument("--timeout-keep-alive", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    return Launcher(parse_args(argv)).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Shadow scoring of a candidate model on live traffic, off the request path.
+
+``ModelManager`` offers every prepared feature row and its primary
+probability to ``ShadowScorer.offer``, which only enqueues without waiting;
+when the queue is full the sample is dropped. A background task scores
+queued rows in batches with the candidate and records how often the two
+models disagree and how far their probabilities drift apart.
+"""
+
+import asyncio
+import logging
+import time
+
+import numpy as np
+
+from app.config import Settings
+from app.inference import ThreadPoolBackend
+from app.model import ModelManager
+from app.telemetry.metrics import (
+    SHADOW_DISAGREEMENTS_TOTAL,
+    SHADOW_PROBABILITY_DELTA,
+    SHADOW_PROBABILITY_DRIFT,
+    SHADOW_QUEUE_DEPTH,
+    SHADOW_SAMPLES_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowScorer:
+    def __init__(
+        self,
+        candidate: ModelManager,
+        queue_size: int = 1000,
+        batch_size: int = 64,
+        flush_interval: float = 0.2,
+        drift_alpha: float = 0.01,
+    ) -> None:
+        self.candidate = candidate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drift_alpha = drift_alpha
+        # Mean of candidate minus primary probability, exponentially weighted per sample.
+        self.drift = 0.0
+        self._queue: asyncio.Queue[tuple[np.ndarray, float]] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ShadowScorer":
+        # A pool of its own, so shadow batches never queue behind live predictions.
+        candidate = ModelManager(
+            settings.shadow_model_path, backend=ThreadPoolBackend(settings.shadow_workers)
+        )
+        return cls(
+            candidate,
+            queue_size=settings.shadow_queue_size,
+            batch_size=settings.shadow_batch_size,
+            flush_interval=settings.shadow_flush_interval_ms / 1000,
+        )
+
+    @property
+    def label(self) -> str:
+        return self.candidate.version or "unknown"
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.candidate.load)
+        logger.info("Shadow scoring with candidate %s from %s", self.label, self.candidate.model_path)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.candidate.close()
+
+    def offer(self, features: np.ndarray, primary_probability: float) -> None:
+        """Enqueue a scored row for the candidate; never blocks, drops when the queue is full."""
+        try:
+            self._queue.put_nowait((features, primary_probability))
+        except asyncio.QueueFull:
+            SHADOW_SAMPLES_TOTAL.labels(candidate=self.label, outcome="dropped").inc()
+            return
+        SHADOW_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _next_batch(self) -> list[tuple[np.ndarray, float]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        SHADOW_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self.score(batch)
+            except Exception:
+                logger.exception("Shadow scoring failed for a batch of %d", len(batch))
+                SHADOW_SAMPLES_TOTAL.labels(candidate=self.label, outcome="failed").inc(len(batch))
+
+    async def score(self, batch: list[tuple[np.ndarray, float]]) -> None:
+        features = np.vstack([row for row, _ in batch])
+        primary = np.fromiter((probability for _, probability in batch), dtype=np.float64, count=len(batch))
+        shadow = np.asarray(
+            await self.candidate.backend.predict_proba(self.candidate.model, features), dtype=np.float64
+        )
+
+        threshold = self.candidate.threshold
+        disagreements = int(np.count_nonzero((primary > threshold) != (shadow > threshold)))
+        delta = shadow - primary
+        for value in delta.tolist():
+            self.drift += self.drift_alpha * (value - self.drift)
+            SHADOW_PROBABILITY_DELTA.labels(candidate=self.label).observe(abs(value))
+
+        SHADOW_SAMPLES_TOTAL.labels(candidate=self.label, outcome="scored").inc(len(batch))
+        SHADOW_DISAGREEMENTS_TOTAL.labels(candidate=self.label).inc(disagreements)
+        SHADOW_PROBABILITY_DRIFT.labels(candidate=self.label).set(self.drift)
+
+
+async def start_shadow(model_manager, settings: Settings) -> ShadowScorer | None:
+    """Start shadow scoring behind the default model if a candidate is configured."""
+    if not settings.shadow_model_path:
+        return None
+    shadow = ShadowScorer.from_settings(settings)
+    await shadow.start()
+    # Only the default model is shadowed; a registry routes the rest elsewhere.
+    getattr(model_manager, "default", model_manager).shadow = shadow
+    return shadow
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 PREDICTIONS_TOTAL = Counter(
     "predictions_total",
@@ -30,3 +30,215 @@ MODEL_PREDICTION_PROBABILITY = Histogram(
     "Distribution of violation probabilities from ML model",
     buckets=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
 )
+
+MODERATION_MESSAGE_BYTES_PER_ITEM = Histogram(
+    "moderation_message_bytes_per_item",
+    "Kafka record size divided by the number of moderation items it carries",
+    ["wire_format"],
+    buckets=[2, 4, 8, 12, 16, 24, 32, 48, 64, 96, 128, 256],
+)
+
+MODERATION_MESSAGE_ITEMS_TOTAL = Counter(
+    "moderation_message_items_total",
+    "Total number of moderation items received from Kafka",
+    ["wire_format"],
+)
+
+RESULT_CACHE_REQUESTS_TOTAL = Counter(
+    "result_cache_requests_total",
+    "Moderation result lookups by cache outcome",
+    ["outcome"],
+)
+
+ADMISSION_REJECTED_TOTAL = Counter(
+    "admission_rejected_total",
+    "Requests rejected by admission control",
+    ["route"],
+)
+
+ADMISSION_QUEUE_DURATION = Histogram(
+    "admission_queue_duration_seconds",
+    "Time requests waited for an admission slot",
+    ["route"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Current concurrency limit per route",
+    ["route"],
+)
+
+ADMISSION_INFLIGHT = Gauge(
+    "admission_inflight_requests",
+    "Requests currently holding an admission slot",
+    ["route"],
+)
+
+DEADLINE_EXCEEDED_TOTAL = Counter(
+    "deadline_exceeded_total",
+    "Requests abandoned because their deadline expired, by stage",
+    ["stage"],
+)
+
+INFERENCE_WORKERS = Gauge(
+    "inference_workers",
+    "Configured workers of the inference execution backend",
+    ["backend"],
+)
+
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "inference_queue_depth",
+    "Inference calls waiting for a free backend worker",
+    ["backend"],
+)
+
+INFERENCE_UTILIZATION = Gauge(
+    "inference_utilization_ratio",
+    "Share of inference backend workers currently busy",
+    ["backend"],
+)
+
+STARTUP_PHASE_DURATION = Gauge(
+    "startup_phase_duration_seconds",
+    "Duration of each application startup phase",
+    ["phase"],
+)
+
+STARTUP_IMPORT_DURATION = Gauge(
+    "startup_import_duration_seconds",
+    "Own import time of the slowest modules, with STARTUP_PROFILE enabled",
+    ["module"],
+)
+
+DB_POOL_ACQUIRES_TOTAL = Counter(
+    "db_pool_acquires_total",
+    "Connections handed out by the routing pool, per underlying pool",
+    ["pool"],
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Open connections per pool and state",
+    ["pool", "state"],
+)
+
+DB_POOL_HEALTHY = Gauge(
+    "db_pool_healthy",
+    "Whether the pool is used for routed reads (1) or bypassed (0)",
+    ["pool"],
+)
+
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of each read replica",
+    ["pool"],
+)
+
+DB_READ_FALLBACK_TOTAL = Counter(
+    "db_read_fallback_total",
+    "Read-only queries served by the primary instead of a replica",
+    ["reason"],
+)
+
+PARTITION_SIZE_BYTES = Gauge(
+    "moderation_results_partition_size_bytes",
+    "Total on-disk size of each moderation_results partition, indexes included",
+    ["partition"],
+)
+
+PARTITION_ROWS_ESTIMATE = Gauge(
+    "moderation_results_partition_rows_estimate",
+    "Planner row estimate (pg_class.reltuples) of each moderation_results partition",
+    ["partition"],
+)
+
+PARTITIONS_ARCHIVED_TOTAL = Counter(
+    "moderation_results_partitions_archived_total",
+    "Detached moderation_results partitions written to the archive and dropped",
+)
+
+FEATURE_SCORE_REQUESTS_TOTAL = Counter(
+    "feature_score_requests_total",
+    "Lookups of the precomputed score in ad_features by outcome",
+    ["outcome"],
+)
+
+MODEL_LOAD_DURATION = Gauge(
+    "model_load_duration_seconds",
+    "Time it took to load each registry model",
+    ["model"],
+)
+
+MODEL_RESIDENT_BYTES = Gauge(
+    "model_resident_bytes",
+    "Approximate memory held by each loaded registry model, 0 once evicted",
+    ["model"],
+)
+
+MODEL_REQUESTS_TOTAL = Counter(
+    "model_requests_total",
+    "Predictions routed to each registry model",
+    ["model"],
+)
+
+MODEL_EVICTIONS_TOTAL = Counter(
+    "model_evictions_total",
+    "Registry models evicted to stay within the memory budget",
+    ["model"],
+)
+
+SHADOW_SAMPLES_TOTAL = Counter(
+    "shadow_samples_total",
+    "Predictions offered to the shadow candidate by outcome (scored, dropped, failed)",
+    ["candidate", "outcome"],
+)
+
+SHADOW_DISAGREEMENTS_TOTAL = Counter(
+    "shadow_disagreements_total",
+    "Shadow-scored predictions where the candidate decided differently from the primary model",
+    ["candidate"],
+)
+
+SHADOW_PROBABILITY_DELTA = Histogram(
+    "shadow_probability_delta",
+    "Absolute difference between candidate and primary violation probability",
+    ["candidate"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+
+SHADOW_PROBABILITY_DRIFT = Gauge(
+    "shadow_probability_drift",
+    "Exponentially weighted mean of candidate minus primary probability",
+    ["candidate"],
+)
+
+SHADOW_QUEUE_DEPTH = Gauge(
+    "shadow_queue_depth",
+    "Predictions waiting to be shadow-scored",
+)
+
+MODERATION_QUEUE_WAIT = Histogram(
+    "moderation_queue_wait_seconds",
+    "Time from publishing a moderation record to the worker starting on it, by priority lane",
+    ["lane"],
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0],
+)
+
+MODERATION_LANE_BUFFERED = Gauge(
+    "moderation_lane_buffered",
+    "Records fetched by the worker and waiting in a priority lane's buffer",
+    ["lane"],
+)
+
+MODERATION_LANE_PAUSED = Gauge(
+    "moderation_lane_paused",
+    "Whether fetching for a priority lane is paused because its buffer is full",
+    ["lane"],
+)
+
+DLQ_REPLAY_ENTRIES_TOTAL = Counter(
+    "dlq_replay_entries_total",
+    "Dead-letter entries handled by the replayer by outcome (replayed, duplicate, missing, invalid, undecodable)",
+    ["mode", "outcome"],
+)
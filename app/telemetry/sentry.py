@@ -1,13 +1,19 @@
-import sentry_sdk
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.starlette import StarletteIntegration
+from typing import Any
+
+# Imported on first use so deployments without a DSN never load sentry_sdk.
+_sentry_sdk: Any = None
 
 
 def init_sentry(dsn: str, environment: str = "development") -> None:
     """Initialize Sentry SDK. No-op when DSN is not configured."""
+    global _sentry_sdk
     if not dsn:
         return
 
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.starlette import StarletteIntegration
+
     sentry_sdk.init(
         dsn=dsn,
         traces_sample_rate=1.0,
@@ -17,8 +23,10 @@ def init_sentry(dsn: str, environment: str = "development") -> None:
             FastApiIntegration(),
         ],
     )
+    _sentry_sdk = sentry_sdk
 
 
 def capture_exception(exc: Exception) -> None:
     """Capture an exception to Sentry. No-op when Sentry is not initialized."""
-    sentry_sdk.capture_exception(exc)
+    if _sentry_sdk is not None:
+        _sentry_sdk.capture_exception(exc)
@@ -0,0 +1,131 @@
+"""Startup profiling: per-module import times and per-phase startup durations.
+
+Import profiling is off by default. Set ``STARTUP_PROFILE=1`` to install the
+hook when the ``app`` package is first imported. Only imports that go through
+``__import__`` are seen; ``importlib.import_module`` calls count towards the
+importing module's own time.
+"""
+
+import builtins
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PROFILE_ENV = "STARTUP_PROFILE"
+
+
+class ImportProfiler:
+    def __init__(self) -> None:
+        # module -> [own seconds, cumulative seconds including nested imports]
+        self.records: dict[str, list[float]] = {}
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self) -> None:
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        module_name = name
+        if level:
+            try:
+                module_name = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+            except (ImportError, ValueError):
+                return original(name, globals, locals, fromlist, level)
+        if module_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            record = self.records.setdefault(module_name, [0.0, 0.0])
+            record[0] += elapsed - nested
+            record[1] += elapsed
+
+    def top(self, limit: int) -> list[dict]:
+        ranked = sorted(self.records.items(), key=lambda item: item[1][0], reverse=True)
+        return [
+            {"module": name, "self_ms": round(own * 1000, 3), "cumulative_ms": round(total * 1000, 3)}
+            for name, (own, total) in ranked[:limit]
+        ]
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(own for own, _ in self.records.values())
+
+
+import_profiler: ImportProfiler | None = None
+
+
+def install_import_profiler() -> ImportProfiler:
+    global import_profiler
+    if import_profiler is None:
+        import_profiler = ImportProfiler()
+        import_profiler.install()
+    return import_profiler
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get(STARTUP_PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+class StartupProfile:
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def finish(self, import_limit: int = 30) -> dict:
+        """Freeze the total, publish metrics and log a summary."""
+        from app.telemetry.metrics import STARTUP_IMPORT_DURATION, STARTUP_PHASE_DURATION
+
+        self.phases["total"] = time.perf_counter() - self._started_at
+        for name, seconds in self.phases.items():
+            STARTUP_PHASE_DURATION.labels(phase=name).set(seconds)
+        if import_profiler is not None:
+            for record in import_profiler.top(import_limit):
+                STARTUP_IMPORT_DURATION.labels(module=record["module"]).set(record["self_ms"] / 1000)
+        report = self.report(import_limit)
+        logger.info(
+            "Startup phases (ms): %s",
+            ", ".join(f"{name}={ms:.1f}" for name, ms in report["phases_ms"].items()),
+        )
+        return report
+
+    def report(self, import_limit: int = 30) -> dict:
+        report = {
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "import_profiling": import_profiler is not None,
+        }
+        if import_profiler is not None:
+            report["imports_total_ms"] = round(import_profiler.total_seconds * 1000, 3)
+            report["imports"] = import_profiler.top(import_limit)
+        return report
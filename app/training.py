@@ -0,0 +1,233 @@
+"""Out-of-core training on the moderation history, see ``scripts/train_model.py``.
+
+Labelled feature rows are streamed from Postgres once into an on-disk
+columnar cache (one raw file per column, read back with ``np.memmap``), so
+later runs skip extraction while the history is unchanged. Hyperparameter
+candidates are trained in parallel processes with ``partial_fit`` over
+chunks of the cache and compared on a held-out tail of it.
+"""
+
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+import asyncpg
+import numpy as np
+
+from app.repositories.ad_feature_repository import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+LABEL_COLUMN = "label"
+FEATURE_DTYPE = np.float32
+LABEL_DTYPE = np.int8
+CLASSES = np.array([0, 1])
+
+# Latest completed verdict per ad as the label, with the current features of the ad.
+SELECT_TRAINING_ROWS = f"""
+    SELECT {", ".join(f"f.{column}" for column in FEATURE_COLUMNS)}, r.is_violation::int AS {LABEL_COLUMN}
+    FROM (
+        SELECT DISTINCT ON (item_id) item_id, is_violation
+        FROM moderation_results
+        WHERE status = 'completed' AND is_violation IS NOT NULL
+        ORDER BY item_id, processed_at DESC
+    ) r
+    JOIN ad_feature_values f ON f.ad_id = r.item_id
+"""
+
+# Any new verdict moves this and invalidates the cache; feature-only edits need --refresh-cache.
+SELECT_WATERMARK = """
+    SELECT concat_ws(':', max(id), count(*), max(processed_at))
+    FROM moderation_results
+    WHERE status = 'completed'
+"""
+
+
+@dataclass
+class StageTimer:
+    stages: dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+            logger.info("Stage %s took %.2f s", name, self.stages[name])
+
+    def report(self) -> str:
+        return ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.stages.items())
+
+
+class FeatureCache:
+    """Columnar cache of training rows: ``<column>.bin`` files plus ``meta.json``."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, column: str) -> Path:
+        return self.directory / f"{column}.bin"
+
+    @property
+    def meta(self) -> dict | None:
+        try:
+            return json.loads((self.directory / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    def is_valid(self, watermark: str) -> bool:
+        meta = self.meta
+        return meta is not None and meta["watermark"] == watermark
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    @contextmanager
+    def writer(self, watermark: str) -> Iterator["_CacheWriter"]:
+        """Write all chunks, then publish ``meta.json``; an interrupted write leaves no valid cache."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / "meta.json").unlink(missing_ok=True)
+        writer = _CacheWriter(self)
+        try:
+            yield writer
+        finally:
+            writer.close()
+        meta = {"rows": writer.rows, "watermark": watermark, "columns": list(FEATURE_COLUMNS)}
+        (self.directory / "meta.json").write_text(json.dumps(meta))
+
+    def columns(self) -> tuple[list[np.memmap], np.memmap]:
+        rows = self.rows
+        if rows == 0:
+            return [np.zeros(0, FEATURE_DTYPE) for _ in FEATURE_COLUMNS], np.zeros(0, LABEL_DTYPE)
+        features = [np.memmap(self._path(c), dtype=FEATURE_DTYPE, mode="r", shape=(rows,)) for c in FEATURE_COLUMNS]
+        labels = np.memmap(self._path(LABEL_COLUMN), dtype=LABEL_DTYPE, mode="r", shape=(rows,))
+        return features, labels
+
+    def iter_chunks(
+        self, start: int, stop: int, chunk_size: int, rng: np.random.Generator | None = None
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Row-major chunks of ``[start, stop)``, in random chunk order when ``rng`` is given."""
+        features, labels = self.columns()
+        offsets = np.arange(start, stop, chunk_size)
+        if rng is not None:
+            offsets = rng.permutation(offsets)
+        for offset in offsets.tolist():
+            end = min(offset + chunk_size, stop)
+            yield np.column_stack([column[offset:end] for column in features]), np.asarray(labels[offset:end])
+
+
+class _CacheWriter:
+    def __init__(self, cache: FeatureCache) -> None:
+        self.rows = 0
+        self._files = {column: open(cache._path(column), "wb") for column in (*FEATURE_COLUMNS, LABEL_COLUMN)}
+
+    def append(self, features: np.ndarray, labels: np.ndarray) -> None:
+        for i, column in enumerate(FEATURE_COLUMNS):
+            self._files[column].write(np.ascontiguousarray(features[:, i], dtype=FEATURE_DTYPE).tobytes())
+        self._files[LABEL_COLUMN].write(np.asarray(labels, dtype=LABEL_DTYPE).tobytes())
+        self.rows += len(labels)
+
+    def close(self) -> None:
+        for f in self._files.values():
+            f.close()
+
+
+async def extract(pool: asyncpg.Pool, cache: FeatureCache, chunk_size: int, refresh: bool = False) -> bool:
+    """Stream labelled rows into ``cache`` unless it already matches the database; returns whether it did."""
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            watermark = await conn.fetchval(SELECT_WATERMARK)
+            if not refresh and cache.is_valid(watermark):
+                logger.info("Feature cache %s is up to date (%d rows)", cache.directory, cache.rows)
+                return False
+            with cache.writer(watermark) as writer:
+                cursor = await conn.cursor(SELECT_TRAINING_ROWS)
+                while rows := await cursor.fetch(chunk_size):
+                    block = np.array([tuple(row) for row in rows], dtype=np.float64)
+                    writer.append(block[:, : len(FEATURE_COLUMNS)], block[:, len(FEATURE_COLUMNS)])
+    logger.info("Extracted %d rows into %s", cache.rows, cache.directory)
+    return True
+
+
+def _log_loss(labels: np.ndarray, probabilities: np.ndarray) -> float:
+    p = np.clip(probabilities, 1e-15, 1 - 1e-15)
+    return float(-np.sum(labels * np.log(p) + (1 - labels) * np.log(1 - p)))
+
+
+def fit_candidate(
+    cache_dir: str,
+    params: dict[str, Any],
+    epochs: int,
+    chunk_size: int,
+    validation_fraction: float,
+    seed: int = 42,
+) -> dict[str, Any]:
+    """Train one candidate over the cache; runs in a worker process."""
+    from sklearn.linear_model import SGDClassifier
+
+    cache = FeatureCache(cache_dir)
+    split = cache.rows - math.ceil(cache.rows * validation_fraction)
+    model = SGDClassifier(loss="log_loss", random_state=seed, **params)
+    rng = np.random.default_rng(seed)
+
+    start_time = time.perf_counter()
+    for _ in range(epochs):
+        # Chunk order changes per epoch; rows within a chunk stay contiguous on disk.
+        for features, labels in cache.iter_chunks(0, split, chunk_size, rng):
+            model.partial_fit(features, labels, classes=CLASSES)
+
+    loss, correct = 0.0, 0
+    for features, labels in cache.iter_chunks(split, cache.rows, chunk_size):
+        probabilities = model.predict_proba(features)[:, 1]
+        loss += _log_loss(labels, probabilities)
+        correct += int(np.sum((probabilities > 0.5) == labels))
+    validation_rows = cache.rows - split
+    return {
+        "params": params,
+        "model": model,
+        "log_loss": loss / validation_rows if validation_rows else math.inf,
+        "accuracy": correct / validation_rows if validation_rows else 0.0,
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+def search(
+    cache: FeatureCache,
+    candidates: list[dict[str, Any]],
+    epochs: int = 5,
+    chunk_size: int = 100_000,
+    validation_fraction: float = 0.2,
+    workers: int | None = None,
+) -> list[dict[str, Any]]:
+    """Fit every candidate, in parallel processes when ``workers`` > 1; best result first."""
+    args = (epochs, chunk_size, validation_fraction)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(candidates) == 1:
+        results = [fit_candidate(str(cache.directory), params, *args) for params in candidates]
+    else:
+        import multiprocessing
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(candidates)), mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [executor.submit(fit_candidate, str(cache.directory), params, *args) for params in candidates]
+            results = [future.result() for future in futures]
+    for result in results:
+        logger.info(
+            "Candidate %s: log_loss=%.4f accuracy=%.4f in %.2f s",
+            result["params"], result["log_loss"], result["accuracy"], result["seconds"],
+        )
+    return sorted(results, key=lambda result: result["log_loss"])
+
+
+def parameter_grid(alphas: list[float], penalties: list[str]) -> list[dict[str, Any]]:
+    return [{"alpha": alpha, "penalty": penalty} for penalty in penalties for alpha in alphas]
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Iterable
+
+from app.database import RoutingPool
+from app.repositories.base import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+# Spread over the feature ranges so every branch of prepare_features runs at least once.
+SYNTHETIC_ADS = (
+    (True, 0, 0, 1),
+    (False, 3, 250, 12),
+    (True, 10, 1000, 100),
+    (False, 25, 5000, 500),
+)
+
+
+class Readiness:
+    """Warmup progress and the last readiness check, shared by lifespan and /readyz."""
+
+    def __init__(self, check_timeout: float = 0.5) -> None:
+        self.check_timeout = check_timeout
+        self.warmed_up = False
+        self.warmup_ms: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def phase(self, name: str) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.warmup_ms[name] = round((time.perf_counter() - start) * 1000, 3)
+            logger.info("Warmup %s took %.1f ms", name, self.warmup_ms[name])
+
+
+async def warm_model(model_manager, predictions: int) -> None:
+    """Run synthetic predictions through the backend, bypassing prediction metrics."""
+    for i in range(predictions):
+        features = model_manager.prepare_features(*SYNTHETIC_ADS[i % len(SYNTHETIC_ADS)])
+        await model_manager.backend.predict_proba(model_manager.model, features)
+
+
+async def warm_pool(pool, repositories: Iterable[BaseRepository]) -> int:
+    """Hold ``min_size`` connections at once and run the hot statements on each.
+
+    With read replicas every underlying pool is warmed.
+    """
+    queries = [query for repository in repositories for query in repository.warmup_queries]
+
+    async def prepare(conn) -> None:
+        for sql, args in queries:
+            await conn.fetch(sql, *args)
+
+    warmed = 0
+    for target in pool.pools if isinstance(pool, RoutingPool) else [pool]:
+        async with AsyncExitStack() as stack:
+            connections = [
+                await stack.enter_async_context(target.acquire()) for _ in range(target.get_min_size())
+            ]
+            await asyncio.gather(*(prepare(conn) for conn in connections))
+        warmed += len(connections)
+    return warmed
+
+
+async def _timed_check(check: Awaitable[Any], timeout: float) -> dict:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(check, timeout)
+        result = {"ok": True}
+    except Exception as e:
+        result = {"ok": False, "error": str(e) or type(e).__name__}
+    result["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+async def _check_model(model_manager) -> None:
+    if model_manager is None or model_manager.model is None:
+        raise RuntimeError("Model is not loaded")
+
+
+async def _check_database(pool) -> None:
+    if pool is None:
+        raise RuntimeError("Database pool is not initialized")
+    async with pool.acquire() as conn:
+        await conn.fetchval("SELECT 1")
+
+
+async def _check_kafka(kafka_producer) -> None:
+    if kafka_producer is None:
+        raise RuntimeError("Kafka producer is not initialized")
+    await kafka_producer.fetch_metadata()
+
+
+async def check_readiness(state, timeout: float) -> dict[str, dict]:
+    checks = {
+        "model": _check_model(getattr(state, "model_manager", None)),
+        "database": _check_database(getattr(state, "db_pool", None)),
+    }
+    if getattr(state, "kafka_enabled", True):
+        checks["kafka"] = _check_kafka(getattr(state, "kafka_producer", None))
+    results = await asyncio.gather(*(_timed_check(check, timeout) for check in checks.values()))
+    return dict(zip(checks, results))
@@ -0,0 +1,344 @@
+"""Replays moderation requests from the dead-letter topic.
+
+    python -m app.workers.dlq_replayer --error "timeout" --since 2024-05-01T00:00:00Z --rate 200
+    python -m app.workers.dlq_replayer --mode process --batch-size 1000 --concurrency 32
+
+The DLQ is read in ``getmany`` batches up to the end offsets seen at start,
+so entries that fail again during the run are left for the next one.
+Entries are filtered by error (regular expressions, any match) and by the
+time they were dead-lettered; entries that do not decode are only counted,
+and every item is replayed at most once per run.
+A replayed item gets a new pending task, as from ``/async_predict_batch``,
+and is then either republished to its priority's topic, paced by ``--rate``,
+or moderated in-process with ``handle_payload``, so failures go back to the
+DLQ. Offsets are committed per batch under ``--group``; a rerun continues
+after the last replayed batch unless ``--from-beginning`` is given.
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Sequence
+
+import asyncpg
+from aiokafka import AIOKafkaConsumer, TopicPartition
+
+from app.clients.codec import PRIORITIES, TIMESTAMP_FORMAT, utc_timestamp
+from app.clients.kafka import KafkaProducerClient, create_kafka_producer
+from app.config import Settings
+from app.features import feature_repository_for
+from app.inference import build_inference_backend
+from app.model import ModelManager
+from app.repositories import AdFeatureRepository, AdRepository, ModerationRepository
+from app.serialization import loads
+from app.telemetry.metrics import DLQ_REPLAY_ENTRIES_TOTAL
+from app.workers.moderation_worker import handle_payload
+
+logger = logging.getLogger(__name__)
+
+MODE_REPUBLISH = "republish"
+MODE_PROCESS = "process"
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+@dataclass
+class DLQFilter:
+    errors: list[re.Pattern] = field(default_factory=list)
+    since: datetime | None = None
+    until: datetime | None = None
+
+    def matches(self, entry: dict) -> bool:
+        if self.errors and not any(pattern.search(str(entry.get("error", ""))) for pattern in self.errors):
+            return False
+        if self.since is not None or self.until is not None:
+            try:
+                failed_at = parse_timestamp(entry["timestamp"])
+            except (KeyError, TypeError, ValueError):
+                return False
+            if self.since is not None and failed_at < self.since:
+                return False
+            if self.until is not None and failed_at >= self.until:
+                return False
+        return True
+
+
+def item_id_of(value: bytes | None) -> tuple[dict | None, int | None]:
+    """The decoded DLQ entry and its item id; records that were not valid requests have none."""
+    try:
+        entry = loads(value)
+    except (TypeError, ValueError):
+        return None, None
+    if not isinstance(entry, dict):
+        return None, None
+    original = entry.get("original_message")
+    item_id = original.get("item_id") if isinstance(original, dict) else None
+    if not isinstance(item_id, int) or isinstance(item_id, bool) or item_id <= 0:
+        return entry, None
+    return entry, item_id
+
+
+@dataclass
+class ReplayProgress:
+    read: int = 0
+    matched: int = 0
+    replayed: int = 0
+    invalid: int = 0
+    undecodable: int = 0
+    duplicate: int = 0
+    missing: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def entries_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        return (
+            f"read={self.read} matched={self.matched} replayed={self.replayed} invalid={self.invalid} "
+            f"undecodable={self.undecodable} duplicate={self.duplicate} missing={self.missing} "
+            f"({self.entries_per_second:.0f} entries/s)"
+        )
+
+
+class RateLimiter:
+    """Paces ``acquire(n)`` to ``rate`` items per second on average; no limit without a rate."""
+
+    def __init__(self, rate: float | None) -> None:
+        self.rate = rate
+        self._next = time.monotonic()
+
+    async def acquire(self, n: int) -> None:
+        if not self.rate:
+            return
+        now = time.monotonic()
+        self._next = max(self._next, now)
+        delay = self._next - now
+        self._next += n / self.rate
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+Sink = Callable[[list[int]], Awaitable[None]]
+
+
+def republisher(producer: KafkaProducerClient, priority: str) -> Sink:
+    async def send(item_ids: list[int]) -> None:
+        await producer.send_moderation_requests(item_ids, priority=priority)
+
+    return send
+
+
+def in_process(
+    settings: Settings,
+    ad_repository: AdRepository,
+    moderation_repository: ModerationRepository,
+    model_manager: ModelManager,
+    dlq_producer: KafkaProducerClient,
+    feature_repository: AdFeatureRepository | None,
+    concurrency: int,
+) -> Sink:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handle(item_id: int) -> None:
+        async with semaphore:
+            await handle_payload(
+                {"item_id": item_id, "timestamp": utc_timestamp()},
+                settings,
+                ad_repository,
+                moderation_repository,
+                model_manager,
+                dlq_producer,
+                feature_repository,
+            )
+
+    async def process(item_ids: list[int]) -> None:
+        await asyncio.gather(*(handle(item_id) for item_id in item_ids))
+
+    return process
+
+
+async def replay(
+    consumer: Any,
+    partitions: Sequence[TopicPartition],
+    dlq_filter: DLQFilter,
+    ad_repository: AdRepository,
+    moderation_repository: ModerationRepository,
+    sink: Sink | None,
+    batch_size: int = 500,
+    rate: float | None = None,
+    report_interval: float = 10.0,
+    mode: str = MODE_REPUBLISH,
+) -> ReplayProgress:
+    """Replay matching entries in ``partitions`` up to their current end.
+
+    With ``sink=None`` matching entries are only counted and no offsets are committed.
+    """
+    progress = ReplayProgress()
+    limiter = RateLimiter(rate)
+    end_offsets = await consumer.end_offsets(list(partitions))
+    remaining = {tp for tp in partitions if await consumer.position(tp) < end_offsets[tp]}
+    seen: set[int] = set()
+    last_report = time.perf_counter()
+
+    def count(outcome: str, n: int = 1) -> None:
+        if n:
+            DLQ_REPLAY_ENTRIES_TOTAL.labels(mode=mode, outcome=outcome).inc(n)
+
+    while remaining:
+        fetched = await consumer.getmany(*remaining, timeout_ms=1000, max_records=batch_size)
+        offsets = {}
+        item_ids = []
+        for tp, records in fetched.items():
+            for record in records:
+                if record.offset >= end_offsets[tp]:
+                    break
+                offsets[tp] = record.offset + 1
+                progress.read += 1
+                entry, item_id = item_id_of(record.value)
+                if entry is None:
+                    # Neither filterable nor replayable.
+                    progress.undecodable += 1
+                    count("undecodable")
+                    continue
+                if not dlq_filter.matches(entry):
+                    continue
+                progress.matched += 1
+                if item_id is None:
+                    progress.invalid += 1
+                    count("invalid")
+                elif item_id in seen:
+                    progress.duplicate += 1
+                    count("duplicate")
+                else:
+                    seen.add(item_id)
+                    item_ids.append(item_id)
+        # Transaction markers and compacted records take offsets that are never delivered.
+        for tp in list(remaining):
+            if await consumer.position(tp) >= end_offsets[tp]:
+                remaining.discard(tp)
+
+        if sink is not None:
+            if item_ids:
+                existing = await ad_repository.get_existing_ids(item_ids)
+                progress.missing += len(item_ids) - len(existing)
+                count("missing", len(item_ids) - len(existing))
+                item_ids = [item_id for item_id in item_ids if item_id in existing]
+            if item_ids:
+                await limiter.acquire(len(item_ids))
+                # The dead-lettered tasks are already failed; the worker needs a pending one.
+                await moderation_repository.create_pending_many(item_ids)
+                await sink(item_ids)
+                progress.replayed += len(item_ids)
+                count("replayed", len(item_ids))
+            if offsets:
+                await consumer.commit(offsets)
+
+        if time.perf_counter() - last_report >= report_interval:
+            last_report = time.perf_counter()
+            logger.info("DLQ replay progress: %s", progress.report())
+
+    logger.info("DLQ replay finished: %s", progress.report())
+    return progress
+
+
+async def assign_all(consumer: Any, topic: str, from_beginning: bool) -> list[TopicPartition]:
+    await consumer.topics()
+    partitions = [TopicPartition(topic, p) for p in sorted(consumer.partitions_for_topic(topic) or ())]
+    consumer.assign(partitions)
+    if from_beginning:
+        await consumer.seek_to_beginning(*partitions)
+    return partitions
+
+
+async def run(args: argparse.Namespace) -> ReplayProgress:
+    settings = Settings()
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(args.metrics_port)
+
+    pool = await asyncpg.create_pool(settings.database_dsn, min_size=1, max_size=max(2, min(args.concurrency, 20)))
+    ad_repository = AdRepository(pool)
+    moderation_repository = ModerationRepository(pool)
+    producer = create_kafka_producer(settings, include_dlq=True)
+    await producer.start()
+    consumer = AIOKafkaConsumer(
+        bootstrap_servers=settings.kafka_bootstrap_servers.split(","),
+        group_id=args.group,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+    )
+    await consumer.start()
+    model_manager = None
+    try:
+        partitions = await assign_all(consumer, settings.kafka_dlq_topic, args.from_beginning)
+        if args.dry_run:
+            sink = None
+        elif args.mode == MODE_PROCESS:
+            model_manager = ModelManager(model_path=settings.model_path, backend=build_inference_backend(settings))
+            await model_manager.initialize()
+            feature_repository = await feature_repository_for(pool, settings)
+            sink = in_process(
+                settings, ad_repository, moderation_repository, model_manager, producer, feature_repository,
+                args.concurrency,
+            )
+        else:
+            sink = republisher(producer, args.priority)
+        dlq_filter = DLQFilter(
+            errors=[re.compile(pattern) for pattern in args.error],
+            since=args.since,
+            until=args.until,
+        )
+        return await replay(
+            consumer,
+            partitions,
+            dlq_filter,
+            ad_repository,
+            moderation_repository,
+            sink,
+            batch_size=args.batch_size,
+            rate=args.rate,
+            report_interval=args.report_interval,
+            mode=args.mode,
+        )
+    finally:
+        await consumer.stop()
+        await producer.stop()
+        await pool.close()
+        if model_manager is not None:
+            model_manager.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=(MODE_REPUBLISH, MODE_PROCESS), default=MODE_REPUBLISH)
+    parser.add_argument("--error", action="append", default=[], help="regular expression on the error, repeatable")
+    parser.add_argument("--since", type=parse_timestamp, default=None, help="dead-lettered at or after, UTC")
+    parser.add_argument("--until", type=parse_timestamp, default=None, help="dead-lettered before, UTC")
+    parser.add_argument("--batch-size", type=int, default=500, help="DLQ entries per fetch")
+    parser.add_argument("--rate", type=float, default=None, help="replayed items per second, unlimited by default")
+    parser.add_argument("--priority", choices=PRIORITIES, default="low", help="lane for republished items")
+    parser.add_argument("--concurrency", type=int, default=16, help="items moderated at once in process mode")
+    parser.add_argument("--group", default="dlq-replayer", help="consumer group holding replay offsets")
+    parser.add_argument("--from-beginning", action="store_true", help="ignore offsets of earlier runs")
+    parser.add_argument("--dry-run", action="store_true", help="count matching entries without replaying")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="seconds between progress logs")
+    parser.add_argument("--metrics-port", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    progress = asyncio.run(run(parse_args(argv)))
+    print(progress.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Weighted consumption of the per-priority moderation topics.
+
+Records are fetched with ``getmany`` into a bounded buffer per lane and handed
+out by smooth weighted round-robin: with every lane backlogged, a lane of
+weight 8 gets eight records for each one of a lane of weight 1, and the share
+of an empty lane goes to the others. A lane whose buffer is full has its
+partitions paused, so fetches are spent on the lanes being drained, and is
+resumed once the buffer is half empty.
+
+The consumer must run with ``enable_auto_commit=False``: the worker ``ack``s
+each record once it is handled and only acked offsets are committed, before
+every fetch and on revocation, so buffered records are redelivered after a
+crash or rebalance rather than lost.
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+from aiokafka import ConsumerRebalanceListener, TopicPartition
+from aiokafka.errors import ConsumerStoppedError, KafkaError
+
+from app.clients.codec import DEFAULT_PRIORITY, PRIORITIES
+from app.telemetry.metrics import MODERATION_LANE_BUFFERED, MODERATION_LANE_PAUSED, MODERATION_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Lane:
+    name: str
+    topic: str
+    weight: int
+    buffer: deque = field(default_factory=deque)
+    paused: bool = False
+    # Smooth weighted round-robin credit.
+    credit: int = 0
+
+
+def build_lanes(topics: dict[str, str], weights: dict[str, int]) -> list[Lane]:
+    """One lane per distinct topic, highest priority first.
+
+    Priorities without a topic of their own share the ``normal`` lane.
+    """
+    lanes: dict[str, Lane] = {}
+    for priority in (DEFAULT_PRIORITY, *PRIORITIES):
+        topic = topics[priority]
+        if topic not in lanes:
+            weight = weights.get(priority, 1)
+            if weight < 1:
+                raise ValueError(f"Priority weight must be positive: {priority}={weight}")
+            lanes[topic] = Lane(priority, topic, weight)
+    return sorted(lanes.values(), key=lambda lane: PRIORITIES.index(lane.name))
+
+
+class LaneScheduler:
+    def __init__(self, consumer, lanes: list[Lane], buffer_size: int = 100, fetch_timeout_ms: int = 500) -> None:
+        self.consumer = consumer
+        self.lanes = lanes
+        self.buffer_size = buffer_size
+        self.fetch_timeout_ms = fetch_timeout_ms
+        self._by_topic = {lane.topic: lane for lane in lanes}
+        # Records handed out between fetches: one full weighted cycle.
+        self._round = sum(lane.weight for lane in lanes)
+        # Next offset to commit per partition, advanced by ``ack``.
+        self._acked: dict[TopicPartition, int] = {}
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self._by_topic)
+
+    def subscribe(self) -> None:
+        self.consumer.subscribe(topics=self.topics, listener=_CommitOnRevoke(self))
+
+    def ack(self, record: Any) -> None:
+        """Mark ``record`` handled; its offset is committed with the next batch."""
+        self._acked[TopicPartition(record.topic, record.partition)] = record.offset + 1
+
+    async def commit(self) -> None:
+        if not self._acked:
+            return
+        # A record finished after its partition was revoked belongs to the new owner now.
+        assigned = self.consumer.assignment()
+        offsets = {tp: offset for tp, offset in self._acked.items() if tp in assigned}
+        self._acked.clear()
+        if not offsets:
+            return
+        try:
+            await self.consumer.commit(offsets)
+        except KafkaError as e:
+            logger.warning("Offset commit failed, handled records may be redelivered: %s", e)
+
+    def drop(self, partitions: set) -> None:
+        """Forget buffered records of revoked partitions; the new owner fetches them again."""
+        for lane in self.lanes:
+            if any(tp.topic == lane.topic for tp in partitions):
+                lane.buffer = deque(
+                    record
+                    for record in lane.buffer
+                    if TopicPartition(record.topic, record.partition) not in partitions
+                )
+
+    def __aiter__(self) -> AsyncIterator[tuple[Lane, Any]]:
+        return self._records()
+
+    async def _records(self) -> AsyncIterator[tuple[Lane, Any]]:
+        while True:
+            await self.commit()
+            self._apply_backpressure()
+            # Block for new records only when there is nothing buffered to hand out.
+            timeout = 0 if any(lane.buffer for lane in self.lanes) else self.fetch_timeout_ms
+            try:
+                fetched = await self.consumer.getmany(timeout_ms=timeout, max_records=self.buffer_size)
+            except ConsumerStoppedError:
+                return
+            for partition, records in fetched.items():
+                self._by_topic[partition.topic].buffer.extend(records)
+
+            for _ in range(self._round):
+                lane = self._next_lane()
+                if lane is None:
+                    break
+                record = lane.buffer.popleft()
+                MODERATION_QUEUE_WAIT.labels(lane=lane.name).observe(max(0.0, time.time() - record.timestamp / 1000))
+                yield lane, record
+
+    def _next_lane(self) -> Lane | None:
+        ready = []
+        total = 0
+        for lane in self.lanes:
+            if lane.buffer:
+                lane.credit += lane.weight
+                total += lane.weight
+                ready.append(lane)
+            else:
+                # An idle lane does not save up credit for a burst later.
+                lane.credit = 0
+        if not ready:
+            return None
+        chosen = max(ready, key=lambda lane: lane.credit)
+        chosen.credit -= total
+        return chosen
+
+    def _apply_backpressure(self) -> None:
+        for lane in self.lanes:
+            size = len(lane.buffer)
+            if size >= self.buffer_size:
+                # Repeated every round so partitions assigned after a rebalance are paused too.
+                self.consumer.pause(*self._partitions(lane))
+                lane.paused = True
+            elif lane.paused and size <= self.buffer_size // 2:
+                self.consumer.resume(*self._partitions(lane))
+                lane.paused = False
+                logger.debug("Resumed lane %s", lane.name)
+            MODERATION_LANE_BUFFERED.labels(lane=lane.name).set(size)
+            MODERATION_LANE_PAUSED.labels(lane=lane.name).set(int(lane.paused))
+
+    def _partitions(self, lane: Lane) -> list:
+        return [partition for partition in self.consumer.assignment() if partition.topic == lane.topic]
+
+
+class _CommitOnRevoke(ConsumerRebalanceListener):
+    def __init__(self, scheduler: LaneScheduler) -> None:
+        self.scheduler = scheduler
+
+    async def on_partitions_revoked(self, revoked) -> None:
+        await self.scheduler.commit()
+        self.scheduler.drop(set(revoked))
+
+    async def on_partitions_assigned(self, assigned) -> None:
+        pass
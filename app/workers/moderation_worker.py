@@ -1,15 +1,23 @@
 import asyncio
-import json
 import logging
 import signal
 
 import asyncpg
 from aiokafka import AIOKafkaConsumer
 
-from app.clients.kafka import KafkaProducerClient, create_kafka_producer
+from app.clients.codec import WIRE_FORMAT_BINARY, decode_record, wire_format_of
+from app.clients.kafka import KafkaProducerClient, create_kafka_producer, priority_topics
 from app.config import Settings
+from app.exceptions import InvalidMessageError
+from app.features import feature_repository_for, predict_with_features
+from app.inference import build_inference_backend
 from app.model import ModelManager
-from app.repositories import AdRepository, ModerationRepository
+from app.registry import ModelRegistry
+from app.repositories import AdFeatureRepository, AdRepository, ModerationRepository
+from app.shadow import start_shadow
+from app.telemetry.metrics import MODERATION_MESSAGE_BYTES_PER_ITEM, MODERATION_MESSAGE_ITEMS_TOTAL
+from app.telemetry.startup import StartupProfile
+from app.workers.lanes import LaneScheduler, build_lanes
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -21,6 +29,7 @@ async def process_message(
     moderation_repository: ModerationRepository,
     model_manager: ModelManager,
     dlq_producer: KafkaProducerClient,
+    feature_repository: AdFeatureRepository | None = None,
 ) -> None:
     item_id = payload.get("item_id")
     if item_id is None:
@@ -30,19 +39,23 @@ async def process_message(
     if task_id is None:
         raise ValueError(f"No pending task for item_id={item_id}")
 
-    row = await ad_repository.get_with_user_by_id(item_id)
-    if row is None:
-        error_msg = f"Ad not found: item_id={item_id}"
-        await moderation_repository.update_failed(task_id, error_msg)
-        await dlq_producer.send_to_dlq(payload, error_msg, retry_count=1)
-        return
-
-    result = await model_manager.predict(
-        row["is_verified"],
-        row["images_qty"],
-        len(row["description"]),
-        row["category"],
-    )
+    result = None
+    if feature_repository is not None:
+        result = await predict_with_features(item_id, model_manager, feature_repository)
+    if result is None:
+        row = await ad_repository.get_with_user_by_id(item_id)
+        if row is None:
+            error_msg = f"Ad not found: item_id={item_id}"
+            await moderation_repository.update_failed(task_id, error_msg)
+            await dlq_producer.send_to_dlq(payload, error_msg, retry_count=1)
+            return
+
+        result = await model_manager.predict(
+            row["is_verified"],
+            row["images_qty"],
+            len(row["description"]),
+            row["category"],
+        )
     await moderation_repository.update_completed(
         task_id,
         is_violation=bool(result["is_violation"]),
@@ -51,27 +64,98 @@ async def process_message(
     logger.info("Processed task_id=%s item_id=%s", task_id, item_id)
 
 
+async def handle_payload(
+    payload: dict,
+    settings: Settings,
+    ad_repository: AdRepository,
+    moderation_repository: ModerationRepository,
+    model_manager: ModelManager,
+    dlq_producer: KafkaProducerClient,
+    feature_repository: AdFeatureRepository | None = None,
+) -> None:
+    for attempt in range(1, settings.worker_max_retries + 1):
+        try:
+            await process_message(
+                payload,
+                ad_repository,
+                moderation_repository,
+                model_manager,
+                dlq_producer,
+                feature_repository,
+            )
+            break
+        except ValueError as e:
+            error_msg = str(e)
+            task_id = await moderation_repository.get_oldest_pending_by_item_id(
+                payload.get("item_id") or 0
+            )
+            try:
+                if task_id is not None:
+                    await moderation_repository.update_failed(task_id, error_msg)
+                await dlq_producer.send_to_dlq(payload, error_msg, retry_count=attempt)
+            except Exception as dlq_err:
+                logger.exception("Failed to update failed status or send to DLQ: %s", dlq_err)
+            break
+        except Exception as e:
+            if attempt < settings.worker_max_retries:
+                logger.warning("Retry attempt %s: %s", attempt, e)
+                await asyncio.sleep(settings.worker_retry_delay_seconds)
+            else:
+                task_id = await moderation_repository.get_oldest_pending_by_item_id(
+                    payload.get("item_id") or 0
+                )
+                try:
+                    if task_id is not None:
+                        await moderation_repository.update_failed(task_id, str(e))
+                    await dlq_producer.send_to_dlq(
+                        payload, str(e), retry_count=attempt
+                    )
+                except Exception as dlq_err:
+                    logger.exception("Failed to update failed status or send to DLQ: %s", dlq_err)
+
+
 async def run_worker() -> None:
-    settings = Settings()
-    pool = await asyncpg.create_pool(
-        settings.database_dsn, min_size=1, max_size=5
-    )
+    profile = StartupProfile()
+    with profile.phase("settings"):
+        settings = Settings()
+    with profile.phase("db_pool"):
+        pool = await asyncpg.create_pool(
+            settings.database_dsn, min_size=1, max_size=5
+        )
     ad_repository = AdRepository(pool)
     moderation_repository = ModerationRepository(pool)
-
-    model_manager = ModelManager()
-    await model_manager.initialize()
-
-    dlq_producer = create_kafka_producer(settings, include_dlq=True)
-    await dlq_producer.start()
-
+    feature_repository = await feature_repository_for(pool, settings)
+
+    with profile.phase("model"):
+        model_manager = ModelManager(
+            model_path=settings.model_path, backend=build_inference_backend(settings)
+        )
+        await model_manager.initialize()
+        if settings.model_registry:
+            model_manager = ModelRegistry.from_settings(model_manager, settings)
+            await model_manager.initialize()
+    with profile.phase("shadow"):
+        shadow = await start_shadow(model_manager, settings)
+
+    with profile.phase("kafka"):
+        dlq_producer = create_kafka_producer(settings, include_dlq=True)
+        await dlq_producer.start()
+
+    lanes = build_lanes(priority_topics(settings), settings.kafka_priority_weights)
     consumer = AIOKafkaConsumer(
-        settings.kafka_moderation_topic,
         bootstrap_servers=settings.kafka_bootstrap_servers.split(","),
         group_id="moderation-worker",
         auto_offset_reset="earliest",
+        # The scheduler commits only records that were handled, not ones still buffered.
+        enable_auto_commit=False,
+    )
+    scheduler = LaneScheduler(
+        consumer, lanes, settings.worker_lane_buffer_size, settings.worker_fetch_timeout_ms
     )
-    await consumer.start()
+    scheduler.subscribe()
+    with profile.phase("kafka_consumer"):
+        await consumer.start()
+    profile.finish()
 
     shutdown = asyncio.Event()
 
@@ -85,66 +169,52 @@ async def run_worker() -> None:
     except NotImplementedError:
         pass
 
-    logger.info("Worker started, topic=%s", settings.kafka_moderation_topic)
+    logger.info(
+        "Worker started, lanes=%s", ", ".join(f"{lane.name}:{lane.topic}x{lane.weight}" for lane in lanes)
+    )
 
     try:
-        async for msg in consumer:
+        async for _, msg in scheduler:
             if shutdown.is_set():
                 break
+            wire_format = wire_format_of(msg.headers)
             try:
-                payload = json.loads(msg.value.decode())
-            except json.JSONDecodeError as e:
-                raw = msg.value.decode(errors="replace") if msg.value else ""
+                payloads = decode_record(msg.value, msg.headers)
+            except InvalidMessageError as e:
+                raw = ""
+                if msg.value:
+                    raw = msg.value.hex() if wire_format == WIRE_FORMAT_BINARY else msg.value.decode(errors="replace")
                 try:
-                    await dlq_producer.send_to_dlq(
-                        {"raw": raw}, f"Invalid JSON: {e}", retry_count=0
-                    )
+                    await dlq_producer.send_to_dlq({"raw": raw}, str(e), retry_count=0)
                 except Exception as send_err:
-                    logger.exception("Failed to send invalid JSON to DLQ: %s", send_err)
+                    logger.exception("Failed to send invalid message to DLQ: %s", send_err)
+                scheduler.ack(msg)
                 continue
 
-            for attempt in range(1, settings.worker_max_retries + 1):
-                try:
-                    await process_message(
-                        payload,
-                        ad_repository,
-                        moderation_repository,
-                        model_manager,
-                        dlq_producer,
-                    )
-                    break
-                except ValueError as e:
-                    error_msg = str(e)
-                    task_id = await moderation_repository.get_oldest_pending_by_item_id(
-                        payload.get("item_id") or 0
-                    )
-                    try:
-                        if task_id is not None:
-                            await moderation_repository.update_failed(task_id, error_msg)
-                        await dlq_producer.send_to_dlq(payload, error_msg, retry_count=attempt)
-                    except Exception as dlq_err:
-                        logger.exception("Failed to update failed status or send to DLQ: %s", dlq_err)
-                    break
-                except Exception as e:
-                    if attempt < settings.worker_max_retries:
-                        logger.warning("Retry attempt %s: %s", attempt, e)
-                        await asyncio.sleep(settings.worker_retry_delay_seconds)
-                    else:
-                        task_id = await moderation_repository.get_oldest_pending_by_item_id(
-                            payload.get("item_id") or 0
-                        )
-                        try:
-                            if task_id is not None:
-                                await moderation_repository.update_failed(task_id, str(e))
-                            await dlq_producer.send_to_dlq(
-                                payload, str(e), retry_count=attempt
-                            )
-                        except Exception as dlq_err:
-                            logger.exception("Failed to update failed status or send to DLQ: %s", dlq_err)
+            MODERATION_MESSAGE_ITEMS_TOTAL.labels(wire_format=wire_format).inc(len(payloads))
+            if payloads:
+                MODERATION_MESSAGE_BYTES_PER_ITEM.labels(wire_format=wire_format).observe(
+                    len(msg.value) / len(payloads)
+                )
+            for payload in payloads:
+                await handle_payload(
+                    payload,
+                    settings,
+                    ad_repository,
+                    moderation_repository,
+                    model_manager,
+                    dlq_producer,
+                    feature_repository,
+                )
+            scheduler.ack(msg)
     finally:
+        await scheduler.commit()
         await consumer.stop()
         await dlq_producer.stop()
         await pool.close()
+        if shadow:
+            await shadow.stop()
+        model_manager.close()
         logger.info("Worker stopped")
 
 
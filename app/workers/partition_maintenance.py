@@ -0,0 +1,276 @@
+"""Keeps moderation_results partitions ahead of time and retires old ones.
+
+    python -m app.workers.partition_maintenance --once
+    python -m app.workers.partition_maintenance --interval 3600 --metrics-port 9102
+
+Each run records how far the id sequence has got, creates monthly
+partitions for the next ``premake`` months and detaches partitions that
+ended more than ``retention`` months ago. With an
+archive directory, detached partitions are written there as gzip-compressed
+CSV and dropped; without one they stay as standalone tables.
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import re
+import signal
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import asyncpg
+
+from app.config import Settings
+from app.telemetry.metrics import (
+    PARTITION_ROWS_ESTIMATE,
+    PARTITION_SIZE_BYTES,
+    PARTITIONS_ARCHIVED_TOTAL,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+TABLE = "moderation_results"
+PARTITION_PREFIX = f"{TABLE}_p"
+ID_MARKS = f"{TABLE}_id_marks"
+
+_BOUND = re.compile(r"FROM \((?:'([^']+)'|MINVALUE)\) TO \((?:'([^']+)'|MAXVALUE)\)")
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+@dataclass(frozen=True)
+class Partition:
+    name: str
+    lower: datetime | None
+    upper: datetime | None
+
+    @classmethod
+    def from_bound(cls, name: str, bound: str) -> "Partition | None":
+        """Parse ``pg_get_expr(relpartbound)``; the default partition has no range."""
+        match = _BOUND.search(bound)
+        if match is None:
+            return None
+        lower, upper = (datetime.fromisoformat(value) if value else None for value in match.groups())
+        return cls(name, lower, upper)
+
+    def covers(self, moment: datetime) -> bool:
+        return (self.lower is None or self.lower <= moment) and (self.upper is None or moment < self.upper)
+
+
+class PartitionMaintenance:
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        premake_months: int = 3,
+        retention_months: int = 6,
+        archive_dir: Path | None = None,
+    ) -> None:
+        self._pool = pool
+        self.premake_months = premake_months
+        self.retention_months = retention_months
+        self.archive_dir = archive_dir
+
+    async def partitions(self) -> list[Partition]:
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bound
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = $1::regclass
+                """,
+                TABLE,
+            )
+        partitions = (Partition.from_bound(row["name"], row["bound"]) for row in rows)
+        return sorted((p for p in partitions if p is not None), key=lambda p: p.upper or datetime.max)
+
+    async def mark_ids(self) -> None:
+        """Record the last id handed out so far; repositories bound lookups by id with these marks."""
+        async with self._pool.acquire() as conn:
+            await conn.execute(
+                f"""
+                INSERT INTO {ID_MARKS} (last_id, marked_at)
+                SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END, clock_timestamp()
+                FROM {TABLE}_id_seq
+                ON CONFLICT (last_id) DO NOTHING
+                """
+            )
+
+    async def create_future_partitions(self, now: datetime) -> list[str]:
+        existing = await self.partitions()
+        created = []
+        current = month_start(now)
+        async with self._pool.acquire() as conn:
+            for offset in range(self.premake_months + 1):
+                month = add_months(current, offset)
+                # The legacy partition may extend past the month the table was partitioned in.
+                if any(p.covers(month) for p in existing):
+                    continue
+                name = partition_name(month)
+                await conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+                )
+                logger.info("Created partition %s", name)
+                created.append(name)
+        return created
+
+    async def detach_expired_partitions(self, now: datetime) -> list[str]:
+        cutoff = add_months(month_start(now), -self.retention_months)
+        detached = []
+        async with self._pool.acquire() as conn:
+            for partition in await self.partitions():
+                if partition.upper is None or partition.upper > cutoff:
+                    continue
+                await conn.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}")
+                logger.info("Detached partition %s (rows before %s)", partition.name, partition.upper)
+                detached.append(partition.name)
+            # Only ids of attached partitions are looked up.
+            await conn.execute(f"DELETE FROM {ID_MARKS} WHERE marked_at < $1", cutoff)
+        return detached
+
+    async def detached_tables(self) -> list[str]:
+        """Former partitions that are no longer attached, including ones left by an interrupted run."""
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT c.relname AS name
+                FROM pg_class c
+                WHERE c.relkind = 'r'
+                  AND (c.relname ~ $1 OR c.relname = $2)
+                  AND NOT c.relispartition
+                ORDER BY c.relname
+                """,
+                f"^{PARTITION_PREFIX}[0-9]{{6}}$",
+                f"{TABLE}_legacy",
+            )
+        return [row["name"] for row in rows]
+
+    async def archive_table(self, name: str) -> Path:
+        """Stream the table into ``<archive_dir>/<name>.csv.gz`` and drop it once the file is complete."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        target = self.archive_dir / f"{name}.csv.gz"
+        partial = target.with_name(target.name + ".partial")
+        async with self._pool.acquire() as conn:
+            with gzip.open(partial, "wb") as archive:
+
+                async def write(chunk: bytes) -> None:
+                    archive.write(chunk)
+
+                await conn.copy_from_table(name, output=write, format="csv", header=True)
+            with open(partial, "rb") as f:
+                os.fsync(f.fileno())
+            partial.replace(target)
+            await conn.execute(f"DROP TABLE {name}")
+        PARTITIONS_ARCHIVED_TOTAL.inc()
+        logger.info("Archived %s to %s", name, target)
+        return target
+
+    async def export_sizes(self) -> None:
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT c.relname AS name,
+                       pg_total_relation_size(c.oid) AS bytes,
+                       GREATEST(c.reltuples, 0)::bigint AS rows
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = $1::regclass
+                """,
+                TABLE,
+            )
+        PARTITION_SIZE_BYTES.clear()
+        PARTITION_ROWS_ESTIMATE.clear()
+        for row in rows:
+            PARTITION_SIZE_BYTES.labels(partition=row["name"]).set(row["bytes"])
+            PARTITION_ROWS_ESTIMATE.labels(partition=row["name"]).set(row["rows"])
+
+    async def run_once(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        await self.mark_ids()
+        await self.create_future_partitions(now)
+        await self.detach_expired_partitions(now)
+        if self.archive_dir is not None:
+            for name in await self.detached_tables():
+                await self.archive_table(name)
+        await self.export_sizes()
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = Settings()
+    pool = await asyncpg.create_pool(settings.database_dsn, min_size=1, max_size=2)
+    archive_dir = args.archive_dir or settings.partition_archive_dir
+    maintenance = PartitionMaintenance(
+        pool,
+        premake_months=(
+            args.premake_months if args.premake_months is not None else settings.partition_premake_months
+        ),
+        retention_months=(
+            args.retention_months if args.retention_months is not None else settings.partition_retention_months
+        ),
+        archive_dir=Path(archive_dir) if archive_dir else None,
+    )
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(args.metrics_port)
+
+    shutdown = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, shutdown.set)
+        except NotImplementedError:
+            pass
+
+    try:
+        while True:
+            try:
+                await maintenance.run_once()
+            except Exception:
+                logger.exception("Partition maintenance failed")
+                if args.once:
+                    raise
+            if args.once:
+                break
+            try:
+                await asyncio.wait_for(shutdown.wait(), args.interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await pool.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--interval", type=float, default=3600.0, help="seconds between passes")
+    parser.add_argument("--premake-months", type=int, default=None)
+    parser.add_argument("--retention-months", type=int, default=None)
+    parser.add_argument("--archive-dir", default=None, help="archive and drop detached partitions here")
+    parser.add_argument("--metrics-port", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
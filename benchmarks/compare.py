@@ -0,0 +1,51 @@
+"""Compare two benchmark result files, e.g. from two branches.
+
+    python -m benchmarks.compare benchmarks/results/e2e-main.json benchmarks/results/e2e-feature.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Iterator
+
+
+def flatten(data: Any, prefix: str = "") -> Iterator[tuple[str, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        yield prefix, float(data)
+
+
+def load_metrics(path: Path) -> dict[str, float]:
+    with open(path) as f:
+        data = json.load(f)
+    data.pop("environment", None)
+    data.pop("parameters", None)
+    return dict(flatten(data))
+
+
+def compare(baseline: dict[str, float], current: dict[str, float]) -> list[tuple[str, float, float, float]]:
+    rows = []
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((key, before, after, change))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    args = parser.parse_args(argv)
+
+    rows = compare(load_metrics(args.baseline), load_metrics(args.current))
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for key, before, after, change in rows:
+        print(f"{key:<{width}}  {before:>12.3f}  {after:>12.3f}  {change:>+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
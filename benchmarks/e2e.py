@@ -0,0 +1,261 @@
+"""End-to-end benchmark of the API and the moderation worker.
+
+Runs the real FastAPI app (through its lifespan) and ``run_worker`` against the
+in-memory fakes from ``benchmarks.fakes``:
+
+    python -m benchmarks.e2e --requests 2000 --concurrency 32 --db-latency-ms 1
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+from benchmarks.fakes import FakeBroker, FakeConsumer, FakeDatabase, FakePool, FakeProducer
+from benchmarks.stats import ROOT, environment_info, save_results, summarize_latencies
+
+ENDPOINTS = ("/predict", "/simple_predict", "/async_predict", "/async_predict_batch")
+
+
+def _payload(endpoint: str, item_ids: list[int], n: int, batch_size: int) -> dict:
+    item_id = item_ids[n % len(item_ids)]
+    if endpoint == "/async_predict_batch":
+        start = n * batch_size % len(item_ids)
+        return {"item_ids": [item_ids[(start + i) % len(item_ids)] for i in range(batch_size)]}
+    if endpoint == "/predict":
+        return {
+            "seller_id": 1,
+            "is_verified_seller": item_id % 2 == 0,
+            "item_id": item_id,
+            "name": "Item",
+            "description": "x" * (item_id % 700),
+            "category": item_id % 100,
+            "images_qty": item_id % 10,
+        }
+    return {"item_id": item_id}
+
+
+class Harness:
+    def __init__(self, db_latency: float, kafka_latency: float, ads_count: int) -> None:
+        self.db = FakeDatabase(latency=db_latency)
+        self.broker = FakeBroker(latency=kafka_latency)
+        self.item_ids = self.db.seed(ads_count)
+        self._stack = ExitStack()
+
+    def __enter__(self) -> "Harness":
+        async def create_pool(*args, min_size: int = 1, max_size: int = 10, **kwargs) -> FakePool:
+            return FakePool(self.db, min_size=min_size, max_size=max_size)
+
+        self._stack.enter_context(patch("asyncpg.create_pool", create_pool))
+        self._stack.enter_context(
+            patch("aiokafka.AIOKafkaProducer", partial(FakeProducer, self.broker))
+        )
+        self._stack.enter_context(
+            patch(
+                "app.workers.moderation_worker.AIOKafkaConsumer",
+                partial(FakeConsumer, broker=self.broker),
+            )
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stack.close()
+
+
+async def bench_endpoint(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    item_ids: list[int],
+    requests: int,
+    concurrency: int,
+    batch_size: int,
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def user() -> None:
+        nonlocal errors
+        while (n := next(counter)) < requests:
+            payload = _payload(endpoint, item_ids, n, batch_size)
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    summary = summarize_latencies(latencies, time.perf_counter() - started)
+    summary["errors"] = errors
+    return summary
+
+
+async def bench_http(harness: Harness, args: argparse.Namespace) -> dict:
+    from app.main import app
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for endpoint in args.endpoints:
+                await bench_endpoint(
+                    client, endpoint, harness.item_ids, args.warmup, args.concurrency, args.batch_size
+                )
+                results[endpoint] = await bench_endpoint(
+                    client, endpoint, harness.item_ids, args.requests, args.concurrency, args.batch_size
+                )
+                logging.getLogger(__name__).warning("%s: %s", endpoint, results[endpoint])
+    return results
+
+
+def _queue_wait_by_lane() -> dict[str, list[float]]:
+    """``{lane: [total seconds, records]}`` from the worker's queue wait histogram."""
+    from prometheus_client import REGISTRY
+
+    totals: dict[str, list[float]] = {}
+    for metric in REGISTRY.collect():
+        if metric.name == "moderation_queue_wait_seconds":
+            for sample in metric.samples:
+                if sample.name.endswith("_sum"):
+                    totals.setdefault(sample.labels["lane"], [0.0, 0.0])[0] = sample.value
+                elif sample.name.endswith("_count"):
+                    totals.setdefault(sample.labels["lane"], [0.0, 0.0])[1] = sample.value
+    return totals
+
+
+async def bench_worker(
+    harness: Harness, messages: int, wire_format: str, items_per_record: int, backfill: int = 0
+) -> dict:
+    from app.clients.codec import binary_headers, encode_moderation_batch
+    from app.clients.kafka import ModerationMessage
+    from app.config import Settings
+    from app.workers import moderation_worker
+
+    topic = Settings().kafka_moderation_topic
+    backfill_topic = f"{topic}_backfill"
+    harness.broker.topics.clear()
+    harness.db.clear_moderation_results()
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # A backfill queued ahead of the measured messages, on the low-priority lane.
+    for n in range(backfill):
+        item_id = harness.item_ids[n % len(harness.item_ids)]
+        harness.db.insert_pending(item_id)
+        harness.broker.append(backfill_topic, ModerationMessage(item_id=item_id, timestamp=timestamp).encode())
+    task_ids = []
+    item_ids = [harness.item_ids[n % len(harness.item_ids)] for n in range(messages)]
+    for item_id in item_ids:
+        task_ids.append(harness.db.insert_pending(item_id))
+    if wire_format == "binary":
+        for i in range(0, len(item_ids), items_per_record):
+            harness.broker.append(
+                topic, encode_moderation_batch(item_ids[i:i + items_per_record]), headers=binary_headers()
+            )
+    else:
+        for item_id in item_ids:
+            harness.broker.append(topic, ModerationMessage(item_id=item_id, timestamp=timestamp).encode())
+    record_bytes = sum(len(record.value) for record in harness.broker.topics[topic])
+
+    latencies: list[float] = []
+    window: list[float] = []
+    original = moderation_worker.process_message
+
+    async def timed_process_message(*args, **kwargs):
+        start = time.perf_counter()
+        if not window:
+            window.append(start)
+        await original(*args, **kwargs)
+        end = time.perf_counter()
+        latencies.append(end - start)
+        window[1:] = [end]
+
+    lanes = {"KAFKA_PRIORITY_TOPICS": json.dumps({"low": backfill_topic})} if backfill else {}
+    waits_before = _queue_wait_by_lane()
+    with patch.object(moderation_worker, "process_message", timed_process_message), patch.dict(os.environ, lanes):
+        await moderation_worker.run_worker()
+    waits = {}
+    for lane, (total, count) in _queue_wait_by_lane().items():
+        total_before, count_before = waits_before.get(lane, (0.0, 0.0))
+        if count > count_before:
+            waits[lane] = round((total - total_before) / (count - count_before) * 1000, 3)
+
+    elapsed = window[-1] - window[0] if len(window) == 2 else 0.0
+    summary = summarize_latencies(latencies, elapsed)
+    summary["messages_per_sec"] = summary.pop("rps")
+    results = harness.db.moderation_results
+    summary["left_pending"] = sum(1 for task_id in task_ids if results[task_id]["status"] == "pending")
+    summary["records"] = len(harness.broker.topics[topic])
+    summary["bytes_per_item"] = record_bytes / messages
+    summary["mean_queue_wait_ms"] = waits
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with Harness(args.db_latency_ms / 1000, args.kafka_latency_ms / 1000, args.ads) as harness:
+        http_results = await bench_http(harness, args)
+        worker_results = {}
+        if args.worker_messages:
+            worker_results = await bench_worker(
+                harness, args.worker_messages, args.wire_format, args.items_per_record, args.backfill_messages
+            )
+    return {
+        "environment": environment_info(),
+        "parameters": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "batch_size": args.batch_size,
+            "db_latency_ms": args.db_latency_ms,
+            "kafka_latency_ms": args.kafka_latency_ms,
+            "worker_messages": args.worker_messages,
+            "wire_format": args.wire_format,
+            "items_per_record": args.items_per_record,
+            "backfill_messages": args.backfill_messages,
+        },
+        "http": http_results,
+        "worker": worker_results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--db-latency-ms", type=float, default=0.5)
+    parser.add_argument("--kafka-latency-ms", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=100, help="items per /async_predict_batch call")
+    parser.add_argument("--ads", type=int, default=1000, help="ads seeded into the fake database")
+    parser.add_argument("--worker-messages", type=int, default=2000)
+    parser.add_argument("--wire-format", choices=("json", "binary"), default="json")
+    parser.add_argument("--items-per-record", type=int, default=100, help="items packed per binary record")
+    parser.add_argument(
+        "--backfill-messages", type=int, default=0, help="low-priority backlog queued ahead of the worker messages"
+    )
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS), choices=ENDPOINTS)
+    parser.add_argument("--output", type=Path, default=None, help="JSON results file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    # The app configures INFO logging on import; per-request log lines would dominate the profile.
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    output = args.output or ROOT / "benchmarks" / "results" / f"e2e-{results['environment']['git_branch']}.json"
+    save_results(output, results)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
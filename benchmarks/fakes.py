@@ -0,0 +1,376 @@
+"""In-memory stand-ins for asyncpg and aiokafka used by the benchmark suite.
+
+They implement just enough of the client APIs used by ``app`` to run the real
+routes, repositories and worker loop without Postgres or Kafka. Every round
+trip can be delayed by a configurable latency to model network cost.
+"""
+
+import asyncio
+import re
+import time
+from collections import defaultdict, namedtuple
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from aiokafka.errors import ConsumerStoppedError
+
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+
+class FakeDatabase:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.users: dict[int, dict] = {}
+        self.ads: dict[int, dict] = {}
+        self.moderation_results: dict[int, dict] = {}
+        self._pending_by_item: dict[int, list[int]] = defaultdict(list)
+        self._sequences: dict[str, int] = defaultdict(int)
+        self._handlers: list[tuple[re.Pattern, Callable[..., Any]]] = [
+            (re.compile(r"^INSERT INTO users \(is_verified\)"), self._insert_user),
+            (re.compile(r"^SELECT id, is_verified FROM users WHERE id = \$1"), self._select_user),
+            (re.compile(r"^INSERT INTO ads \("), self._insert_ad),
+            (re.compile(r"^SELECT a\.id, a\.images_qty, .* JOIN users u .* WHERE a\.id = \$1"), self._select_ad_with_user),
+            (re.compile(r"^INSERT INTO moderation_results \(item_id, status\) VALUES \(\$1"), self.insert_pending),
+            (re.compile(r"^INSERT INTO moderation_results \(item_id, status\) SELECT item_id, 'pending' FROM unnest"), self._insert_pending_many),
+            (re.compile(r"^SELECT id FROM ads WHERE id = ANY\(\$1"), self._select_existing_ads),
+            (re.compile(r"^SELECT id FROM moderation_results WHERE item_id = \$1 AND status = 'pending'"), self._select_oldest_pending),
+            (re.compile(r"^SELECT id, item_id, status, .* FROM moderation_results WHERE id = \$1"), self._select_result),
+            (re.compile(r"^UPDATE moderation_results SET status = 'completed'"), self._update_completed),
+            (re.compile(r"^UPDATE moderation_results SET status = 'failed'"), self._update_failed),
+            (re.compile(r"^SELECT 1$"), lambda: 1),
+        ]
+
+    def next_id(self, table: str) -> int:
+        self._sequences[table] += 1
+        return self._sequences[table]
+
+    def seed(self, ads_count: int) -> list[int]:
+        item_ids = []
+        for i in range(ads_count):
+            user_id = self._insert_user(i % 2 == 0)
+            item_ids.append(
+                self._insert_ad(user_id, f"Item {i}", "x" * (i % 700), i % 100, i % 10)
+            )
+        return item_ids
+
+    def clear_moderation_results(self) -> None:
+        self.moderation_results.clear()
+        self._pending_by_item.clear()
+
+    async def run(self, query: str, args: tuple) -> Any:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        normalized = _normalize(query)
+        for pattern, handler in self._handlers:
+            if pattern.search(normalized):
+                return handler(*args)
+        raise NotImplementedError(f"FakeDatabase does not support query: {normalized}")
+
+    def _insert_user(self, is_verified: bool) -> int:
+        user_id = self.next_id("users")
+        self.users[user_id] = {"id": user_id, "is_verified": is_verified}
+        return user_id
+
+    def _select_user(self, user_id: int) -> dict | None:
+        return self.users.get(user_id)
+
+    def _insert_ad(self, user_id, name, description, category, images_qty=0) -> int:
+        ad_id = self.next_id("ads")
+        self.ads[ad_id] = {
+            "id": ad_id,
+            "user_id": user_id,
+            "name": name,
+            "description": description,
+            "category": category,
+            "images_qty": images_qty,
+        }
+        return ad_id
+
+    def _select_ad_with_user(self, item_id: int) -> dict | None:
+        ad = self.ads.get(item_id)
+        if ad is None:
+            return None
+        user = self.users[ad["user_id"]]
+        return {
+            "id": ad["id"],
+            "images_qty": ad["images_qty"],
+            "description": ad["description"],
+            "category": ad["category"],
+            "is_verified": user["is_verified"],
+        }
+
+    def insert_pending(self, item_id: int) -> int:
+        task_id = self.next_id("moderation_results")
+        self.moderation_results[task_id] = {
+            "id": task_id,
+            "item_id": item_id,
+            "status": "pending",
+            "is_violation": None,
+            "probability": None,
+            "error_message": None,
+            "created_at": _now(),
+            "processed_at": None,
+        }
+        self._pending_by_item[item_id].append(task_id)
+        return task_id
+
+    def _insert_pending_many(self, item_ids: list[int]) -> list[dict]:
+        return [{"id": self.insert_pending(item_id)} for item_id in item_ids]
+
+    def _select_existing_ads(self, item_ids: list[int]) -> list[dict]:
+        return [{"id": item_id} for item_id in item_ids if item_id in self.ads]
+
+    def _select_oldest_pending(self, item_id: int) -> int | None:
+        pending = self._pending_by_item.get(item_id)
+        return pending[0] if pending else None
+
+    def _resolve_pending(self, row: dict) -> None:
+        if row["status"] == "pending":
+            self._pending_by_item[row["item_id"]].remove(row["id"])
+
+    def _select_result(self, task_id: int) -> dict | None:
+        return self.moderation_results.get(task_id)
+
+    def _update_completed(self, task_id, is_violation, probability, processed_at) -> str:
+        row = self.moderation_results[task_id]
+        self._resolve_pending(row)
+        row.update(
+            status="completed",
+            is_violation=is_violation,
+            probability=probability,
+            processed_at=processed_at,
+        )
+        return "UPDATE 1"
+
+    def _update_failed(self, task_id, error_message, processed_at) -> str:
+        row = self.moderation_results[task_id]
+        self._resolve_pending(row)
+        row.update(status="failed", error_message=error_message, processed_at=processed_at)
+        return "UPDATE 1"
+
+
+class FakeConnection:
+    def __init__(self, db: FakeDatabase) -> None:
+        self._db = db
+
+    async def fetchval(self, query: str, *args, timeout: float | None = None) -> Any:
+        return await self._db.run(query, args)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None) -> Any:
+        return await self._db.run(query, args)
+
+    async def fetch(self, query: str, *args, timeout: float | None = None) -> Any:
+        return await self._db.run(query, args)
+
+    async def execute(self, query: str, *args, timeout: float | None = None) -> Any:
+        return await self._db.run(query, args)
+
+
+class _Acquire:
+    def __init__(self, pool: "FakePool") -> None:
+        self._pool = pool
+
+    async def __aenter__(self) -> FakeConnection:
+        await self._pool._semaphore.acquire()
+        return FakeConnection(self._pool.db)
+
+    async def __aexit__(self, *exc) -> None:
+        self._pool._semaphore.release()
+
+
+class FakePool:
+    def __init__(self, db: FakeDatabase, min_size: int = 1, max_size: int = 10) -> None:
+        self.db = db
+        self._min_size = min_size
+        self._max_size = max_size
+        self._semaphore = asyncio.Semaphore(max_size)
+
+    def acquire(self, *, timeout: float | None = None) -> _Acquire:
+        return _Acquire(self)
+
+    def get_size(self) -> int:
+        return self._max_size
+
+    def get_min_size(self) -> int:
+        return self._min_size
+
+    async def close(self) -> None:
+        pass
+
+
+@dataclass
+class FakeRecord:
+    topic: str
+    partition: int
+    offset: int
+    value: bytes | None
+    key: bytes | None = None
+    headers: tuple = ()
+    timestamp: int = field(default_factory=lambda: int(time.time() * 1000))
+
+
+class FakeBroker:
+    """Topics are unbounded in-memory logs with one partition each."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.topics: dict[str, list[FakeRecord]] = defaultdict(list)
+        self._new_data = asyncio.Event()
+
+    def append(self, topic: str, value: bytes | None, key=None, headers=None) -> FakeRecord:
+        log = self.topics[topic]
+        record = FakeRecord(topic, 0, len(log), value, key, tuple(headers or ()))
+        log.append(record)
+        self._new_data.set()
+        return record
+
+    async def wait_for_data(self, timeout: float) -> None:
+        self._new_data.clear()
+        try:
+            await asyncio.wait_for(self._new_data.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class FakeProducer:
+    def __init__(self, broker: FakeBroker, **kwargs) -> None:
+        self._broker = broker
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send_and_wait(self, topic, value=None, key=None, partition=None, timestamp_ms=None, headers=None):
+        if self._broker.latency:
+            await asyncio.sleep(self._broker.latency)
+        return self._broker.append(topic, value, key, headers)
+
+    async def partitions_for(self, topic: str) -> set[int]:
+        if self._broker.latency:
+            await asyncio.sleep(self._broker.latency)
+        return {0}
+
+    async def send(self, topic, value=None, key=None, partition=None, timestamp_ms=None, headers=None):
+        future = asyncio.ensure_future(
+            self.send_and_wait(topic, value, key, partition, timestamp_ms, headers)
+        )
+        return future
+
+
+class FakeConsumer:
+    """Reads every subscribed topic from the beginning.
+
+    With ``stop_when_idle`` set, iteration ends (and a blocking ``getmany``
+    raises ``ConsumerStoppedError``) once no new records arrive for
+    ``idle_timeout`` seconds, which lets ``run_worker`` return after draining
+    a benchmark backlog.
+    """
+
+    def __init__(
+        self,
+        *topics: str,
+        broker: FakeBroker,
+        stop_when_idle: bool = True,
+        idle_timeout: float = 0.2,
+        **kwargs,
+    ) -> None:
+        self._broker = broker
+        self._topics = topics
+        self._positions = {topic: 0 for topic in topics}
+        self._paused: set[str] = set()
+        self.committed: dict[TopicPartition, int] = {}
+        self._stop_when_idle = stop_when_idle
+        self._idle_timeout = idle_timeout
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def subscribe(self, topics, listener=None) -> None:
+        self._topics = tuple(topics)
+        self._positions = {topic: 0 for topic in self._topics}
+
+    async def commit(self, offsets: dict[TopicPartition, int]) -> None:
+        self.committed.update(offsets)
+
+    def assignment(self) -> set[TopicPartition]:
+        return {TopicPartition(topic, 0) for topic in self._topics}
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self._paused.update(partition.topic for partition in partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self._paused.difference_update(partition.topic for partition in partitions)
+
+    def paused(self) -> set[TopicPartition]:
+        return {TopicPartition(topic, 0) for topic in self._paused}
+
+    def _take(self, max_records: int | None) -> dict[TopicPartition, list[FakeRecord]]:
+        fetched = {}
+        for topic in self._topics:
+            if topic in self._paused:
+                continue
+            log = self._broker.topics[topic]
+            position = self._positions[topic]
+            end = len(log) if max_records is None else min(len(log), position + max_records)
+            if position < end:
+                fetched[TopicPartition(topic, 0)] = log[position:end]
+                self._positions[topic] = end
+                if max_records is not None:
+                    max_records -= end - position
+                    if max_records == 0:
+                        break
+        return fetched
+
+    async def getmany(
+        self, *partitions: TopicPartition, timeout_ms: int = 0, max_records: int | None = None
+    ) -> dict[TopicPartition, list[FakeRecord]]:
+        fetched = self._take(max_records)
+        if fetched or not timeout_ms:
+            return fetched
+        await self._broker.wait_for_data(min(timeout_ms / 1000, self._idle_timeout))
+        fetched = self._take(max_records)
+        if not fetched and self._stop_when_idle and not self._paused:
+            raise ConsumerStoppedError()
+        return fetched
+
+    def _next_record(self) -> FakeRecord | None:
+        for topic in self._topics:
+            log = self._broker.topics[topic]
+            position = self._positions[topic]
+            if position < len(log):
+                self._positions[topic] = position + 1
+                return log[position]
+        return None
+
+    def __aiter__(self) -> "FakeConsumer":
+        return self
+
+    async def __anext__(self) -> FakeRecord:
+        while True:
+            record = self._next_record()
+            if record is not None:
+                return record
+            await self._broker.wait_for_data(self._idle_timeout)
+            if self._next_record_available():
+                continue
+            if self._stop_when_idle:
+                raise StopAsyncIteration
+
+    def _next_record_available(self) -> bool:
+        return any(
+            self._positions[topic] < len(self._broker.topics[topic])
+            for topic in self._topics
+        )
@@ -0,0 +1,121 @@
+"""Minimal HDR-style histogram.
+
+Values are integers (microseconds in this suite) stored in log-linear buckets
+with a fixed number of significant decimal digits, like HdrHistogram. The
+percentile report uses the HdrHistogram ``.hgrm`` text layout so existing
+plotting tools can read it.
+"""
+
+import math
+from typing import Iterator, TextIO
+
+
+class Histogram:
+    def __init__(self, highest_trackable_value: int = 3_600_000_000, significant_digits: int = 3) -> None:
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        self.highest_trackable_value = highest_trackable_value
+        self.significant_digits = significant_digits
+        largest_single_unit = 2 * 10**significant_digits
+        self._sub_bucket_bits = math.ceil(math.log2(largest_single_unit))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+        self._counts: dict[int, int] = {}
+        self.total_count = 0
+        self.min_value = 0
+        self.max_value = 0
+
+    def _bucket_index(self, value: int) -> int:
+        pow2_ceiling = max(value | self._sub_bucket_mask, 1).bit_length()
+        return pow2_ceiling - self._sub_bucket_bits
+
+    def _counts_index(self, value: int) -> int:
+        bucket = self._bucket_index(value)
+        sub_bucket = value >> bucket
+        return (bucket + 1) * self._sub_bucket_half_count + (sub_bucket - self._sub_bucket_half_count)
+
+    def _value_from_index(self, index: int) -> int:
+        bucket = index // self._sub_bucket_half_count - 1
+        sub_bucket = index % self._sub_bucket_half_count + self._sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        return sub_bucket << bucket
+
+    def _highest_equivalent(self, value: int) -> int:
+        bucket = self._bucket_index(value)
+        lowest = (value >> bucket) << bucket
+        return lowest + (1 << bucket) - 1
+
+    def record(self, value: int, count: int = 1) -> None:
+        value = min(max(int(value), 0), self.highest_trackable_value)
+        index = self._counts_index(value)
+        self._counts[index] = self._counts.get(index, 0) + count
+        if self.total_count == 0 or value < self.min_value:
+            self.min_value = value
+        self.max_value = max(self.max_value, value)
+        self.total_count += count
+
+    def merge(self, other: "Histogram") -> None:
+        for index, count in other._counts.items():
+            self._counts[index] = self._counts.get(index, 0) + count
+        if other.total_count:
+            if self.total_count == 0 or other.min_value < self.min_value:
+                self.min_value = other.min_value
+            self.max_value = max(self.max_value, other.max_value)
+        self.total_count += other.total_count
+
+    def _iter_values(self) -> Iterator[tuple[int, int]]:
+        for index in sorted(self._counts):
+            yield self._highest_equivalent(self._value_from_index(index)), self._counts[index]
+
+    def value_at_percentile(self, percentile: float) -> int:
+        if self.total_count == 0:
+            return 0
+        target = max(1, math.ceil(percentile / 100 * self.total_count))
+        seen = 0
+        for value, count in self._iter_values():
+            seen += count
+            if seen >= target:
+                return min(value, self.max_value)
+        return self.max_value
+
+    def mean(self) -> float:
+        if self.total_count == 0:
+            return 0.0
+        return sum(value * count for value, count in self._iter_values()) / self.total_count
+
+    def summary(self, scale: float = 1000.0) -> dict[str, float]:
+        """Percentiles divided by ``scale`` (microseconds to milliseconds by default)."""
+        return {
+            "count": self.total_count,
+            "mean_ms": self.mean() / scale,
+            "p50_ms": self.value_at_percentile(50) / scale,
+            "p90_ms": self.value_at_percentile(90) / scale,
+            "p99_ms": self.value_at_percentile(99) / scale,
+            "p999_ms": self.value_at_percentile(99.9) / scale,
+            "max_ms": self.max_value / scale,
+        }
+
+    def write_percentile_distribution(
+        self, out: TextIO, ticks_per_half_distance: int = 5, scale: float = 1000.0
+    ) -> None:
+        out.write(f"{'Value':>12} {'Percentile':>14} {'TotalCount':>10} {'1/(1-Percentile)':>14}\n\n")
+        if self.total_count == 0:
+            return
+        percentile = 0.0
+        while True:
+            value = self.value_at_percentile(percentile)
+            count = math.ceil(percentile / 100 * self.total_count)
+            fraction = percentile / 100
+            inverted = f"{1 / (1 - fraction):14.2f}" if fraction < 1 else ""
+            out.write(f"{value / scale:12.3f} {fraction:14.12f} {count:10d} {inverted}\n")
+            if fraction >= 1 or count >= self.total_count:
+                break
+            remaining = 100 - percentile
+            half_distance = 2 ** math.floor(math.log2(100 / remaining))
+            percentile += 100 / (half_distance * ticks_per_half_distance * 2)
+        mean = self.mean() / scale
+        out.write(f"#[Mean    = {mean:12.3f}, Max     = {self.max_value / scale:12.3f}]\n")
+        out.write(f"#[Total count    = {self.total_count:12d}]\n")
@@ -0,0 +1,275 @@
+"""Open-loop load generator replaying recorded request bodies.
+
+Each line of the recording is ``{"endpoint": "/predict", "body": {...}}``;
+lines without both keys are skipped. Requests are fired on a fixed schedule
+regardless of how fast the service answers, and latency is measured from the
+*intended* send time, so queueing delay is not hidden (coordinated omission).
+A request that finds ``--max-inflight`` requests outstanding is dropped and
+counted at ``--timeout``. Async results are polled over a separate pool of
+``--poll-connections``, so polling never holds up the schedule.
+
+    python -m benchmarks.loadgen recorded.jsonl --url http://localhost:8000 \\
+        --rate 200 --ramp-to 800 --duration 60 \\
+        --mix /predict=5,/simple_predict=3,/async_predict=2 --report-dir benchmarks/results/loadgen
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+from benchmarks.hdr import Histogram
+from benchmarks.stats import environment_info, save_results
+
+logger = logging.getLogger(__name__)
+
+ASYNC_ENDPOINT = "/async_predict"
+RESULT_ENDPOINT = "/moderation_result/{task_id}"
+
+
+def load_recording(path: Path) -> dict[str, list[dict]]:
+    bodies: dict[str, list[dict]] = defaultdict(list)
+    skipped = 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if not isinstance(record, dict) or "endpoint" not in record or "body" not in record:
+                skipped += 1
+                continue
+            bodies[record["endpoint"]].append(record["body"])
+    if skipped:
+        logger.warning("Skipped %s lines without endpoint/body in %s", skipped, path)
+    return dict(bodies)
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        endpoint, _, weight = part.partition("=")
+        mix[endpoint.strip()] = float(weight or 1)
+    return mix
+
+
+def arrival_times(rate: float, ramp_to: float | None, duration: float) -> Iterator[float]:
+    """Offsets in seconds of each request from the start of the run.
+
+    The rate grows linearly from ``rate`` to ``ramp_to`` over ``duration``.
+    """
+    end_rate = ramp_to if ramp_to is not None else rate
+    t = 0.0
+    while t < duration:
+        yield t
+        current = rate + (end_rate - rate) * t / duration
+        t += 1.0 / max(current, 1e-9)
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.response_time: dict[str, Histogram] = defaultdict(Histogram)
+        self.service_time: dict[str, Histogram] = defaultdict(Histogram)
+        self.end_to_end: Histogram = Histogram()
+        self.statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.dropped = 0
+        self.poll_timeouts = 0
+
+    def record(self, endpoint: str, intended: float, started: float, finished: float, status: str) -> None:
+        self.response_time[endpoint].record(int((finished - intended) * 1_000_000))
+        self.service_time[endpoint].record(int((finished - started) * 1_000_000))
+        self.statuses[endpoint][status] += 1
+
+    def record_drop(self, endpoint: str, timeout: float) -> None:
+        """A request that was never sent counts as waiting from its intended start until it would time out."""
+        self.dropped += 1
+        self.response_time[endpoint].record(int(timeout * 1_000_000))
+        self.statuses[endpoint]["dropped"] += 1
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        bodies: dict[str, list[dict]],
+        mix: dict[str, float],
+        poll_interval: float,
+        poll_timeout: float,
+        max_inflight: int,
+        request_timeout: float = 30.0,
+        seed: int = 0,
+        poll_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        missing = [endpoint for endpoint in mix if not bodies.get(endpoint)]
+        if missing:
+            raise ValueError(f"No recorded bodies for endpoints: {', '.join(missing)}")
+        self._client = client
+        # Polls on the schedule's connections would delay sends, so they get their own pool.
+        self._poll_client = poll_client or client
+        self._cycles = {endpoint: itertools.cycle(bodies[endpoint]) for endpoint in mix}
+        self._endpoints = list(mix)
+        self._weights = list(mix.values())
+        self._random = random.Random(seed)
+        self._poll_interval = poll_interval
+        self._poll_timeout = poll_timeout
+        self._request_timeout = request_timeout
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self.recorder = Recorder()
+
+    async def _send(self, endpoint: str, body: dict, intended: float) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self._client.post(endpoint, json=body)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            response = None
+            status = type(e).__name__
+        finished = time.perf_counter()
+        self.recorder.record(endpoint, intended, started, finished, status)
+        return response
+
+    async def _poll_result(self, task_id: int, intended: float) -> None:
+        url = RESULT_ENDPOINT.format(task_id=task_id)
+        deadline = time.perf_counter() + self._poll_timeout
+        while time.perf_counter() < deadline:
+            try:
+                response = await self._poll_client.get(url)
+            except httpx.HTTPError:
+                response = None
+            if response is not None and response.status_code == 200 and response.json()["status"] != "pending":
+                self.recorder.end_to_end.record(int((time.perf_counter() - intended) * 1_000_000))
+                return
+            await asyncio.sleep(self._poll_interval)
+        self.recorder.poll_timeouts += 1
+
+    async def _fire(self, endpoint: str, body: dict, intended: float) -> None:
+        try:
+            response = await self._send(endpoint, body, intended)
+        finally:
+            # Polling is not a request in flight; holding the slot would throttle the schedule.
+            self._inflight.release()
+        if endpoint == ASYNC_ENDPOINT and response is not None and response.status_code == 200:
+            await self._poll_result(response.json()["task_id"], intended)
+
+    async def run(self, schedule: Iterator[float]) -> None:
+        tasks = set()
+        start = time.perf_counter()
+        for offset in schedule:
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            endpoint = self._random.choices(self._endpoints, self._weights)[0]
+            body = next(self._cycles[endpoint])
+            if self._inflight.locked():
+                # Open loop: never wait for the service, count the request as lost instead.
+                self.recorder.record_drop(endpoint, self._request_timeout)
+                continue
+            await self._inflight.acquire()
+            task = asyncio.create_task(self._fire(endpoint, body, intended))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+
+def write_reports(recorder: Recorder, report_dir: Path, parameters: dict[str, Any]) -> dict:
+    report_dir.mkdir(parents=True, exist_ok=True)
+    summary: dict[str, Any] = {
+        "environment": environment_info(),
+        "parameters": parameters,
+        "dropped": recorder.dropped,
+        "poll_timeouts": recorder.poll_timeouts,
+        "endpoints": {},
+    }
+    for endpoint, histogram in recorder.response_time.items():
+        name = endpoint.strip("/").replace("/", "_")
+        with open(report_dir / f"{name}.hgrm", "w") as f:
+            histogram.write_percentile_distribution(f)
+        summary["endpoints"][endpoint] = {
+            "response_time": histogram.summary(),
+            "service_time": recorder.service_time[endpoint].summary(),
+            "statuses": dict(recorder.statuses[endpoint]),
+        }
+    if recorder.end_to_end.total_count:
+        with open(report_dir / "async_end_to_end.hgrm", "w") as f:
+            recorder.end_to_end.write_percentile_distribution(f)
+        summary["async_end_to_end"] = recorder.end_to_end.summary()
+    save_results(report_dir / "summary.json", summary)
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict:
+    bodies = load_recording(args.recording)
+    mix = parse_mix(args.mix) if args.mix else {endpoint: 1.0 for endpoint in bodies}
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    poll_limits = httpx.Limits(max_connections=args.poll_connections, max_keepalive_connections=args.poll_connections)
+    async with (
+        httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client,
+        httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=poll_limits) as poll_client,
+    ):
+        generator = LoadGenerator(
+            client,
+            bodies,
+            mix,
+            poll_interval=args.poll_interval,
+            poll_timeout=args.poll_timeout,
+            max_inflight=args.max_inflight,
+            request_timeout=args.timeout,
+            seed=args.seed,
+            poll_client=poll_client,
+        )
+        await generator.run(arrival_times(args.rate, args.ramp_to, args.duration))
+    parameters = {
+        "url": args.url,
+        "rate": args.rate,
+        "ramp_to": args.ramp_to,
+        "duration": args.duration,
+        "mix": mix,
+    }
+    return write_reports(generator.recorder, args.report_dir, parameters)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=Path, help="JSONL file with endpoint/body records")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=50.0, help="requests per second at start")
+    parser.add_argument("--ramp-to", type=float, default=None, help="requests per second at the end")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--mix", default=None, help="endpoint=weight pairs, e.g. /predict=3,/async_predict=1")
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--poll-timeout", type=float, default=60.0)
+    parser.add_argument("--poll-connections", type=int, default=100, help="connections for result polling")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-dir", type=Path, default=Path("benchmarks/results/loadgen"))
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    args = parse_args(argv)
+    summary = asyncio.run(run(args))
+    for endpoint, stats in summary["endpoints"].items():
+        print(endpoint, json.dumps(stats["response_time"]))
+    if "async_end_to_end" in summary:
+        print("async end-to-end", json.dumps(summary["async_end_to_end"]))
+    print(f"Reports written to {args.report_dir}")
+
+
+if __name__ == "__main__":
+    main()
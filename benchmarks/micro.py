@@ -0,0 +1,308 @@
+"""Microbenchmarks of inference and validation hot paths with regression gating.
+
+    python -m benchmarks.micro                      # print timings
+    python -m benchmarks.micro --save-baseline      # store timings as the new baseline
+    python -m benchmarks.micro --compare --threshold 0.25
+
+In compare mode the process exits with status 1 when any case is more than
+``threshold`` slower than its stored baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from benchmarks.stats import ROOT, environment_info, save_results
+
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "micro.json"
+
+Benchmark = Callable[[], object] | Callable[[], Awaitable[object]]
+CASES: dict[str, Callable[[argparse.Namespace], Benchmark]] = {}
+
+
+def case(name: str):
+    def register(factory: Callable[[argparse.Namespace], Benchmark]):
+        CASES[name] = factory
+        return factory
+
+    return register
+
+
+def _load_model_manager(args: argparse.Namespace):
+    from app.model import ModelManager
+
+    manager = ModelManager(model_path=args.model_path)
+    manager.load()
+    return manager
+
+
+AD_PAYLOAD = {
+    "seller_id": 1,
+    "is_verified_seller": True,
+    "item_id": 1,
+    "name": "Item",
+    "description": "Description text",
+    "category": 1,
+    "images_qty": 2,
+}
+
+
+@case("prepare_features")
+def _prepare_features(args: argparse.Namespace) -> Benchmark:
+    from app.model import ModelManager
+
+    return lambda: ModelManager.prepare_features(True, 3, 250, 12)
+
+
+FEATURE_BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000)
+
+
+def _synthetic_feature_columns(size: int):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    return (
+        rng.random(size) < 0.5,
+        rng.integers(0, 20, size),
+        rng.integers(0, 2000, size),
+        rng.integers(1, 200, size),
+    )
+
+
+def _register_feature_batch_cases(size: int) -> None:
+    @case(f"prepare_features_scalar_loop_{size}")
+    def _scalar_loop(args: argparse.Namespace) -> Benchmark:
+        from app.model import ModelManager
+
+        rows = list(zip(*(column.tolist() for column in _synthetic_feature_columns(size))))
+        return lambda: [ModelManager.prepare_features(*row) for row in rows]
+
+    @case(f"prepare_features_batch_{size}")
+    def _batch(args: argparse.Namespace) -> Benchmark:
+        from app.model import prepare_features_batch
+
+        columns = _synthetic_feature_columns(size)
+        return lambda: prepare_features_batch(*columns)
+
+    @case(f"features_from_records_{size}")
+    def _records(args: argparse.Namespace) -> Benchmark:
+        from app.model import FEATURE_RECORD_COLUMNS, features_from_records
+
+        rows = zip(*(column.tolist() for column in _synthetic_feature_columns(size)))
+        records = [dict(zip(FEATURE_RECORD_COLUMNS, row)) for row in rows]
+        return lambda: features_from_records(records)
+
+    @case(f"features_from_copy_binary_{size}")
+    def _copy_binary(args: argparse.Namespace) -> Benchmark:
+        import struct
+
+        from app.model import features_from_copy_binary
+
+        rows = zip(*(column.tolist() for column in _synthetic_feature_columns(size)))
+        data = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+        data += b"".join(struct.pack(">hi?iiiiii", 4, 1, v, 4, i, 4, d, 4, c) for v, i, d, c in rows)
+        data += struct.pack(">h", -1)
+        return lambda: features_from_copy_binary(data)
+
+
+for _size in FEATURE_BATCH_SIZES:
+    _register_feature_batch_cases(_size)
+
+
+@case("model_predict_proba")
+def _model_predict_proba(args: argparse.Namespace) -> Benchmark:
+    manager = _load_model_manager(args)
+    features = manager.prepare_features(True, 3, 250, 12)
+    return lambda: manager.model.predict_proba(features)
+
+
+@case("model_manager_predict")
+def _model_manager_predict(args: argparse.Namespace) -> Benchmark:
+    manager = _load_model_manager(args)
+    return lambda: manager.predict(True, 3, 250, 12)
+
+
+@case("request_schema_validate")
+def _request_schema_validate(args: argparse.Namespace) -> Benchmark:
+    from app.schemas import AdModerationRequestSchema
+
+    return lambda: AdModerationRequestSchema.model_validate(AD_PAYLOAD)
+
+
+PREDICTION_RESULT = {"is_violation": True, "probability": 0.75}
+
+
+@case("response_render_default")
+def _response_render_default(args: argparse.Namespace) -> Benchmark:
+    """What FastAPI does for a plain return value: validate, encode, stdlib dumps."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.schemas import AdModerationResponseSchema
+
+    def render():
+        validated = AdModerationResponseSchema.model_validate(PREDICTION_RESULT)
+        return JSONResponse(jsonable_encoder(validated))
+
+    return render
+
+
+@case("response_render_fast")
+def _response_render_fast(args: argparse.Namespace) -> Benchmark:
+    from app.serialization import FastJSONResponse
+
+    return lambda: FastJSONResponse(PREDICTION_RESULT)
+
+
+@case("moderation_message_encode_stdlib")
+def _moderation_message_encode_stdlib(args: argparse.Namespace) -> Benchmark:
+    return lambda: json.dumps({"item_id": 123456, "timestamp": "2024-01-01T00:00:00Z"}).encode()
+
+
+@case("moderation_message_encode")
+def _moderation_message_encode(args: argparse.Namespace) -> Benchmark:
+    from app.clients.codec import ModerationMessage
+
+    message = ModerationMessage(item_id=123456, timestamp="2024-01-01T00:00:00Z")
+    return message.encode
+
+
+@case("moderation_message_decode_stdlib")
+def _moderation_message_decode_stdlib(args: argparse.Namespace) -> Benchmark:
+    data = b'{"item_id":123456,"timestamp":"2024-01-01T00:00:00Z"}'
+    return lambda: json.loads(data.decode())
+
+
+@case("moderation_message_decode")
+def _moderation_message_decode(args: argparse.Namespace) -> Benchmark:
+    from app.clients.codec import decode_moderation_message
+
+    data = b'{"item_id":123456,"timestamp":"2024-01-01T00:00:00Z"}'
+    return lambda: decode_moderation_message(data)
+
+
+@case("moderation_batch_decode_binary_100")
+def _moderation_batch_decode_binary(args: argparse.Namespace) -> Benchmark:
+    from app.clients.codec import binary_headers, decode_record, encode_moderation_batch
+
+    data = encode_moderation_batch(list(range(100_000, 100_100)))
+    headers = binary_headers()
+    return lambda: decode_record(data, headers)
+
+
+def _time_sync(func: Callable[[], object], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+async def _time_async(func: Callable[[], Awaitable[object]], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await func()
+    return time.perf_counter() - start
+
+
+def measure(func: Benchmark, repeat: int, min_time: float) -> dict[str, float]:
+    """Best-of-``repeat`` time per call in microseconds, auto-ranging the loop count."""
+    loop = asyncio.new_event_loop()
+    try:
+        is_async = asyncio.iscoroutine(probe := func())
+        if is_async:
+            loop.run_until_complete(probe)
+
+        def timer(number: int) -> float:
+            if is_async:
+                return loop.run_until_complete(_time_async(func, number))
+            return _time_sync(func, number)
+
+        number = 1
+        while (elapsed := timer(number)) < min_time:
+            number *= 10 if elapsed < min_time / 10 else 2
+        timings = [elapsed] + [timer(number) for _ in range(repeat - 1)]
+    finally:
+        loop.close()
+    per_call = sorted(t / number * 1_000_000 for t in timings)
+    return {"best_us": per_call[0], "median_us": per_call[len(per_call) // 2], "loops": number}
+
+
+def regressions(
+    baseline: dict[str, dict], current: dict[str, dict], threshold: float
+) -> list[tuple[str, float, float, float]]:
+    found = []
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["best_us"], stats["best_us"]
+        slowdown = after / before - 1 if before else 0.0
+        if slowdown > threshold:
+            found.append((name, before, after, slowdown))
+    return found
+
+
+def missing_baselines(baseline: dict[str, dict], current: dict[str, dict]) -> list[str]:
+    return [name for name in current if name not in baseline]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="*", help=f"subset of: {', '.join(CASES)}")
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--output", type=Path, default=None, help="also write results JSON here")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.model_path is None:
+        from app.model import DEFAULT_MODEL_PATH
+
+        args.model_path = str(ROOT / DEFAULT_MODEL_PATH)
+    unknown = set(args.cases) - CASES.keys()
+    if unknown:
+        print(f"Unknown cases: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    results = {}
+    for name in args.cases or CASES:
+        results[name] = measure(CASES[name](args), args.repeat, args.min_time)
+        print(f"{name:<40} {results[name]['best_us']:>12.3f} us  (median {results[name]['median_us']:.3f})")
+
+    document = {"environment": environment_info(), "cases": results}
+    if args.output:
+        save_results(args.output, document)
+    if args.save_baseline:
+        if args.baseline.exists():
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            document["cases"] = {**stored["cases"], **results}
+        save_results(args.baseline, document)
+        print(f"Baseline saved to {args.baseline}")
+    if args.compare:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+        found = regressions(baseline, results, args.threshold)
+        missing = missing_baselines(baseline, results)
+        for name, before, after, slowdown in found:
+            print(f"REGRESSION {name}: {before:.3f} us -> {after:.3f} us ({slowdown:+.0%})", file=sys.stderr)
+        for name in missing:
+            print(f"NO BASELINE {name}: run with --save-baseline", file=sys.stderr)
+        if found or missing:
+            return 1
+        print(f"No regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
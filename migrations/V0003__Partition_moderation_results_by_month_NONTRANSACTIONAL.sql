@@ -0,0 +1,114 @@
+-- Range-partition moderation_results by created_at month.
+--
+-- The existing table is attached as a single partition holding all history
+-- up to the end of the month of its newest row (at least the current month),
+-- so no rows are copied. Later rows land in monthly partitions created here
+-- and kept ahead of time by `python -m app.workers.partition_maintenance`.
+--
+-- Nontransactional, so the scans over the existing table run without
+-- blocking writes: its range CHECK is validated and the indexes ATTACH needs
+-- are built concurrently first. The swap itself is one short transaction of
+-- catalog changes. On a database already past V0001 run pgmigrate with
+-- --force_mixed.
+--
+-- The primary key becomes (id, created_at). Lookups by id alone would probe
+-- every partition, so moderation_results_id_marks maps id ranges to the time
+-- their ids were handed out; repositories turn that into a created_at range
+-- that prunes the other partitions.
+
+-- Rows of the current month, and any dated later, stay in the legacy partition.
+DO $$
+DECLARE
+    legacy_end TIMESTAMP;
+BEGIN
+    SELECT date_trunc('month', GREATEST(max(created_at), now()::timestamp)) + INTERVAL '1 month'
+    INTO legacy_end
+    FROM moderation_results;
+
+    PERFORM set_config('moderation.legacy_end', legacy_end::text, false);
+    -- NOT VALID only checks new rows; existing ones are checked by VALIDATE without blocking writes.
+    EXECUTE format(
+        'ALTER TABLE moderation_results ADD CONSTRAINT moderation_results_legacy_range '
+        'CHECK (created_at < %L) NOT VALID',
+        legacy_end
+    );
+END $$;
+
+ALTER TABLE moderation_results VALIDATE CONSTRAINT moderation_results_legacy_range;
+
+-- The indexes of the partitioned table, built ahead so ATTACH adopts them instead of building them.
+CREATE UNIQUE INDEX CONCURRENTLY moderation_results_legacy_pkey_idx
+    ON moderation_results (id, created_at);
+
+CREATE INDEX CONCURRENTLY moderation_results_legacy_pending_item_idx
+    ON moderation_results (item_id, created_at)
+    WHERE status = 'pending';
+
+BEGIN;
+
+-- Both columns are NOT NULL, so swapping the primary key does not scan the table.
+ALTER TABLE moderation_results
+    DROP CONSTRAINT moderation_results_pkey,
+    ADD CONSTRAINT moderation_results_legacy_pkey PRIMARY KEY USING INDEX moderation_results_legacy_pkey_idx;
+
+ALTER TABLE moderation_results RENAME TO moderation_results_legacy;
+
+CREATE TABLE moderation_results (
+    id            INTEGER NOT NULL DEFAULT nextval('moderation_results_id_seq'),
+    item_id       BIGINT NOT NULL REFERENCES ads(id),
+    status        VARCHAR(20) NOT NULL DEFAULT 'pending',
+    is_violation  BOOLEAN,
+    probability   FLOAT,
+    error_message TEXT,
+    created_at    TIMESTAMP NOT NULL DEFAULT NOW(),
+    processed_at  TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- The sequence must outlive the legacy partition once it is archived.
+ALTER SEQUENCE moderation_results_id_seq OWNED BY moderation_results.id;
+
+-- Oldest pending task per item, used by the worker for every message.
+CREATE INDEX moderation_results_pending_item_idx
+    ON moderation_results (item_id, created_at)
+    WHERE status = 'pending';
+
+-- Rows outside every range would otherwise fail to insert; this should stay empty.
+CREATE TABLE moderation_results_default PARTITION OF moderation_results DEFAULT;
+
+-- Ids up to last_id had been handed out by marked_at; later ones only after it.
+-- A row is a mark written by each partition maintenance run.
+CREATE TABLE moderation_results_id_marks (
+    last_id   BIGINT PRIMARY KEY,
+    marked_at TIMESTAMP NOT NULL
+);
+
+INSERT INTO moderation_results_id_marks (last_id, marked_at)
+SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END, clock_timestamp()
+FROM moderation_results_id_seq;
+
+DO $$
+DECLARE
+    legacy_end TIMESTAMP := current_setting('moderation.legacy_end')::timestamp;
+    month_start TIMESTAMP;
+BEGIN
+    -- The validated CHECK proves the range, so ATTACH does not scan the table.
+    EXECUTE format(
+        'ALTER TABLE moderation_results ATTACH PARTITION moderation_results_legacy '
+        'FOR VALUES FROM (MINVALUE) TO (%L)',
+        legacy_end
+    );
+    ALTER TABLE moderation_results_legacy DROP CONSTRAINT moderation_results_legacy_range;
+
+    FOR i IN 0..2 LOOP
+        month_start := legacy_end + make_interval(months => i);
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF moderation_results FOR VALUES FROM (%L) TO (%L)',
+            'moderation_results_p' || to_char(month_start, 'YYYYMM'),
+            month_start,
+            month_start + INTERVAL '1 month'
+        );
+    END LOOP;
+END $$;
+
+COMMIT;
@@ -0,0 +1,17 @@
+-- Bulk re-scoring output: one row per ad and model version, written by scripts/rescore_ads.py.
+CREATE TABLE ad_scores (
+    model_version VARCHAR(64) NOT NULL,
+    ad_id         BIGINT NOT NULL REFERENCES ads(id) ON DELETE CASCADE,
+    is_violation  BOOLEAN NOT NULL,
+    probability   FLOAT NOT NULL,
+    scored_at     TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (model_version, ad_id)
+);
+
+-- Last ad committed by a re-scoring run, so an interrupted run resumes after it.
+CREATE TABLE rescore_checkpoints (
+    model_version VARCHAR(64) PRIMARY KEY,
+    last_ad_id    BIGINT NOT NULL,
+    rows_scored   BIGINT NOT NULL,
+    updated_at    TIMESTAMP NOT NULL DEFAULT NOW()
+);
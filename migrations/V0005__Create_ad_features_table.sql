@@ -0,0 +1,88 @@
+-- Normalized model features per ad, plus the latest score and the version of
+-- the model that produced it. The normalization must match ModelManager.prepare_features.
+--
+-- The table is kept in sync with ads and users by row triggers that are created
+-- disabled: they cost a join and an upsert per written row, COPY included, and
+-- are only needed with PRECOMPUTED_FEATURES_ENABLED. `python scripts/ad_features.py
+-- enable` turns them on and backfills the table.
+CREATE TABLE ad_features (
+    ad_id              BIGINT PRIMARY KEY REFERENCES ads(id) ON DELETE CASCADE,
+    user_id            BIGINT NOT NULL,
+    is_verified        DOUBLE PRECISION NOT NULL,
+    images             DOUBLE PRECISION NOT NULL,
+    description_length DOUBLE PRECISION NOT NULL,
+    category           DOUBLE PRECISION NOT NULL,
+    model_version      VARCHAR(64),
+    is_violation       BOOLEAN,
+    probability        FLOAT,
+    scored_at          TIMESTAMP
+);
+
+CREATE INDEX ad_features_user_id_idx ON ad_features (user_id);
+
+-- The current features of every ad, whether or not ad_features is maintained.
+CREATE VIEW ad_feature_values AS
+SELECT a.id AS ad_id,
+       a.user_id,
+       u.is_verified::int::float8 AS is_verified,
+       LEAST(a.images_qty, 10)::float8 / 10 AS images,
+       LEAST(length(a.description), 1000)::float8 / 1000 AS description_length,
+       LEAST(a.category, 100)::float8 / 100 AS category
+FROM ads a
+JOIN users u ON a.user_id = u.id;
+
+-- A change to any feature invalidates the stored score; rewriting the same values keeps it.
+CREATE FUNCTION ad_features_refresh_ad() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO ad_features (ad_id, user_id, is_verified, images, description_length, category)
+    SELECT NEW.id,
+           NEW.user_id,
+           u.is_verified::int,
+           LEAST(NEW.images_qty, 10)::float8 / 10,
+           LEAST(length(NEW.description), 1000)::float8 / 1000,
+           LEAST(NEW.category, 100)::float8 / 100
+    FROM users u
+    WHERE u.id = NEW.user_id
+    ON CONFLICT (ad_id) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        is_verified = EXCLUDED.is_verified,
+        images = EXCLUDED.images,
+        description_length = EXCLUDED.description_length,
+        category = EXCLUDED.category,
+        model_version = NULL,
+        is_violation = NULL,
+        probability = NULL,
+        scored_at = NULL
+    WHERE (ad_features.user_id, ad_features.is_verified, ad_features.images,
+           ad_features.description_length, ad_features.category)
+        IS DISTINCT FROM (EXCLUDED.user_id, EXCLUDED.is_verified, EXCLUDED.images,
+                          EXCLUDED.description_length, EXCLUDED.category);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER ads_refresh_features
+    AFTER INSERT OR UPDATE OF user_id, description, category, images_qty ON ads
+    FOR EACH ROW EXECUTE FUNCTION ad_features_refresh_ad();
+
+CREATE FUNCTION ad_features_refresh_user() RETURNS trigger AS $$
+BEGIN
+    UPDATE ad_features
+    SET is_verified = NEW.is_verified::int,
+        model_version = NULL,
+        is_violation = NULL,
+        probability = NULL,
+        scored_at = NULL
+    WHERE user_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_refresh_features
+    AFTER UPDATE OF is_verified ON users
+    FOR EACH ROW
+    WHEN (OLD.is_verified IS DISTINCT FROM NEW.is_verified)
+    EXECUTE FUNCTION ad_features_refresh_user();
+
+ALTER TABLE ads DISABLE TRIGGER ads_refresh_features;
+ALTER TABLE users DISABLE TRIGGER users_refresh_features;
@@ -0,0 +1,56 @@
+"""Turn the maintenance of ``ad_features`` on or off.
+
+    python scripts/ad_features.py enable
+    python scripts/ad_features.py disable
+    python scripts/ad_features.py status
+
+The table is kept in sync by triggers on ``ads`` and ``users`` that cost a
+join and an upsert per written row, so they are off by default. ``enable``
+turns them on and backfills every ad; run it before setting
+``PRECOMPUTED_FEATURES_ENABLED=true``.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import asyncpg
+
+from app.config import Settings
+from app.repositories import AdFeatureRepository
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = Settings()
+    pool = await asyncpg.create_pool(settings.database_dsn, min_size=1, max_size=1)
+    try:
+        repository = AdFeatureRepository(pool)
+        if args.action == "enable":
+            rows = await repository.enable_sync()
+            print(f"ad_features sync enabled, {rows} rows written", file=sys.stderr)
+        elif args.action == "disable":
+            await repository.disable_sync()
+            print("ad_features sync disabled", file=sys.stderr)
+        else:
+            enabled = await repository.sync_enabled()
+            print(f"ad_features sync {'enabled' if enabled else 'disabled'}", file=sys.stderr)
+    finally:
+        await pool.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=("enable", "disable", "status"))
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Bulk load users or ads from JSONL or CSV files with COPY.
+
+    python scripts/ingest.py users users.jsonl
+    python scripts/ingest.py ads ads-*.csv.gz --chunk-size 50000
+    python scripts/ingest.py ads ads.jsonl --ids-output ad_ids.txt
+
+Files are streamed, so memory stays bounded by the chunk size. Missing
+optional fields (``description``, ``images_qty``) take the column defaults.
+With ``--ids-output`` rows go through ``INSERT ... unnest`` instead of COPY
+and the new ids are written one per line in input order.
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import asyncpg
+
+from app.config import Settings
+from app.repositories import AdRepository, UserRepository
+from app.repositories.ad_repository import AD_COLUMNS
+from app.repositories.base import BULK_CHUNK_SIZE
+from app.repositories.user_repository import USER_COLUMNS
+
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "t", "true", "yes")
+    return bool(value)
+
+
+def parse_str(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+# column -> (parser, default); a default of None marks a required field
+CONVERTERS: dict[str, dict[str, tuple[Callable[[Any], Any], Any]]] = {
+    "users": {"is_verified": (parse_bool, False)},
+    "ads": {
+        "user_id": (int, None),
+        "name": (parse_str, None),
+        "description": (parse_str, ""),
+        "category": (int, None),
+        "images_qty": (int, 0),
+    },
+}
+
+TABLES = {"users": (UserRepository, USER_COLUMNS), "ads": (AdRepository, AD_COLUMNS)}
+
+
+def open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    formats = path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]
+    with open_text(path) as f:
+        if ".csv" in formats:
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def to_rows(table: str, paths: list[Path]) -> Iterator[tuple]:
+    converters = CONVERTERS[table]
+    columns = TABLES[table][1]
+    for path in paths:
+        for number, record in enumerate(read_records(path), start=1):
+            row = []
+            for column in columns:
+                parser, default = converters[column]
+                value = record.get(column)
+                if value in (None, ""):
+                    if default is None:
+                        raise ValueError(f"{path}:{number}: missing required field {column!r}")
+                    row.append(default)
+                else:
+                    row.append(parser(value))
+            yield tuple(row)
+
+
+class Progress:
+    def __init__(self, rows: Iterator[tuple], report_every: int) -> None:
+        self._rows = rows
+        self.report_every = report_every
+        self.count = 0
+        self.started_at = time.perf_counter()
+
+    def __iter__(self) -> Iterator[tuple]:
+        for row in self._rows:
+            self.count += 1
+            if self.count % self.report_every == 0:
+                print(f"{self.count} rows, {self.rows_per_second:.0f} rows/s", file=sys.stderr)
+            yield row
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started_at
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = Settings()
+    pool = await asyncpg.create_pool(settings.database_dsn, min_size=1, max_size=1)
+    repository = TABLES[args.table][0](pool)
+    rows = Progress(to_rows(args.table, args.paths), args.report_every)
+    try:
+        if args.ids_output:
+            ids = await repository.create_many(rows, chunk_size=args.chunk_size)
+            args.ids_output.write_text("".join(f"{row_id}\n" for row_id in ids))
+        else:
+            await repository.copy_many(rows, chunk_size=args.chunk_size)
+    finally:
+        await pool.close()
+    print(f"Loaded {rows.count} {args.table}, {rows.rows_per_second:.0f} rows/s", file=sys.stderr)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("paths", nargs="+", type=Path, help=".jsonl or .csv files, optionally gzipped")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--ids-output", type=Path, default=None, help="write the new ids here")
+    parser.add_argument("--report-every", type=int, default=100_000, help="rows between progress lines")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
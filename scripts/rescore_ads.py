@@ -0,0 +1,79 @@
+"""Re-score every ad with the current model into ``ad_scores``.
+
+    python scripts/rescore_ads.py --workers 8 --chunk-size 20000
+
+Interrupted runs resume from ``rescore_checkpoints``; ``--restart`` discards
+earlier results for the same model version.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import asyncpg
+
+from app.config import Settings
+from app.inference import INFERENCE_BACKENDS, build_inference_backend
+from app.model import ModelManager, model_version
+from app.rescoring import rescore
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = Settings()
+    model_manager = ModelManager(
+        args.model_path,
+        threshold=args.threshold,
+        backend=build_inference_backend(
+            settings.model_copy(update={"inference_backend": args.backend, "inference_workers": args.workers})
+        ),
+    )
+    model_manager.load()
+    version = args.model_version or model_version(args.model_path)
+    pool = await asyncpg.create_pool(settings.database_dsn, min_size=2, max_size=2)
+    try:
+        progress = await rescore(
+            pool,
+            model_manager,
+            version,
+            chunk_size=args.chunk_size,
+            max_inflight=args.max_inflight or args.workers * 2,
+            restart=args.restart,
+            report_interval=args.report_interval,
+        )
+    finally:
+        await pool.close()
+        model_manager.close()
+    print(
+        f"Model {version}: {progress.rows} rows scored, {progress.rows_per_second:.0f} rows/s",
+        file=sys.stderr,
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    settings = Settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-path", default=settings.model_path)
+    parser.add_argument("--model-version", default=None, help="defaults to a hash of the model file")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--backend", choices=INFERENCE_BACKENDS, default="process")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--max-inflight", type=int, default=None, help="chunks being scored at once")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="seconds between progress lines")
+    parser.add_argument("--restart", action="store_true", help="drop results and checkpoint of this model version")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
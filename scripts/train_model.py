@@ -1,3 +1,16 @@
+"""Train the moderation model and save it to ``models/model.pkl``.
+
+    python scripts/train_model.py
+    python scripts/train_model.py --from-db --workers 8 --alphas 1e-5 1e-4 1e-3
+
+Without ``--from-db`` a logistic regression is fitted on synthetic data.
+With it the completed moderation history is extracted into a feature cache
+and SGD candidates are trained out of core, see ``app/training.py``.
+"""
+
+import argparse
+import asyncio
+import logging
 import pickle
 import sys
 from pathlib import Path
@@ -23,12 +36,73 @@ def train_model():
     return model
 
 
-def main():
-    model = train_model()
-    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(MODEL_PATH, "wb") as f:
+async def extract_features(cache, chunk_size: int, refresh: bool) -> None:
+    import asyncpg
+
+    from app.config import Settings
+    from app.training import extract
+
+    pool = await asyncpg.create_pool(Settings().database_dsn, min_size=1, max_size=1)
+    try:
+        await extract(pool, cache, chunk_size, refresh)
+    finally:
+        await pool.close()
+
+
+def train_from_history(args: argparse.Namespace):
+    from app.training import FeatureCache, StageTimer, parameter_grid, search
+
+    timer = StageTimer()
+    cache = FeatureCache(args.cache_dir)
+    with timer.stage("extract"):
+        asyncio.run(extract_features(cache, args.fetch_size, args.refresh_cache))
+    if cache.rows == 0:
+        raise SystemExit("No completed moderation results to train on")
+    with timer.stage("search"):
+        results = search(
+            cache,
+            parameter_grid(args.alphas, args.penalties),
+            epochs=args.epochs,
+            chunk_size=args.chunk_size,
+            validation_fraction=args.validation_fraction,
+            workers=args.workers,
+        )
+    best = results[0]
+    print(
+        f"Best {best['params']}: log_loss={best['log_loss']:.4f} accuracy={best['accuracy']:.4f} "
+        f"on {cache.rows} rows; stages: {timer.report()}",
+        file=sys.stderr,
+    )
+    return best["model"]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, default=MODEL_PATH)
+    parser.add_argument("--from-db", action="store_true", help="train on the moderation history")
+    parser.add_argument("--cache-dir", type=Path, default=ROOT / "data" / "training_cache")
+    parser.add_argument("--refresh-cache", action="store_true", help="re-extract even if the cache is current")
+    parser.add_argument("--fetch-size", type=int, default=50_000, help="rows per cursor fetch")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per partial_fit call")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--validation-fraction", type=float, default=0.2, help="held-out tail of the cache")
+    parser.add_argument("--alphas", type=float, nargs="+", default=[1e-5, 1e-4, 1e-3])
+    parser.add_argument("--penalties", nargs="+", default=["l2", "l1"])
+    parser.add_argument("--workers", type=int, default=None, help="parallel candidates, defaults to CPU count")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.from_db:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        model = train_from_history(args)
+    else:
+        model = train_model()
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "wb") as f:
         pickle.dump(model, f)
-    print(f"Model saved to {MODEL_PATH}", file=sys.stderr)
+    print(f"Model saved to {args.output}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -3,12 +3,14 @@ from unittest.mock import AsyncMock, MagicMock, Mock
 
 from fastapi.testclient import TestClient
 
+from app.cache import ResultCache
 from app.main import app
 from app.dependencies import (
     get_ad_repository,
     get_kafka_producer,
     get_model_manager,
     get_moderation_repository,
+    get_result_cache,
 )
 
 @pytest.fixture(autouse=True)
@@ -65,6 +67,7 @@ def mock_model_manager():
 def mock_ad_repository():
     mock = Mock()
     mock.get_with_user_by_id = AsyncMock()
+    mock.get_existing_ids = AsyncMock(return_value=set())
     return mock
 
 
@@ -72,8 +75,11 @@ def mock_ad_repository():
 def mock_moderation_repository():
     mock = Mock()
     mock.create_pending = AsyncMock(return_value=42)
+    mock.create_pending_many = AsyncMock(return_value=[])
     mock.get_by_id = AsyncMock(return_value=None)
     mock.get_oldest_pending_by_item_id = AsyncMock(return_value=None)
+    mock.get_many = AsyncMock(return_value=[])
+    mock.list_page = AsyncMock(return_value=[])
     return mock
 
 
@@ -81,15 +87,22 @@ def mock_moderation_repository():
 def mock_kafka_producer_dep():
     mock = MagicMock()
     mock.send_moderation_request = AsyncMock()
+    mock.send_moderation_requests = AsyncMock()
     return mock
 
 
+@pytest.fixture
+def result_cache():
+    return ResultCache(max_size=100)
+
+
 @pytest.fixture
 def app_with_dependency_overrides(
     mock_model_manager,
     mock_ad_repository,
     mock_moderation_repository,
     mock_kafka_producer_dep,
+    result_cache,
 ):
     original_overrides = app.dependency_overrides.copy()
 
@@ -104,10 +117,14 @@ def app_with_dependency_overrides(
 
     async def get_mock_model():
         return mock_model_manager
+
+    async def get_test_result_cache():
+        return result_cache
     app.dependency_overrides[get_model_manager] = get_mock_model
     app.dependency_overrides[get_ad_repository] = get_mock_ad_repo
     app.dependency_overrides[get_moderation_repository] = get_mock_moderation_repo
     app.dependency_overrides[get_kafka_producer] = get_mock_kafka
+    app.dependency_overrides[get_result_cache] = get_test_result_cache
 
     yield app
 
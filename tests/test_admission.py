@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.admission import ConcurrencyLimiter
+from app.exceptions import AdmissionRejected
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_then_admits_in_order():
+    limiter = ConcurrencyLimiter("test", limit=1, queue_timeout=1.0)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limiter.release(0.0)
+    await waiter
+    assert limiter.inflight == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_after_queue_timeout():
+    limiter = ConcurrencyLimiter("test", limit=1, queue_timeout=0.01)
+    await limiter.acquire()
+
+    with pytest.raises(AdmissionRejected):
+        await limiter.acquire()
+    assert limiter.inflight == 1
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_grows_on_fast_and_shrinks_on_slow_requests():
+    limiter = ConcurrencyLimiter(
+        "test", limit=4, queue_timeout=0.01, adaptive=True, min_limit=1, max_limit=8, latency_target=0.05
+    )
+    for _ in range(20):
+        await limiter.acquire()
+        limiter.release(0.001)
+    assert limiter.limit > 4
+
+    grown = limiter.limit
+    await limiter.acquire()
+    limiter.release(1.0)
+    assert limiter.limit < grown
+
+
+@pytest.fixture
+def saturated_predict_limiter():
+    limiter = ConcurrencyLimiter("predict", limit=1, queue_timeout=0.0, retry_after=3)
+    limiter._inflight = 1
+    app.state.limiters = {"predict": limiter}
+    yield limiter
+    del app.state.limiters
+
+
+def test_predict_rejected_with_retry_after_when_saturated(
+    client_with_model, valid_ad_payload, saturated_predict_limiter, mock_model_manager
+):
+    response = client_with_model.post("/predict", json=valid_ad_payload)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    mock_model_manager.predict.assert_not_called()
+
+
+def test_predict_releases_slot_after_request(client_with_model, valid_ad_payload):
+    limiter = ConcurrencyLimiter("predict", limit=1, queue_timeout=0.0)
+    app.state.limiters = {"predict": limiter}
+    try:
+        assert client_with_model.post("/predict", json=valid_ad_payload).status_code == 200
+        assert client_with_model.post("/predict", json=valid_ad_payload).status_code == 200
+        assert limiter.inflight == 0
+    finally:
+        del app.state.limiters
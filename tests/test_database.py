@@ -0,0 +1,114 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.database import RoutingPool
+from app.repositories import ModerationRepository
+
+
+class StubPool:
+    """Supports both ``await pool.acquire()`` and ``async with pool.acquire()``."""
+
+    def __init__(self, name, row=None, lag=0.0, error=None):
+        self.conn = Mock(name=name)
+        self.conn.fetchrow = AsyncMock(return_value=row)
+        self.conn.fetchval = AsyncMock(return_value=lag)
+        self.error = error
+        self.release = AsyncMock()
+        self.close = AsyncMock()
+
+    def acquire(self, timeout=None):
+        pool = self
+
+        class Acquire:
+            def __await__(self):
+                return self._acquire().__await__()
+
+            async def _acquire(self):
+                if pool.error:
+                    raise pool.error
+                return pool.conn
+
+            async def __aenter__(self):
+                return await self._acquire()
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+
+async def acquired_connection(pool, readonly):
+    async with pool.acquire(readonly=readonly) as conn:
+        return conn
+
+
+def test_reads_go_to_replicas_and_writes_to_primary():
+    primary, replica = StubPool("primary"), StubPool("replica")
+    pool = RoutingPool(primary, [replica])
+
+    assert asyncio.run(acquired_connection(pool, readonly=True)) is replica.conn
+    assert asyncio.run(acquired_connection(pool, readonly=False)) is primary.conn
+    replica.release.assert_awaited_once_with(replica.conn)
+
+
+def test_lagging_replica_is_bypassed_until_it_catches_up():
+    primary, replica = StubPool("primary"), StubPool("replica", lag=30.0)
+    pool = RoutingPool(primary, [replica], max_lag=5.0)
+
+    asyncio.run(pool.check_replicas())
+    assert asyncio.run(acquired_connection(pool, readonly=True)) is primary.conn
+
+    replica.conn.fetchval.return_value = 0.5
+    asyncio.run(pool.check_replicas())
+    assert asyncio.run(acquired_connection(pool, readonly=True)) is replica.conn
+
+
+def test_unreachable_replica_fails_over_to_primary():
+    primary = StubPool("primary")
+    replica = StubPool("replica", error=ConnectionRefusedError("down"))
+    pool = RoutingPool(primary, [replica])
+
+    assert asyncio.run(acquired_connection(pool, readonly=True)) is primary.conn
+    assert pool.replicas[0].healthy is False
+
+
+def test_replica_acquire_timeout_keeps_the_replica_healthy():
+    primary = StubPool("primary")
+    replica = StubPool("replica", error=asyncio.TimeoutError())
+    pool = RoutingPool(primary, [replica])
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(acquired_connection(pool, readonly=True))
+    assert pool.replicas[0].healthy is True
+
+
+def test_result_missing_on_replica_is_read_from_primary():
+    primary = StubPool("primary", row={"id": 7, "status": "pending"})
+    replica = StubPool("replica", row=None)
+    repository = ModerationRepository(RoutingPool(primary, [replica], read_your_writes=True))
+
+    assert asyncio.run(repository.get_by_id(7)) == {"id": 7, "status": "pending"}
+    replica.conn.fetchrow.assert_awaited_once()
+
+
+def test_read_your_writes_can_be_disabled():
+    primary = StubPool("primary", row={"id": 7})
+    replica = StubPool("replica", row=None)
+    repository = ModerationRepository(RoutingPool(primary, [replica], read_your_writes=False))
+
+    assert asyncio.run(repository.get_by_id(7)) is None
+    primary.conn.fetchrow.assert_not_awaited()
+
+
+def test_bulk_lookup_reads_only_missing_ids_from_primary():
+    primary, replica = StubPool("primary"), StubPool("replica")
+    replica.conn.fetch = AsyncMock(return_value=[{"id": 1}, {"id": 3}])
+    primary.conn.fetch = AsyncMock(return_value=[{"id": 2}])
+    repository = ModerationRepository(RoutingPool(primary, [replica], read_your_writes=True))
+
+    rows = asyncio.run(repository.get_many([3, 2, 1, 4]))
+
+    assert rows == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert primary.conn.fetch.call_args.args[1] == [2, 4]
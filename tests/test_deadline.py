@@ -0,0 +1,99 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.deadline import DeadlinePolicy, deadline_scope, remaining, run_with_deadline
+from app.dependencies import get_model_manager
+from app.exceptions import DeadlineExceeded
+from app.model import ModelManager
+from app.repositories import AdRepository
+
+
+class SlowModel:
+    def predict_proba(self, features):
+        time.sleep(0.3)
+        return [[0.1, 0.9]]
+
+
+@pytest.fixture
+def slow_model_client(app_with_dependency_overrides, client_with_model):
+    manager = ModelManager()
+    manager.model = SlowModel()
+
+    async def get_slow_model():
+        return manager
+
+    app_with_dependency_overrides.dependency_overrides[get_model_manager] = get_slow_model
+    return client_with_model
+
+
+def test_predict_returns_504_when_inference_misses_deadline(slow_model_client, valid_ad_payload):
+    response = slow_model_client.post(
+        "/predict", json=valid_ad_payload, headers={"X-Request-Timeout-Ms": "50"}
+    )
+
+    assert response.status_code == 504
+    assert response.json()["stage"] == "inference"
+
+
+def test_predict_rejects_invalid_timeout_header(client_with_model, valid_ad_payload):
+    response = client_with_model.post(
+        "/predict", json=valid_ad_payload, headers={"X-Request-Timeout-Ms": "soon"}
+    )
+
+    assert response.status_code == 400
+
+
+def test_policy_prefers_header_and_caps_at_maximum():
+    policy = DeadlinePolicy(default_ms=1000, route_ms={"batch": 5000}, max_ms=3000)
+
+    assert policy.timeout_ms("predict", None) == 1000
+    assert policy.timeout_ms("batch", None) == 3000
+    assert policy.timeout_ms("predict", "200") == 200
+
+
+def test_no_deadline_outside_requests():
+    assert remaining() is None
+    assert asyncio.run(run_with_deadline("inference", asyncio.sleep(0, result=1))) == 1
+
+
+def test_expired_deadline_skips_work():
+    async def main():
+        with deadline_scope(0):
+            await run_with_deadline("kafka_send", asyncio.sleep(1))
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        asyncio.run(main())
+    assert exc_info.value.stage == "kafka_send"
+
+
+def test_repository_passes_remaining_time_to_pool_and_query():
+    pool = MagicMock()
+    conn = pool.acquire.return_value.__aenter__.return_value
+    conn.fetchrow = MagicMock(return_value=asyncio.sleep(0, result=None))
+    repo = AdRepository(pool)
+
+    async def main():
+        with deadline_scope(5):
+            await repo.get_with_user_by_id(1)
+
+    asyncio.run(main())
+
+    assert 0 < pool.acquire.call_args.kwargs["timeout"] <= 5
+    assert 0 < conn.fetchrow.call_args.kwargs["timeout"] <= 5
+
+
+def test_repository_reports_pool_acquire_timeout():
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.side_effect = asyncio.TimeoutError
+    repo = AdRepository(pool)
+
+    async def main():
+        with deadline_scope(5):
+            await repo.get_with_user_by_id(1)
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        asyncio.run(main())
+    assert exc_info.value.stage == "db_acquire"
@@ -0,0 +1,121 @@
+import asyncio
+import re
+import time
+from collections import namedtuple
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from app.clients.codec import encode_dlq_payload
+from app.serialization import dumps
+from app.workers.dlq_replayer import DLQFilter, RateLimiter, replay
+
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+Record = namedtuple("Record", ["offset", "value"])
+DLQ = TopicPartition("moderation_dlq", 0)
+
+
+class StubConsumer:
+    def __init__(self, values):
+        self.log = [Record(offset, value) for offset, value in enumerate(values)]
+        self.position_ = 0
+        self.committed = None
+
+    async def end_offsets(self, partitions):
+        return {tp: len(self.log) for tp in partitions}
+
+    async def position(self, tp):
+        return self.position_
+
+    async def getmany(self, *partitions, timeout_ms=0, max_records=None):
+        records = self.log[self.position_:self.position_ + max_records]
+        self.position_ += len(records)
+        # Entries dead-lettered again while replaying land after the starting end offset.
+        self.log.append(Record(len(self.log), encode_dlq_payload({"item_id": 99}, "again", 1)))
+        return {DLQ: records} if records else {}
+
+    async def commit(self, offsets):
+        self.committed = offsets
+
+
+def entry(item_id, error, timestamp="2024-05-02T10:00:00Z"):
+    return dumps({"original_message": {"item_id": item_id}, "error": error, "timestamp": timestamp, "retry_count": 1})
+
+
+def repositories(existing):
+    ad_repository = AsyncMock()
+    ad_repository.get_existing_ids.side_effect = lambda ids: set(ids) & existing
+    return ad_repository, AsyncMock()
+
+
+def test_replays_matching_items_once_up_to_the_starting_end():
+    consumer = StubConsumer([
+        entry(1, "Ad not found: item_id=1"),
+        entry(2, "Connection timeout"),
+        entry(2, "Connection timeout"),
+        entry(3, "Connection timeout", timestamp="2024-04-30T23:59:59Z"),
+        entry(4, "Connection timeout"),
+        dumps({"original_message": {"raw": "{bad"}, "error": "Invalid JSON", "timestamp": "2024-05-02T10:00:00Z"}),
+        dumps({"original_message": {"raw": "{bad"}, "error": "Read timeout", "timestamp": "2024-05-02T10:00:00Z"}),
+        b"not json",
+    ])
+    ad_repository, moderation_repository = repositories(existing={2})
+    sent = []
+
+    async def sink(item_ids):
+        sent.append(item_ids)
+
+    dlq_filter = DLQFilter(errors=[re.compile("timeout")], since=datetime(2024, 5, 1))
+    progress = asyncio.run(
+        replay(consumer, [DLQ], dlq_filter, ad_repository, moderation_repository, sink, batch_size=3)
+    )
+
+    assert sent == [[2]]
+    moderation_repository.create_pending_many.assert_awaited_once_with([2])
+    assert (progress.read, progress.matched, progress.replayed) == (8, 4, 1)
+    assert (progress.duplicate, progress.missing, progress.invalid, progress.undecodable) == (1, 1, 1, 1)
+    assert consumer.committed == {DLQ: 8}
+
+
+def test_replay_ends_when_the_last_offsets_are_never_delivered():
+    consumer = StubConsumer([entry(1, "boom")])
+
+    async def end_offsets(partitions):
+        # A transaction commit marker follows the last record.
+        return {tp: 2 for tp in partitions}
+
+    async def getmany(*partitions, timeout_ms=0, max_records=None):
+        await asyncio.sleep(0)
+        records = consumer.log[consumer.position_:1]
+        consumer.position_ = 2
+        return {DLQ: records} if records else {}
+
+    consumer.end_offsets, consumer.getmany = end_offsets, getmany
+    ad_repository, moderation_repository = repositories(existing={1})
+
+    progress = asyncio.run(
+        asyncio.wait_for(replay(consumer, [DLQ], DLQFilter(), ad_repository, moderation_repository, None), 5)
+    )
+
+    assert (progress.read, progress.matched) == (1, 1)
+
+
+def test_dry_run_counts_without_replaying_or_committing():
+    consumer = StubConsumer([entry(1, "boom"), entry(2, "boom")])
+    ad_repository, moderation_repository = repositories(existing={1, 2})
+
+    progress = asyncio.run(replay(consumer, [DLQ], DLQFilter(), ad_repository, moderation_repository, None))
+
+    assert (progress.matched, progress.replayed) == (2, 0)
+    moderation_repository.create_pending_many.assert_not_awaited()
+    assert consumer.committed is None
+
+
+def test_rate_limiter_paces_batches():
+    async def scenario():
+        limiter = RateLimiter(rate=1000)
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire(50)
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) >= 0.09
@@ -0,0 +1,98 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from app.config import Settings
+from app.dependencies import get_ad_feature_repository, get_model_manager
+from app.features import feature_repository_for, predict_with_features
+from app.model import ModelManager
+from app.repositories import AdFeatureRepository
+
+
+def feature_row(model_version=None, probability=None):
+    return {
+        "ad_id": 7,
+        "is_verified": 1.0,
+        "images": 0.3,
+        "description_length": 0.25,
+        "category": 0.12,
+        "model_version": model_version,
+        "is_violation": None if probability is None else probability > 0.5,
+        "probability": probability,
+    }
+
+
+@pytest.fixture
+def model_manager():
+    manager = Mock()
+    manager.version = "v2"
+    manager.predict_features = AsyncMock(return_value={"is_violation": True, "probability": 0.9})
+    manager.resolve = AsyncMock(return_value=manager)
+    return manager
+
+
+@pytest.fixture
+def feature_repository():
+    repository = Mock()
+    repository.get = AsyncMock(return_value=None)
+    repository.save_score = AsyncMock(return_value=True)
+    return repository
+
+
+def test_score_of_current_model_is_returned_without_inference(model_manager, feature_repository):
+    feature_repository.get.return_value = feature_row("v2", 0.2)
+
+    result = asyncio.run(predict_with_features(7, model_manager, feature_repository))
+
+    assert result == {"is_violation": False, "probability": 0.2}
+    model_manager.predict_features.assert_not_called()
+    feature_repository.save_score.assert_not_called()
+
+
+def test_score_of_older_model_is_recomputed_and_stored(model_manager, feature_repository):
+    row = feature_row("v1", 0.2)
+    feature_repository.get.return_value = row
+
+    result = asyncio.run(predict_with_features(7, model_manager, feature_repository))
+
+    assert result == {"is_violation": True, "probability": 0.9}
+    features = model_manager.predict_features.call_args.args[0]
+    np.testing.assert_array_equal(features, ModelManager.prepare_features(True, 3, 250, 12))
+    feature_repository.save_score.assert_awaited_once_with(row, "v2", True, 0.9)
+
+
+def test_missing_feature_row_returns_none(model_manager, feature_repository):
+    assert asyncio.run(predict_with_features(7, model_manager, feature_repository)) is None
+
+
+@pytest.mark.parametrize("enabled, in_sync, expected", [(False, True, False), (True, False, False), (True, True, True)])
+def test_feature_repository_requires_the_flag_and_the_sync_triggers(monkeypatch, enabled, in_sync, expected):
+    monkeypatch.setattr(AdFeatureRepository, "sync_enabled", AsyncMock(return_value=in_sync))
+    settings = Settings(precomputed_features_enabled=enabled)
+
+    repository = asyncio.run(feature_repository_for(Mock(), settings))
+
+    assert isinstance(repository, AdFeatureRepository) is expected
+
+
+def test_simple_predict_uses_precomputed_features(
+    app_with_dependency_overrides, client_with_model, mock_ad_repository, model_manager, feature_repository
+):
+    feature_repository.get.return_value = feature_row()
+
+    async def get_model():
+        return model_manager
+
+    async def get_features():
+        return feature_repository
+
+    app_with_dependency_overrides.dependency_overrides[get_model_manager] = get_model
+    app_with_dependency_overrides.dependency_overrides[get_ad_feature_repository] = get_features
+
+    response = client_with_model.post("/simple_predict", json={"item_id": 7})
+
+    assert response.status_code == 200
+    assert response.json() == {"is_violation": True, "probability": 0.9}
+    mock_ad_repository.get_with_user_by_id.assert_not_called()
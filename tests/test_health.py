@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from app.main import app
+from app.repositories import AdRepository, ModerationRepository
+from app.warmup import Readiness, warm_pool
+
+
+@pytest.fixture
+def app_state(monkeypatch):
+    for name in ("model_manager", "db_pool", "kafka_producer", "readiness"):
+        monkeypatch.setattr(app.state, name, None, raising=False)
+    return app.state
+
+
+def make_pool(min_size=2):
+    pool = MagicMock()
+    pool.get_min_size.return_value = min_size
+    conn = pool.acquire.return_value.__aenter__.return_value
+    conn.fetch = AsyncMock(return_value=[])
+    conn.fetchval = AsyncMock(return_value=1)
+    return pool, conn
+
+
+def test_health_reports_missing_model(client, app_state):
+    response = client.get("/health")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "unhealthy", "model_loaded": False}
+
+
+def test_livez_needs_no_dependencies(client, app_state):
+    assert client.get("/livez").json() == {"status": "alive"}
+
+
+def test_readyz_is_not_ready_before_warmup(client, app_state, mock_model_manager):
+    app_state.model_manager = mock_model_manager
+    app_state.db_pool, _ = make_pool()
+    app_state.kafka_producer = Mock(fetch_metadata=AsyncMock())
+    app_state.readiness = Readiness()
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json()["warmed_up"] is False
+    assert all(check["ok"] for check in response.json()["checks"].values())
+
+
+def test_readyz_reports_failing_dependency(client, app_state, mock_model_manager):
+    app_state.model_manager = mock_model_manager
+    app_state.db_pool, _ = make_pool()
+    app_state.kafka_producer = Mock(fetch_metadata=AsyncMock(side_effect=ConnectionError("no brokers")))
+    app_state.readiness = Readiness()
+    app_state.readiness.warmed_up = True
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    checks = response.json()["checks"]
+    assert checks["database"]["ok"] is True
+    assert checks["kafka"]["ok"] is False
+    assert checks["kafka"]["error"] == "no brokers"
+
+
+def test_readyz_is_ready_after_warmup(client, app_state, mock_model_manager):
+    app_state.model_manager = mock_model_manager
+    app_state.db_pool, _ = make_pool()
+    app_state.kafka_producer = Mock(fetch_metadata=AsyncMock())
+    app_state.readiness = Readiness()
+    app_state.readiness.warmed_up = True
+
+    assert client.get("/readyz").status_code == 200
+
+
+def test_warm_pool_runs_hot_statements_on_every_connection():
+    pool, conn = make_pool(min_size=3)
+    repositories = [AdRepository(pool), ModerationRepository(pool)]
+
+    warmed = asyncio.run(warm_pool(pool, repositories))
+
+    assert warmed == 3
+    assert pool.acquire.call_count == 3
+    assert conn.fetch.await_count == 3 * 3
@@ -0,0 +1,103 @@
+import asyncio
+import pickle
+import threading
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from app.config import Settings
+from app.inference import (
+    InlineBackend,
+    ProcessPoolBackend,
+    ThreadPoolBackend,
+    build_inference_backend,
+)
+from app.model import ModelManager
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    rng = np.random.default_rng(0)
+    features = rng.random((200, 4))
+    model = LogisticRegression().fit(features, features[:, 0] > 0.5)
+    path = tmp_path / "model.pkl"
+    path.write_bytes(pickle.dumps(model))
+    return str(path)
+
+
+@pytest.mark.parametrize("backend_factory", [InlineBackend, lambda: ThreadPoolBackend(2)])
+def test_in_process_backends_match_model(model_path, backend_factory):
+    manager = ModelManager(model_path=model_path, backend=backend_factory())
+    manager.load()
+    features = manager.prepare_features(True, 3, 250, 12)
+
+    result = asyncio.run(manager.predict(True, 3, 250, 12))
+
+    assert result["probability"] == pytest.approx(manager.model.predict_proba(features)[0, 1])
+    manager.close()
+
+
+def test_thread_backend_reports_queue_depth():
+    backend = ThreadPoolBackend(max_workers=1)
+    release = threading.Event()
+
+    class BlockingModel:
+        def predict_proba(self, features):
+            release.wait(1)
+            return np.zeros((len(features), 2))
+
+    async def main():
+        calls = [
+            asyncio.create_task(backend.predict_proba(BlockingModel(), np.zeros((1, 4))))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.05)
+        inflight = backend.inflight
+        release.set()
+        await asyncio.gather(*calls)
+        return inflight
+
+    assert asyncio.run(main()) == 3
+    assert backend.inflight == 0
+    backend.shutdown()
+
+
+def test_process_backend_uses_shared_memory_for_large_batches(model_path):
+    backend = ProcessPoolBackend(max_workers=1, shared_memory_min_bytes=1024)
+    backend.load(model_path)
+    with open(model_path, "rb") as f:
+        model = pickle.load(f)
+    small = np.random.default_rng(1).random((1, 4))
+    large = np.random.default_rng(2).random((1000, 4))
+
+    async def main():
+        return await asyncio.gather(
+            backend.predict_proba(None, small), backend.predict_proba(None, large)
+        )
+
+    try:
+        small_proba, large_proba = asyncio.run(main())
+    finally:
+        backend.shutdown()
+
+    np.testing.assert_allclose(small_proba, model.predict_proba(small)[:, 1])
+    np.testing.assert_allclose(large_proba, model.predict_proba(large)[:, 1])
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        build_inference_backend(Settings(inference_backend="gpu"))
+
+
+def test_default_thread_backend_is_created_on_first_use(model_path):
+    unused = ModelManager(model_path)
+    unused.close()
+    assert unused._backend is None
+
+    manager = ModelManager(model_path)
+    manager.load()
+    try:
+        assert isinstance(manager.backend, ThreadPoolBackend)
+    finally:
+        manager.close()
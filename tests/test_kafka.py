@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.clients.codec import ModerationMessage, decode_moderation_message
+from app.clients.kafka import KafkaProducerClient
+from app.serialization import FastJSONResponse
+
+
+def test_moderation_message_round_trip():
+    message = ModerationMessage(item_id=7, timestamp="2024-01-01T00:00:00Z")
+
+    assert decode_moderation_message(message.encode()) == {
+        "item_id": 7,
+        "timestamp": "2024-01-01T00:00:00Z",
+    }
+    assert json.loads(message.to_json()) == message.to_dict()
+
+
+def test_decode_moderation_message_invalid_json():
+    with pytest.raises(json.JSONDecodeError):
+        decode_moderation_message(b"{not json")
+
+
+def test_fast_json_response_renders_compact_json():
+    response = FastJSONResponse({"is_violation": True, "probability": 0.5, "text": "тест"})
+
+    assert json.loads(response.body) == {"is_violation": True, "probability": 0.5, "text": "тест"}
+    assert response.headers["content-type"] == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_send_to_dlq_payload():
+    client = KafkaProducerClient("localhost:9092", "moderation", dlq_topic="moderation_dlq")
+    client._producer = MagicMock()
+    client._producer.send_and_wait = AsyncMock()
+
+    await client.send_to_dlq({"item_id": 1}, "boom", retry_count=2)
+
+    topic, value = client._producer.send_and_wait.call_args.args
+    payload = json.loads(value)
+    assert topic == "moderation_dlq"
+    assert payload["original_message"] == {"item_id": 1}
+    assert payload["error"] == "boom"
+    assert payload["retry_count"] == 2
+
+
+def test_binary_batch_round_trip():
+    from datetime import datetime, timezone
+
+    from app.clients.codec import binary_headers, decode_record, encode_moderation_batch
+
+    data = encode_moderation_batch([1, 2, 2**40], datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    assert len(data) == 13 + 3 * 8
+    assert decode_record(data, binary_headers()) == [
+        {"item_id": 1, "timestamp": "2024-01-01T00:00:00Z"},
+        {"item_id": 2, "timestamp": "2024-01-01T00:00:00Z"},
+        {"item_id": 2**40, "timestamp": "2024-01-01T00:00:00Z"},
+    ]
+
+
+def test_decode_record_without_headers_is_legacy_json():
+    from app.clients.codec import decode_record
+
+    assert decode_record(b'{"item_id": 5, "timestamp": "t"}', None) == [{"item_id": 5, "timestamp": "t"}]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [b"\x01\x00", b"\x02\x00\x00\x00\x01" + b"\x00" * 16, b"\x01\x00\x00\x00\x02" + b"\x00" * 16],
+)
+def test_decode_record_rejects_malformed_binary(value):
+    from app.clients.codec import binary_headers, decode_record
+    from app.exceptions import InvalidMessageError
+
+    with pytest.raises(InvalidMessageError):
+        decode_record(value, binary_headers())
+
+
+def test_decode_record_rejects_non_object_json():
+    from app.clients.codec import decode_record
+    from app.exceptions import InvalidMessageError
+
+    with pytest.raises(InvalidMessageError):
+        decode_record(b"[1, 2]", None)
+
+
+@pytest.mark.asyncio
+async def test_send_moderation_requests_packs_binary_records():
+    import asyncio
+
+    from app.clients.codec import decode_record
+
+    client = KafkaProducerClient("localhost:9092", "moderation", wire_format="binary", max_items_per_record=2)
+    client._producer = MagicMock()
+    done = asyncio.get_running_loop().create_future()
+    done.set_result(None)
+    client._producer.send = AsyncMock(return_value=done)
+
+    await client.send_moderation_requests([10, 11, 12])
+
+    calls = client._producer.send.call_args_list
+    assert len(calls) == 2
+    decoded = [decode_record(c.args[1], c.kwargs["headers"]) for c in calls]
+    assert [p["item_id"] for batch in decoded for p in batch] == [10, 11, 12]
+
+
+@pytest.mark.asyncio
+async def test_send_moderation_requests_gives_up_while_the_buffer_is_full():
+    import asyncio
+
+    from app.deadline import deadline_scope
+    from app.exceptions import DeadlineExceeded
+
+    client = KafkaProducerClient("localhost:9092", "moderation")
+
+    async def full_buffer(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    client._producer = MagicMock()
+    client._producer.send = full_buffer
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        with deadline_scope(0.05):
+            await client.send_moderation_requests([10, 11, 12])
+    assert exc_info.value.stage == "kafka_send"
@@ -0,0 +1,143 @@
+import asyncio
+from collections import namedtuple
+
+import pytest
+from aiokafka.errors import ConsumerStoppedError
+
+from app.config import Settings
+from app.clients.kafka import KafkaProducerClient, priority_topics
+from app.workers.lanes import LaneScheduler, build_lanes
+
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+Record = namedtuple("Record", ["topic", "partition", "offset", "value", "timestamp"])
+
+
+class StubConsumer:
+    """Serves preloaded topics, ``max_records`` at a time, and stops once they are drained."""
+
+    def __init__(self, topics):
+        self.topics = {topic: list(records) for topic, records in topics.items()}
+        self.paused_topics = set()
+        self.committed = {}
+
+    def assignment(self):
+        return {TopicPartition(topic, 0) for topic in self.topics}
+
+    async def commit(self, offsets):
+        self.committed.update(offsets)
+
+    def pause(self, *partitions):
+        self.paused_topics.update(p.topic for p in partitions)
+
+    def resume(self, *partitions):
+        self.paused_topics.difference_update(p.topic for p in partitions)
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        fetched = {}
+        for topic, records in self.topics.items():
+            if topic not in self.paused_topics and records:
+                fetched[TopicPartition(topic, 0)] = records[:max_records]
+                del records[:max_records]
+        if not fetched and timeout_ms:
+            raise ConsumerStoppedError()
+        return fetched
+
+
+def records(topic, n):
+    return [Record(topic, 0, i, i, 0) for i in range(n)]
+
+
+async def drain(scheduler, limit=None):
+    served = []
+    async for lane, record in scheduler:
+        served.append(lane.name)
+        if len(served) == limit:
+            break
+    return served
+
+
+def test_backlogged_lanes_are_served_by_weight():
+    lanes = build_lanes({"high": "hi", "normal": "moderation", "low": "backfill"}, {"high": 3, "low": 1})
+    consumer = StubConsumer({"hi": records("hi", 30), "moderation": [], "backfill": records("backfill", 30)})
+
+    served = asyncio.run(drain(LaneScheduler(consumer, lanes, buffer_size=100), limit=20))
+
+    assert served.count("high") == 15
+    assert served.count("low") == 5
+
+
+def test_idle_lane_share_goes_to_others():
+    lanes = build_lanes({"high": "hi", "normal": "moderation", "low": "backfill"}, {"high": 8, "low": 1})
+    consumer = StubConsumer({"hi": [], "moderation": [], "backfill": records("backfill", 25)})
+
+    assert asyncio.run(drain(LaneScheduler(consumer, lanes))) == ["low"] * 25
+
+
+def test_full_lane_is_paused_until_half_drained():
+    lanes = build_lanes({"high": "hi", "normal": "moderation", "low": "moderation"}, {})
+    consumer = StubConsumer({"hi": [], "moderation": []})
+    scheduler = LaneScheduler(consumer, lanes, buffer_size=4)
+    lane = lanes[1]
+    lane.buffer.extend(records("moderation", 4))
+
+    paused = []
+    for _ in range(3):
+        scheduler._apply_backpressure()
+        paused.append(set(consumer.paused_topics))
+        lane.buffer.popleft()
+
+    assert paused == [{"moderation"}, {"moderation"}, set()]
+
+
+def test_only_handled_records_are_committed():
+    lanes = build_lanes({"high": "moderation", "normal": "moderation", "low": "moderation"}, {})
+    consumer = StubConsumer({"moderation": records("moderation", 10)})
+    scheduler = LaneScheduler(consumer, lanes, buffer_size=10)
+
+    async def scenario():
+        iterator = scheduler.__aiter__()
+        for _ in range(2):
+            _, record = await iterator.__anext__()
+            scheduler.ack(record)
+        # Handed out but not yet handled when the worker stops.
+        await iterator.__anext__()
+        await scheduler.commit()
+
+    asyncio.run(scenario())
+    assert consumer.committed == {("moderation", 0): 2}
+
+
+def test_revoked_partitions_are_dropped_from_the_buffer():
+    lanes = build_lanes({"high": "hi", "normal": "moderation", "low": "moderation"}, {})
+    consumer = StubConsumer({"hi": [], "moderation": []})
+    scheduler = LaneScheduler(consumer, lanes)
+    lanes[1].buffer.extend([Record("moderation", 0, 5, b"", 0), Record("moderation", 1, 7, b"", 0)])
+
+    scheduler.drop({TopicPartition("moderation", 0)})
+
+    assert [record.partition for record in lanes[1].buffer] == [1]
+
+
+def test_priorities_without_a_topic_share_the_normal_lane():
+    settings = Settings(kafka_priority_topics={"low": "moderation_backfill"})
+
+    lanes = build_lanes(priority_topics(settings), settings.kafka_priority_weights)
+
+    assert [(lane.name, lane.topic) for lane in lanes] == [
+        ("normal", "moderation"),
+        ("low", "moderation_backfill"),
+    ]
+
+
+def test_unknown_priority_topic_is_rejected():
+    with pytest.raises(ValueError):
+        priority_topics(Settings(kafka_priority_topics={"urgent": "x"}))
+
+
+def test_producer_routes_by_priority():
+    client = KafkaProducerClient(
+        "localhost:9092", "moderation", priority_topics={"high": "moderation_high", "normal": "moderation"}
+    )
+
+    assert client.topic_for("high") == "moderation_high"
+    assert client.topic_for("low") == "moderation"
@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.loadgen import ASYNC_ENDPOINT, LoadGenerator, Recorder, arrival_times, parse_mix
+
+
+def test_mix_weights_default_to_one():
+    assert parse_mix("/predict=3, /simple_predict ,/async_predict=0.5") == {
+        "/predict": 3.0,
+        "/simple_predict": 1.0,
+        "/async_predict": 0.5,
+    }
+
+
+def test_constant_rate_is_evenly_spaced():
+    offsets = list(arrival_times(rate=10, ramp_to=None, duration=2))
+
+    assert len(offsets) == 20
+    assert offsets[0] == 0.0
+    assert all(b - a == pytest.approx(0.1) for a, b in zip(offsets, offsets[1:]))
+    assert offsets[-1] < 2
+
+
+def test_ramp_increases_the_rate():
+    offsets = list(arrival_times(rate=10, ramp_to=30, duration=2))
+    first_half = sum(1 for t in offsets if t < 1)
+
+    assert len(offsets) - first_half > first_half
+    assert 20 < len(offsets) < 60
+    assert offsets[-1] < 2
+
+
+def test_dropped_request_is_recorded_at_the_timeout():
+    recorder = Recorder()
+
+    recorder.record_drop("/predict", timeout=30.0)
+
+    assert recorder.dropped == 1
+    assert recorder.statuses["/predict"]["dropped"] == 1
+    assert recorder.response_time["/predict"].max_value >= 30_000_000
+
+
+def test_results_are_polled_on_their_own_client_without_an_inflight_slot():
+    requests = {"send": [], "poll": []}
+
+    def send(request):
+        requests["send"].append(request.method)
+        return httpx.Response(200, json={"task_id": 1})
+
+    def poll(request):
+        requests["poll"].append(request.method)
+        return httpx.Response(200, json={"status": "pending" if len(requests["poll"]) == 1 else "completed"})
+
+    async def main():
+        async with (
+            httpx.AsyncClient(base_url="http://test", transport=httpx.MockTransport(send)) as client,
+            httpx.AsyncClient(base_url="http://test", transport=httpx.MockTransport(poll)) as poll_client,
+        ):
+            generator = LoadGenerator(
+                client,
+                {ASYNC_ENDPOINT: [{"item_id": 1}]},
+                {ASYNC_ENDPOINT: 1.0},
+                poll_interval=0.1,
+                poll_timeout=1.0,
+                max_inflight=1,
+                poll_client=poll_client,
+            )
+            # The second request is due while the first one is still being polled.
+            await generator.run(iter([0.0, 0.05]))
+            return generator.recorder
+
+    recorder = asyncio.run(main())
+
+    assert requests["send"] == ["POST", "POST"]
+    assert requests["poll"] == ["GET", "GET", "GET"]
+    assert recorder.dropped == 0
+    assert recorder.end_to_end.total_count == 2
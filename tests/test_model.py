@@ -0,0 +1,54 @@
+import struct
+
+import numpy as np
+import pytest
+
+from app.model import (
+    FEATURE_DTYPE,
+    ModelManager,
+    features_from_copy_binary,
+    features_from_records,
+    prepare_features_batch,
+)
+
+ADS = [
+    (True, 0, 0, 1),
+    (False, 3, 250, 12),
+    (True, 10, 1000, 100),
+    (False, 25, 5000, 500),
+    (True, 7, 333, 99),
+]
+
+
+def copy_binary(rows):
+    data = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+    for is_verified, images, length, category in rows:
+        data += struct.pack(">hi?iiiiii", 4, 1, is_verified, 4, images, 4, length, 4, category)
+    return data + struct.pack(">h", -1)
+
+
+def test_batch_is_identical_to_scalar_path():
+    expected = np.vstack([ModelManager.prepare_features(*ad) for ad in ADS])
+
+    batch = prepare_features_batch(*zip(*ADS))
+
+    assert batch.dtype == FEATURE_DTYPE
+    np.testing.assert_array_equal(batch, expected)
+
+
+def test_records_and_binary_copy_give_the_same_matrix():
+    records = [dict(zip(("is_verified", "images_qty", "description_length", "category"), ad)) for ad in ADS]
+
+    expected = prepare_features_batch(*zip(*ADS))
+
+    np.testing.assert_array_equal(features_from_records(records), expected)
+    np.testing.assert_array_equal(features_from_copy_binary(copy_binary(ADS)), expected)
+    assert features_from_records([]).shape == (0, 4)
+
+
+def test_binary_copy_with_nulls_is_rejected():
+    data = bytearray(copy_binary(ADS[:1]))
+    struct.pack_into(">i", data, 19 + 2 + 5 + 8, -1)
+
+    with pytest.raises(ValueError):
+        features_from_copy_binary(bytes(data))
@@ -25,7 +25,7 @@ class TestAsyncPredict:
         assert data["status"] == "pending"
         assert "accepted" in data["message"].lower()
         mock_moderation_repository.create_pending.assert_called_once_with(item_id=1)
-        mock_kafka_producer_dep.send_moderation_request.assert_called_once_with(1)
+        mock_kafka_producer_dep.send_moderation_request.assert_called_once_with(1, priority="normal")
 
     def test_async_predict_ad_not_found(
         self, client_with_model, mock_ad_repository
@@ -44,6 +44,18 @@ class TestAsyncPredict:
 
         assert response.status_code == 422
 
+    def test_async_predict_routes_by_priority(
+        self, client_with_model, mock_ad_repository, mock_moderation_repository, mock_kafka_producer_dep
+    ):
+        mock_ad_repository.get_with_user_by_id.return_value = {"id": 1}
+        mock_moderation_repository.create_pending.return_value = 1
+
+        response = client_with_model.post("/async_predict", json={"item_id": 1, "priority": "high"})
+
+        assert response.status_code == 200
+        mock_kafka_producer_dep.send_moderation_request.assert_called_once_with(1, priority="high")
+        assert client_with_model.post("/async_predict", json={"item_id": 1, "priority": "urgent"}).status_code == 422
+
 
 class TestModerationResult:
     def test_moderation_result_pending(
@@ -113,3 +125,162 @@ class TestModerationResult:
 
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
+
+
+class TestAsyncPredictBatch:
+    def test_async_predict_batch_returns_task_ids_in_input_order(
+        self,
+        client_with_model,
+        mock_ad_repository,
+        mock_moderation_repository,
+        mock_kafka_producer_dep,
+    ):
+        mock_ad_repository.get_existing_ids.return_value = {3, 1, 2}
+        mock_moderation_repository.create_pending_many.return_value = [10, 11, 12]
+
+        response = client_with_model.post("/async_predict_batch", json={"item_ids": [3, 1, 2]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["task_ids"] == [10, 11, 12]
+        assert data["status"] == "pending"
+        mock_moderation_repository.create_pending_many.assert_called_once_with([3, 1, 2])
+        mock_kafka_producer_dep.send_moderation_requests.assert_called_once_with([3, 1, 2], priority="normal")
+
+    def test_async_predict_batch_missing_ads(
+        self, client_with_model, mock_ad_repository, mock_moderation_repository
+    ):
+        mock_ad_repository.get_existing_ids.return_value = {1}
+
+        response = client_with_model.post("/async_predict_batch", json={"item_ids": [1, 5, 7]})
+
+        assert response.status_code == 404
+        assert "[5, 7]" in response.json()["detail"]
+        mock_moderation_repository.create_pending_many.assert_not_called()
+
+    def test_async_predict_batch_validation(self, client_with_model):
+        assert client_with_model.post("/async_predict_batch", json={"item_ids": []}).status_code == 422
+        assert client_with_model.post("/async_predict_batch", json={"item_ids": [1, -1]}).status_code == 422
+
+
+def _result_row(task_id, status="completed", item_id=1):
+    from datetime import datetime
+
+    return {
+        "id": task_id,
+        "item_id": item_id,
+        "status": status,
+        "is_violation": status == "completed",
+        "probability": 0.9 if status == "completed" else None,
+        "error_message": None,
+        "created_at": datetime(2024, 1, 1, 12, 0, 0),
+        "processed_at": datetime(2024, 1, 1, 12, 0, 5) if status != "pending" else None,
+    }
+
+
+class TestModerationResultsBulk:
+    def test_lookup_returns_found_and_missing(
+        self, client_with_model, mock_moderation_repository
+    ):
+        mock_moderation_repository.get_many.return_value = [_result_row(1), _result_row(3, "pending")]
+
+        response = client_with_model.post("/moderation_results/lookup", json={"task_ids": [1, 2, 3]})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["task_id"] for r in data["results"]] == [1, 3]
+        assert data["results"][0]["created_at"] == "2024-01-01T12:00:00"
+        assert data["missing"] == [2]
+
+    def test_list_page_passes_filter_and_returns_next_cursor(
+        self, client_with_model, mock_moderation_repository
+    ):
+        from app.repositories import ResultFilter
+
+        mock_moderation_repository.list_page.return_value = [_result_row(5), _result_row(6)]
+
+        response = client_with_model.get(
+            "/moderation_results", params={"status": "completed", "after_id": 4, "limit": 2}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["next_after_id"] == 6
+        mock_moderation_repository.list_page.assert_called_once_with(
+            ResultFilter(status="completed"), after_id=4, limit=2
+        )
+
+    def test_list_page_rejects_unknown_status(self, client_with_model):
+        response = client_with_model.get("/moderation_results", params={"status": "unknown"})
+
+        assert response.status_code == 422
+
+    def test_export_streams_ndjson(self, client_with_model, mock_moderation_repository):
+        import json
+        from unittest.mock import Mock
+
+        async def rows(*args, **kwargs):
+            for task_id in (1, 2, 3):
+                yield _result_row(task_id)
+
+        mock_moderation_repository.iter_results = Mock(side_effect=rows)
+
+        response = client_with_model.get("/moderation_results/export", params={"item_id": 1})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["task_id"] for line in lines] == [1, 2, 3]
+
+
+class TestModerationResultCaching:
+    def test_terminal_result_is_cached_with_etag(
+        self, client_with_model, mock_moderation_repository
+    ):
+        mock_moderation_repository.get_by_id.return_value = _result_row(42)
+
+        first = client_with_model.get("/moderation_result/42")
+        second = client_with_model.get("/moderation_result/42")
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert first.headers["etag"] == second.headers["etag"]
+        assert "immutable" in first.headers["cache-control"]
+        mock_moderation_repository.get_by_id.assert_called_once_with(42)
+
+    def test_conditional_request_returns_304_without_db_hit(
+        self, client_with_model, mock_moderation_repository
+    ):
+        mock_moderation_repository.get_by_id.return_value = _result_row(42, "failed")
+        etag = client_with_model.get("/moderation_result/42").headers["etag"]
+
+        response = client_with_model.get("/moderation_result/42", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert mock_moderation_repository.get_by_id.call_count == 1
+
+    def test_pending_result_is_not_cached(
+        self, client_with_model, mock_moderation_repository, result_cache
+    ):
+        mock_moderation_repository.get_by_id.return_value = _result_row(42, "pending")
+
+        response = client_with_model.get("/moderation_result/42")
+        client_with_model.get("/moderation_result/42")
+
+        assert response.headers["cache-control"] == "no-store"
+        assert "etag" not in response.headers
+        assert len(result_cache) == 0
+        assert mock_moderation_repository.get_by_id.call_count == 2
+
+
+def test_result_cache_evicts_least_recently_used():
+    from app.cache import ResultCache
+
+    cache = ResultCache(max_size=2)
+    for task_id in (1, 2):
+        cache.put(task_id, {"task_id": task_id, "status": "completed"})
+    cache.get(1)
+    cache.put(3, {"task_id": 3, "status": "completed"})
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
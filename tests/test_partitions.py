@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+from app.workers import partition_maintenance
+from app.workers.partition_maintenance import Partition, PartitionMaintenance, add_months, parse_args, partition_name
+
+
+class StubPool:
+    def __init__(self, partitions=(), detached=()):
+        self.conn = Mock()
+        self.conn.execute = AsyncMock()
+        self.partitions = list(partitions)
+        self.detached = list(detached)
+
+        async def fetch(sql, *args):
+            if "pg_inherits" in sql:
+                return [{"name": name, "bound": bound} for name, bound in self.partitions]
+            return [{"name": name} for name in self.detached]
+
+        self.conn.fetch = fetch
+
+    def acquire(self):
+        conn = self.conn
+
+        class Acquire:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Acquire()
+
+    def executed(self):
+        return [call.args[0] for call in self.conn.execute.call_args_list]
+
+
+def monthly(month):
+    bound = f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00') TO ('{add_months(month, 1):%Y-%m-%d} 00:00:00')"
+    return partition_name(month), bound
+
+
+def test_month_arithmetic_crosses_year_boundaries():
+    assert add_months(datetime(2024, 11, 1), 3) == datetime(2025, 2, 1)
+    assert add_months(datetime(2024, 1, 1), -1) == datetime(2023, 12, 1)
+    assert partition_name(datetime(2025, 2, 1)) == "moderation_results_p202502"
+
+
+def test_partition_bounds_are_parsed():
+    legacy = Partition.from_bound(
+        "moderation_results_legacy", "FOR VALUES FROM (MINVALUE) TO ('2024-06-01 00:00:00')"
+    )
+
+    assert legacy == Partition("moderation_results_legacy", None, datetime(2024, 6, 1))
+    assert Partition.from_bound("moderation_results_default", "DEFAULT") is None
+
+
+def test_only_missing_future_partitions_are_created():
+    pool = StubPool([monthly(datetime(2024, 6, 1)), monthly(datetime(2024, 7, 1))])
+    maintenance = PartitionMaintenance(pool, premake_months=3)
+
+    created = asyncio.run(maintenance.create_future_partitions(datetime(2024, 6, 15, 12)))
+
+    assert created == ["moderation_results_p202408", "moderation_results_p202409"]
+    assert "FOR VALUES FROM ('2024-09-01') TO ('2024-10-01')" in pool.executed()[-1]
+
+
+def test_months_inside_the_legacy_range_are_not_created():
+    legacy = ("moderation_results_legacy", "FOR VALUES FROM (MINVALUE) TO ('2024-07-01 00:00:00')")
+    pool = StubPool([legacy, monthly(datetime(2024, 7, 1))])
+    maintenance = PartitionMaintenance(pool, premake_months=2)
+
+    created = asyncio.run(maintenance.create_future_partitions(datetime(2024, 6, 15, 12)))
+
+    assert created == ["moderation_results_p202408"]
+
+
+def test_partitions_past_retention_are_detached():
+    legacy = ("moderation_results_legacy", "FOR VALUES FROM (MINVALUE) TO ('2024-01-01 00:00:00')")
+    pool = StubPool(
+        [legacy, monthly(datetime(2024, 1, 1)), monthly(datetime(2024, 2, 1)), ("moderation_results_default", "DEFAULT")]
+    )
+    maintenance = PartitionMaintenance(pool, retention_months=6)
+
+    detached = asyncio.run(maintenance.detach_expired_partitions(datetime(2024, 8, 10)))
+
+    assert detached == ["moderation_results_legacy", "moderation_results_p202401"]
+    assert pool.executed() == [
+        "ALTER TABLE moderation_results DETACH PARTITION moderation_results_legacy",
+        "ALTER TABLE moderation_results DETACH PARTITION moderation_results_p202401",
+        "DELETE FROM moderation_results_id_marks WHERE marked_at < $1",
+    ]
+    assert pool.conn.execute.call_args.args[1] == datetime(2024, 2, 1)
+
+
+def test_each_run_marks_the_id_sequence():
+    pool = StubPool()
+
+    asyncio.run(PartitionMaintenance(pool).run_once(datetime(2024, 8, 10)))
+
+    assert "INSERT INTO moderation_results_id_marks" in pool.executed()[0]
+
+
+def test_detached_partitions_are_archived_then_dropped(tmp_path):
+    pool = StubPool(detached=["moderation_results_p202401"])
+
+    async def copy_from_table(table, output, format, header):
+        await output(b"id,item_id,status\n")
+        await output(b"1,42,completed\n")
+
+    pool.conn.copy_from_table = copy_from_table
+    maintenance = PartitionMaintenance(pool, archive_dir=tmp_path)
+
+    asyncio.run(maintenance.run_once(datetime(2024, 8, 10)))
+
+    archive = tmp_path / "moderation_results_p202401.csv.gz"
+    assert gzip.decompress(archive.read_bytes()) == b"id,item_id,status\n1,42,completed\n"
+    assert not list(tmp_path.glob("*.partial"))
+    assert pool.executed()[-1] == "DROP TABLE moderation_results_p202401"
+
+
+def test_explicit_zero_months_override_the_settings(monkeypatch):
+    pool = StubPool()
+    pool.close = AsyncMock()
+    monkeypatch.setattr(partition_maintenance.asyncpg, "create_pool", AsyncMock(return_value=pool))
+    created = []
+
+    class Recording(PartitionMaintenance):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+        async def run_once(self, now=None):
+            pass
+
+    monkeypatch.setattr(partition_maintenance, "PartitionMaintenance", Recording)
+
+    asyncio.run(partition_maintenance.run(parse_args(["--once", "--premake-months", "0", "--retention-months", "0"])))
+
+    assert (created[0].premake_months, created[0].retention_months) == (0, 0)
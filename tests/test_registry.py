@@ -0,0 +1,90 @@
+import asyncio
+import pickle
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.dummy import DummyClassifier
+
+from app.inference import InlineBackend
+from app.main import app
+from app.model import ModelManager
+from app.registry import ModelRegistry, requested_model
+
+
+def write_model(path, violation_share):
+    y = np.array([1] * violation_share + [0] * (100 - violation_share))
+    model = DummyClassifier(strategy="prior").fit(np.zeros((100, 4)), y)
+    path.write_bytes(pickle.dumps(model))
+    return str(path)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    default = ModelManager(write_model(tmp_path / "default.pkl", 10), backend=InlineBackend())
+    default.load()
+    paths = {
+        "goods": write_model(tmp_path / "goods.pkl", 60),
+        "cars": write_model(tmp_path / "cars.pkl", 90),
+    }
+    registry = ModelRegistry(default, paths, {"1-10": "goods", "50": "cars"})
+    asyncio.run(registry.initialize())
+    return registry
+
+
+def predict(registry, category, version=None):
+    async def run():
+        requested_model.set(version)
+        return await registry.predict(True, 1, 10, category)
+
+    return asyncio.run(run())["probability"]
+
+
+def test_models_are_routed_by_category_and_loaded_lazily(registry):
+    assert not registry.report()["models"]["goods"]["loaded"]
+
+    assert predict(registry, 5) == pytest.approx(0.6)
+    assert predict(registry, 50) == pytest.approx(0.9)
+    assert predict(registry, 20) == pytest.approx(0.1)
+
+    report = registry.report()["models"]
+    assert report["goods"]["loaded"] and report["goods"]["requests"] == 1
+    assert report["cars"]["size_bytes"] > 0 and report["cars"]["load_ms"] >= 0
+
+
+def test_version_header_overrides_category(registry):
+    assert predict(registry, 5, version="cars") == pytest.approx(0.9)
+
+
+def test_least_recently_used_model_is_evicted_within_budget(registry):
+    predict(registry, 5)
+    registry.memory_budget_bytes = registry.resident_bytes
+
+    predict(registry, 50)
+
+    models = registry.report()["models"]
+    assert models["cars"]["loaded"] and not models["goods"]["loaded"]
+    assert models["default"]["loaded"]
+
+
+def test_precomputed_features_need_a_category_free_route(registry):
+    assert asyncio.run(registry.resolve()) is None
+
+
+def test_features_without_a_category_use_the_default_model(registry):
+    result = asyncio.run(registry.predict_features(np.zeros(4, dtype=np.float32)))
+
+    assert result["probability"] == pytest.approx(0.1)
+
+
+def test_unknown_version_header_is_rejected(registry):
+    previous = getattr(app.state, "model_manager", None)
+    app.state.model_manager = registry
+    try:
+        response = TestClient(app).post(
+            "/simple_predict", json={"item_id": 1}, headers={"X-Model-Version": "boats"}
+        )
+    finally:
+        app.state.model_manager = previous
+
+    assert response.status_code == 400
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
-from app.repositories import UserRepository, AdRepository
+from app.repositories import UserRepository, AdRepository, ModerationRepository
 
 
 @pytest.fixture
@@ -10,6 +10,7 @@ def mock_pool():
     conn = MagicMock()
     conn.fetchval = AsyncMock(return_value=1)
     conn.fetchrow = AsyncMock(return_value=None)
+    conn.fetch = AsyncMock(return_value=[])
 
     cm = MagicMock()
     cm.__aenter__ = AsyncMock(return_value=conn)
@@ -84,3 +85,71 @@ async def test_ad_repository_get_with_user_not_found(mock_pool):
     result = await repo.get_with_user_by_id(999)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_ad_repository_get_existing_ids(mock_pool):
+    conn = mock_pool.acquire.return_value.__aenter__.return_value
+    conn.fetch.return_value = [{"id": 1}, {"id": 3}]
+
+    repo = AdRepository(mock_pool)
+    result = await repo.get_existing_ids([1, 2, 3])
+
+    assert result == {1, 3}
+    assert conn.fetch.call_args.args[1] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_moderation_repository_create_pending_many_keeps_input_order(mock_pool):
+    conn = mock_pool.acquire.return_value.__aenter__.return_value
+    conn.fetch.return_value = [{"id": 12}, {"id": 10}, {"id": 11}]
+
+    repo = ModerationRepository(mock_pool)
+    task_ids = await repo.create_pending_many([5, 6, 7])
+
+    assert task_ids == [10, 11, 12]
+
+
+def test_result_filter_builds_keyset_condition():
+    from datetime import datetime, timezone
+
+    from app.repositories import ResultFilter
+
+    where, args = ResultFilter(
+        status="failed", created_from=datetime(2024, 1, 1, 3, tzinfo=timezone.utc)
+    ).where(after_id=10)
+
+    assert where == "status = $1 AND created_at >= $2 AND id > $3"
+    assert args == ["failed", datetime(2024, 1, 1, 3), 10]
+    assert ResultFilter().where() == ("TRUE", [])
+
+
+@pytest.mark.asyncio
+async def test_ad_repository_copy_many_streams_chunks(mock_pool):
+    conn = mock_pool.acquire.return_value.__aenter__.return_value
+    conn.copy_records_to_table = AsyncMock()
+
+    async def rows():
+        for i in range(5):
+            yield (1, f"ad {i}", "", 5, 0)
+
+    repo = AdRepository(mock_pool)
+    copied = await repo.copy_many(rows(), chunk_size=2)
+
+    assert copied == 5
+    chunks = [call.kwargs["records"] for call in conn.copy_records_to_table.call_args_list]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert conn.copy_records_to_table.call_args.args == ("ads",)
+    assert mock_pool.acquire.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_user_repository_create_many_returns_ids_in_input_order(mock_pool):
+    conn = mock_pool.acquire.return_value.__aenter__.return_value
+    conn.fetch.side_effect = [[{"id": 11}, {"id": 10}], [{"id": 12}]]
+
+    repo = UserRepository(mock_pool)
+    ids = await repo.create_many([(True,), (False,), (True,)], chunk_size=2)
+
+    assert ids == [10, 11, 12]
+    assert conn.fetch.call_args_list[0].args[1] == [True, False]
@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from app.inference import InlineBackend
+from app.model import ModelManager, model_version
+from app.rescoring import rescore
+
+
+class FixedModel:
+    def predict_proba(self, features):
+        return np.column_stack([1 - features[:, 0], features[:, 0]])
+
+
+class StubConnection:
+    def __init__(self, db):
+        self.db = db
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        yield
+
+    async def cursor(self, sql, after_id):
+        rows = iter([row for row in self.db.ads if row["id"] > after_id])
+
+        class Cursor:
+            async def fetch(self, n):
+                return [row for _, row in zip(range(n), rows)]
+
+        return Cursor()
+
+    async def fetchrow(self, sql, version):
+        return self.db.checkpoint
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.db.scores.extend(records)
+
+    async def execute(self, sql, *args):
+        if sql.lstrip().startswith("INSERT INTO rescore_checkpoints"):
+            self.db.checkpoint = {"last_ad_id": args[1], "rows_scored": args[2]}
+
+
+class StubPool:
+    def __init__(self, ads):
+        self.ads = ads
+        self.scores = []
+        self.checkpoint = None
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield StubConnection(self)
+
+
+def ad(ad_id, verified=False, images=0, description_length=0, category=1):
+    return {
+        "id": ad_id,
+        "is_verified": verified,
+        "images_qty": images,
+        "description_length": description_length,
+        "category": category,
+    }
+
+
+@pytest.fixture
+def model_manager():
+    manager = ModelManager(backend=InlineBackend())
+    manager.model = FixedModel()
+    return manager
+
+
+def test_every_ad_is_scored_once_in_id_order(model_manager):
+    pool = StubPool([ad(i, verified=i % 2 == 0) for i in range(1, 8)])
+
+    progress = asyncio.run(rescore(pool, model_manager, "v1", chunk_size=3, max_inflight=2))
+
+    assert progress.rows == 7
+    assert [record[1] for record in pool.scores] == list(range(1, 8))
+    assert pool.scores[1] == ("v1", 2, True, 1.0)
+    assert pool.checkpoint == {"last_ad_id": 7, "rows_scored": 7}
+
+
+def test_run_resumes_after_checkpoint(model_manager):
+    pool = StubPool([ad(i) for i in range(1, 6)])
+    pool.checkpoint = {"last_ad_id": 3, "rows_scored": 3}
+
+    progress = asyncio.run(rescore(pool, model_manager, "v1", chunk_size=2))
+
+    assert [record[1] for record in pool.scores] == [4, 5]
+    assert progress.rows == 2
+    assert pool.checkpoint == {"last_ad_id": 5, "rows_scored": 5}
+
+
+def test_model_version_is_a_content_hash(tmp_path):
+    first, second = tmp_path / "a.pkl", tmp_path / "b.pkl"
+    first.write_bytes(b"model")
+    second.write_bytes(b"model")
+
+    assert model_version(str(first)) == model_version(str(second))
+    second.write_bytes(b"retrained")
+    assert model_version(str(first)) != model_version(str(second))
@@ -0,0 +1,54 @@
+import gc
+import pickle
+
+from app import model as model_module
+from app.config import Settings
+from app.model import ModelManager, preload_model
+from app.server import Launcher, bind_socket, parse_args
+
+
+def test_model_manager_reuses_preloaded_model(tmp_path, monkeypatch):
+    path = tmp_path / "model.pkl"
+    path.write_bytes(pickle.dumps({"weights": [1, 2, 3]}))
+    monkeypatch.setattr(model_module, "PRELOADED_MODELS", {})
+    preloaded = preload_model(str(path))
+    path.unlink()
+
+    manager = ModelManager(model_path=str(path))
+    manager.load()
+
+    assert manager.model is preloaded
+    manager.close()
+
+
+def test_bound_socket_is_inherited_by_workers():
+    sock = bind_socket("127.0.0.1", 0)
+    try:
+        assert sock.get_inheritable()
+        assert sock.getsockname()[1] > 0
+    finally:
+        sock.close()
+
+
+def test_parse_args_defaults_to_settings_model_path():
+    args = parse_args(["--workers", "2"])
+
+    assert args.workers == 2
+    assert args.model_path == "models/model.pkl"
+
+
+def test_workers_use_the_preloaded_model_path(tmp_path, monkeypatch):
+    path = tmp_path / "custom.pkl"
+    path.write_bytes(pickle.dumps({"weights": [4, 5, 6]}))
+    monkeypatch.setattr(model_module, "PRELOADED_MODELS", {})
+    monkeypatch.setattr(gc, "freeze", lambda: None)
+    monkeypatch.delenv("MODEL_PATH", raising=False)
+
+    Launcher(parse_args(["--model-path", str(path)])).preload()
+
+    # What a forked worker's lifespan does.
+    manager = ModelManager(model_path=Settings().model_path)
+    manager.load()
+
+    assert manager.model is model_module.PRELOADED_MODELS[str(path)][0]
+    manager.close()
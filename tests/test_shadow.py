@@ -0,0 +1,72 @@
+import asyncio
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from app.inference import InlineBackend
+from app.model import ModelManager
+from app.shadow import ShadowScorer
+
+
+class FixedModel:
+    def __init__(self, probability):
+        self.probability = probability
+
+    def predict_proba(self, features):
+        p = np.full(len(features), self.probability)
+        return np.column_stack([1 - p, p])
+
+
+def manager(probability):
+    model_manager = ModelManager(backend=InlineBackend())
+    model_manager.model = FixedModel(probability)
+    model_manager.version = f"p{probability}"
+    return model_manager
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(f"shadow_{name}_total", labels) or 0.0
+
+
+def test_offer_drops_when_queue_is_full():
+    async def scenario():
+        shadow = ShadowScorer(manager(0.9), queue_size=2)
+        before = sample("samples", candidate="p0.9", outcome="dropped")
+        for _ in range(5):
+            shadow.offer(np.zeros(4, dtype=np.float32), 0.1)
+        return shadow._queue.qsize(), sample("samples", candidate="p0.9", outcome="dropped") - before
+
+    assert asyncio.run(scenario()) == (2, 3)
+
+
+def test_batch_counts_disagreements_and_drift():
+    shadow = ShadowScorer(manager(0.7), drift_alpha=0.5)
+    before = sample("disagreements", candidate="p0.7")
+    batch = [(np.zeros(4, dtype=np.float32), 0.2), (np.zeros(4, dtype=np.float32), 0.6)]
+
+    asyncio.run(shadow.score(batch))
+
+    assert sample("disagreements", candidate="p0.7") - before == 1
+    # 0.5 * 0.5, then + 0.5 * (0.1 - 0.25)
+    assert shadow.drift == pytest.approx(0.175)
+
+
+def test_primary_predictions_are_shadow_scored():
+    async def scenario():
+        primary = manager(0.2)
+        shadow = ShadowScorer(manager(0.8), batch_size=2, flush_interval=0.01)
+        primary.shadow = shadow
+        shadow._task = asyncio.create_task(shadow._run())
+        before = sample("samples", candidate="p0.8", outcome="scored")
+        result = await primary.predict(True, 1, 10, 1)
+        for _ in range(100):
+            if sample("samples", candidate="p0.8", outcome="scored") > before:
+                break
+            await asyncio.sleep(0.01)
+        await shadow.stop()
+        return result, sample("samples", candidate="p0.8", outcome="scored") - before
+
+    result, scored = asyncio.run(scenario())
+    assert result["is_violation"] is False
+    assert scored == 1
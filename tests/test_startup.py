@@ -0,0 +1,58 @@
+import sys
+
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_kafka_producer
+from app.main import app
+from app.telemetry import sentry
+from app.telemetry.startup import ImportProfiler, StartupProfile
+
+
+def test_import_profiler_records_new_modules(tmp_path, monkeypatch):
+    (tmp_path / "profiled_parent.py").write_text("import profiled_child\n")
+    (tmp_path / "profiled_child.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    profiler = ImportProfiler()
+
+    profiler.install()
+    try:
+        import profiled_parent  # noqa: F401
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("profiled_parent", None)
+        sys.modules.pop("profiled_child", None)
+
+    own, cumulative = profiler.records["profiled_parent"]
+    assert "profiled_child" in profiler.records
+    assert cumulative >= own
+    assert cumulative >= profiler.records["profiled_child"][1]
+
+
+def test_startup_profile_reports_phases(client, monkeypatch):
+    profile = StartupProfile()
+    with profile.phase("model"):
+        pass
+    profile.finish()
+    monkeypatch.setattr(app.state, "startup_profile", profile, raising=False)
+
+    report = client.get("/startup").json()
+
+    assert set(report["phases_ms"]) == {"model", "total"}
+
+
+def test_capture_exception_without_dsn_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(sentry, "_sentry_sdk", None)
+    sentry.init_sentry("")
+
+    sentry.capture_exception(RuntimeError("boom"))
+
+    assert sentry._sentry_sdk is None
+
+
+def test_async_predict_unavailable_when_kafka_disabled(app_with_dependency_overrides, monkeypatch):
+    app_with_dependency_overrides.dependency_overrides.pop(get_kafka_producer)
+    monkeypatch.setattr(app.state, "kafka_enabled", False, raising=False)
+
+    response = TestClient(app_with_dependency_overrides).post("/async_predict", json={"item_id": 1})
+
+    assert response.status_code == 503
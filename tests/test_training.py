@@ -0,0 +1,45 @@
+import numpy as np
+
+from app.training import FeatureCache, parameter_grid, search
+
+
+def synthetic_cache(directory, rows=4000, chunk=700):
+    rng = np.random.default_rng(0)
+    cache = FeatureCache(directory)
+    with cache.writer("watermark-1") as writer:
+        for start in range(0, rows, chunk):
+            features = rng.random((min(chunk, rows - start), 4))
+            writer.append(features, ((features[:, 0] < 0.3) & (features[:, 1] < 0.5)).astype(int))
+    return cache
+
+
+def test_cache_round_trips_columns_and_tracks_watermark(tmp_path):
+    cache = synthetic_cache(tmp_path, rows=10, chunk=3)
+
+    chunks = list(cache.iter_chunks(0, cache.rows, 4))
+
+    assert cache.rows == 10 and cache.is_valid("watermark-1") and not cache.is_valid("watermark-2")
+    assert [len(labels) for _, labels in chunks] == [4, 4, 2]
+    assert chunks[0][0].shape == (4, 4) and chunks[0][0].dtype == np.float32
+
+
+def test_interrupted_extraction_leaves_no_valid_cache(tmp_path):
+    cache = synthetic_cache(tmp_path)
+    try:
+        with cache.writer("watermark-2") as writer:
+            writer.append(np.zeros((1, 4)), np.zeros(1))
+            raise RuntimeError("connection lost")
+    except RuntimeError:
+        pass
+
+    assert cache.meta is None
+
+
+def test_search_ranks_candidates_by_validation_loss(tmp_path):
+    cache = synthetic_cache(tmp_path)
+
+    results = search(cache, parameter_grid([1e-4, 10.0], ["l2"]), epochs=3, chunk_size=500, workers=1)
+
+    assert [r["params"]["alpha"] for r in results] == [1e-4, 10.0]
+    assert results[0]["accuracy"] > 0.8
+    assert results[0]["model"].predict_proba(np.zeros((1, 4))).shape == (1, 2)